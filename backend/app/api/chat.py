@@ -1,65 +1,161 @@
 """Chat API endpoint that routes between booking logic and RAG answers."""
+import asyncio
+import json
 import logging
 from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Dict
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.schema.chat import ChatMessage, ChatResponse
 from app.db.session import get_session
 from app.services import rag_pipeline
 from app.services.booking_intent import is_booking_request
-from app.services.booking_pipeline import handle_booking, has_booking_draft
+from app.services.booking_pipeline import handle_booking
+from app.services.session_state import load_session, save_session
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+async def _run_until_disconnect(request: Request, work: Awaitable[Any]) -> Any:
+    """Await work, cancelling it (and any LLM call inside) if the client hangs up first."""
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("Client disconnected; cancelling chat turn")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+def _booking_response(result: Dict[str, Any]) -> ChatResponse:
+    """Turn a booking pipeline result into the chat response shape."""
+    message = result.get("message")
+    if not message and result.get("error") is False:
+        dt_value = result.get("datetime")
+        date_str = dt_value.strftime("%Y-%m-%d at %H:%M") if isinstance(dt_value, datetime) else str(dt_value)
+        message = f"Booking confirmed for {date_str}."
+    return ChatResponse(
+        answer=message,
+        sources=[],
+        booking=result
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 @router.post("/message", response_model=ChatResponse, response_model_exclude_none=True)
 async def chat_message(
     chat_request: ChatMessage,
-    session: Session = Depends(get_session)
+    request: Request,
+    session: AsyncSession = Depends(get_session)
 ) -> ChatResponse:
     """Handle a user chat turn, branching into booking or RAG answering."""
+    # One Redis round trip in (draft + history), one out (messages + draft) per turn.
+    state = await load_session(chat_request.session_id)
 
-    if is_booking_request(chat_request.query) or has_booking_draft(chat_request.session_id):
+    if is_booking_request(chat_request.query) or state.draft:
         logger.info("Routing session %s to booking flow", chat_request.session_id)
         try:
-            result = await handle_booking(
+            result = await _run_until_disconnect(request, handle_booking(
                 user_id=chat_request.session_id,
                 user_text=chat_request.query,
-                db=session
-            )
+                db=session,
+                state=state
+            ))
+        except HTTPException:
+            raise
         except Exception as exc:
             logger.error("Booking pipeline failed for session %s: %s", chat_request.session_id, exc)
             raise HTTPException(status_code=503, detail=f"Booking pipeline failed: {exc}")
 
-        message = result.get("message")
-        if not message and result.get("error") is False:
-            dt_value = result.get("datetime")
-            date_str = dt_value.strftime("%Y-%m-%d at %H:%M") if isinstance(dt_value, datetime) else str(dt_value)
-            message = f"Booking confirmed for {date_str}."
-
-        logger.debug("Booking response for session %s: %s", chat_request.session_id, message)
-        return ChatResponse(
-            answer=message,
-            sources=[],
-            booking=result
-        )
+        await save_session(state)
+        response = _booking_response(result)
+        logger.debug("Booking response for session %s: %s", chat_request.session_id, response.answer)
+        return response
 
     logger.info("Routing session %s to RAG flow", chat_request.session_id)
     try:
-        result = await rag_pipeline.answer_question(
-            session_id=chat_request.session_id,
+        result = await _run_until_disconnect(request, rag_pipeline.answer_question(
+            state=state,
             question=chat_request.query,
             document_id=chat_request.document_id,
             db=session
-        )
+        ))
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.error("Chat pipeline failed for session %s: %s", chat_request.session_id, exc)
         raise HTTPException(status_code=503, detail=f"Chat pipeline failed: {exc}")
 
+    await save_session(state)
     logger.debug("RAG response ready for session %s", chat_request.session_id)
     return ChatResponse(
         answer=result["answer"],
-        sources=result["sources"]
+        sources=result["sources"],
+        prompt_tokens=result.get("prompt_tokens")
+    )
+
+
+@router.post("/message/stream")
+async def chat_message_stream(
+    chat_request: ChatMessage,
+    session: AsyncSession = Depends(get_session)
+) -> StreamingResponse:
+    """Same routing as /message, but stream the RAG answer token by token as SSE."""
+
+    async def events() -> AsyncIterator[str]:
+        state = await load_session(chat_request.session_id)
+        if is_booking_request(chat_request.query) or state.draft:
+            logger.info("Routing session %s to booking flow (stream)", chat_request.session_id)
+            try:
+                result = await handle_booking(
+                    user_id=chat_request.session_id,
+                    user_text=chat_request.query,
+                    db=session,
+                    state=state
+                )
+            except Exception as exc:
+                logger.error("Booking pipeline failed for session %s: %s", chat_request.session_id, exc)
+                yield _sse("error", {"detail": f"Booking pipeline failed: {exc}"})
+                return
+            await save_session(state)
+            yield _sse("booking", _booking_response(result).model_dump(exclude_none=True))
+            yield _sse("done", {})
+            return
+
+        logger.info("Routing session %s to RAG flow (stream)", chat_request.session_id)
+        try:
+            async for item in rag_pipeline.stream_answer(
+                state=state,
+                question=chat_request.query,
+                document_id=chat_request.document_id
+            ):
+                yield _sse(item["event"], item["data"])
+        except Exception as exc:
+            # Headers are already sent, so surface the failure as an event instead of a status code.
+            logger.error("Chat stream failed for session %s: %s", chat_request.session_id, exc)
+            yield _sse("error", {"detail": f"Chat pipeline failed: {exc}"})
+            return
+        await save_session(state)
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
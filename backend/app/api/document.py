@@ -1,99 +1,100 @@
-"""Document ingestion endpoint: extract text, chunk, embed, and store vectors."""
+"""Document ingestion endpoints: inline ingestion plus background jobs with status polling."""
 import logging
-from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
-from app.schema.document import DocIngest, ChunkStrategy
-from app.services.text_extractor import extract_text
-from app.services.chunker import chunk_text
-from app.services.embedings import embed_chunks
-from app.services.vector_store import store_vector, ensure_collection
+from app.core.config import settings
+from app.schema.document import DocIngest, ChunkStrategy, IngestionJobStatus
+from app.services import ingestion_jobs
+from app.services.ingestion import IngestionError, ingest_file, update_document
+from app.services.upload_store import UploadTooLarge, spool_upload
 from app.db.session import get_session
-from sqlmodel import Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.document import Document
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-try:
-    ensure_collection()
-except Exception as exc:
-    logger.warning("Qdrant collection bootstrap failed: %s", exc)
-
 @router.post("/ingestion/", response_model = DocIngest)
 async def ingest_document(
     file: UploadFile = File(...),
     chunking_strategy: ChunkStrategy = Query(default=ChunkStrategy.fixed),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> DocIngest:
     """Read a file, chunk it, embed the chunks, and save vectors and metadata."""
     logger.info("Starting document ingest for file %s", file.filename)
-    contents = await file.read()
     try:
-        text = extract_text(contents, content_type=file.content_type, filename=file.filename)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-    except Exception as exc:
-        logger.error("Failed to extract text: %s", exc)
-        raise HTTPException(status_code=500, detail="Failed to extract text from file")
+        upload = await spool_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    logger.info("Spooled %s: %s bytes, sha256 %s", file.filename, upload.size, upload.sha256)
 
     try:
-        ensure_collection()
-    except Exception as exc:
-        logger.error("Vector store unavailable: %s", exc)
-        raise HTTPException(status_code=503, detail=f"Vector store unavailable: {exc}")
+        return await ingest_file(
+            upload.path, file.filename, file.content_type, chunking_strategy, session, content_hash=upload.sha256
+        )
+    except IngestionError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    finally:
+        upload.remove()
 
+
+@router.put("/{external_id}", response_model=DocIngest)
+async def update_existing_document(
+    external_id: str,
+    file: UploadFile = File(...),
+    chunking_strategy: ChunkStrategy = Query(default=ChunkStrategy.fixed),
+    session: AsyncSession = Depends(get_session)
+) -> DocIngest:
+    """Replace a document's contents in place, re-embedding only new or changed chunks."""
+    doc = (await session.exec(select(Document).where(Document.external_id == external_id))).first()
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    logger.info("Starting update of document %s from file %s", external_id, file.filename)
     try:
-        chunks = chunk_text(text, chunking_strategy)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=f"Chunking failed: {exc}")
-    if not chunks:
-        raise HTTPException(status_code=400, detail="chunking failed, no chunks created")
-    
+        upload = await spool_upload(file)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
     try:
-        embeddings = await embed_chunks(chunks)
-    except Exception as exc:
-        logger.error("Embedding failed: %s", exc)
-        raise HTTPException(status_code=500, detail=f"Embedding failed: {exc}")
-    if len(embeddings) != len(chunks):
-        raise HTTPException(status_code=500, detail="embedding failed, not same number of embeddings and chunks")
-    
-    external_id = str(uuid4())
-    doc = Document(
-        filename=file.filename,
-        external_id=external_id,
-        content_type=file.content_type
-    )
+        return await update_document(
+            doc, upload.path, file.filename, file.content_type, chunking_strategy, session, content_hash=upload.sha256
+        )
+    except IngestionError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    finally:
+        upload.remove()
+
+
+@router.post("/ingestion/jobs", response_model=IngestionJobStatus, status_code=202)
+async def create_ingestion_job(
+    file: UploadFile = File(...),
+    chunking_strategy: ChunkStrategy = Query(default=ChunkStrategy.fixed),
+    session: AsyncSession = Depends(get_session)
+) -> IngestionJobStatus:
+    """Persist the upload and queue it for a background worker; returns the job right away."""
+    try:
+        upload = await spool_upload(file, directory=settings.ingestion_job_dir)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
     try:
-        session.add(doc)
-        session.commit()
+        job = await ingestion_jobs.create_job(session, upload, file.filename, file.content_type, chunking_strategy)
     except Exception as exc:
-        session.rollback()
-        logger.error("Failed to persist document metadata: %s", exc)
-        raise HTTPException(status_code=500, detail=f"Failed to persist document metadata: {exc}")
+        upload.remove()
+        logger.error("Failed to create ingestion job for %s: %s", file.filename, exc)
+        raise HTTPException(status_code=500, detail=f"Failed to create ingestion job: {exc}")
+
+    await ingestion_jobs.enqueue(job.job_id)
+    logger.info("Queued ingestion job %s for %s", job.job_id, file.filename)
+    return IngestionJobStatus.model_validate(job.model_dump())
 
-    for i in range(len(chunks)):
-        try:
-            store_vector(
-                id=str(uuid4()),
-                vector=embeddings[i],
-                payload={
-                    "text": chunks[i],
-                    "document_id": external_id,
-                    "chunk_id": i,
-                    "filename": file.filename
-                }
-            )
-        except Exception as exc:
-            session.rollback()
-            logger.error("Failed to store vector for document %s: %s", external_id, exc)
-            raise HTTPException(status_code=503, detail=f"Failed to store vector: {exc}")
 
-    logger.info("Document %s stored with %s chunks", external_id, len(chunks))
-    return DocIngest(
-        document_id=external_id,
-        external_id=external_id,
-        chunking_strategy=chunking_strategy,
-        num_chunks=len(chunks),
-        status="Document ingested successfully"
-    )
+@router.get("/ingestion/jobs/{job_id}", response_model=IngestionJobStatus)
+async def get_ingestion_job(job_id: str, session: AsyncSession = Depends(get_session)) -> IngestionJobStatus:
+    """Report phase, chunk progress and any error for a background ingestion job."""
+    job = await ingestion_jobs.get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return IngestionJobStatus.model_validate(job.model_dump())
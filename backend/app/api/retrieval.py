@@ -0,0 +1,62 @@
+"""Batch retrieval endpoint for offline QA and evaluation jobs: chunks only, no LLM call."""
+import json
+import logging
+from typing import AsyncIterator, List, Tuple
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.schema.retrieval import BatchRetrievalRequest, BatchRetrievalResponse, BatchRetrievalResult
+from app.services.retriever import retrieve_batch
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _batches(body: BatchRetrievalRequest) -> List[Tuple[int, List[Tuple[str, str | None, int]]]]:
+    """Split the request into (offset, queries) slices of retrieval_batch_size."""
+    size = max(1, settings.retrieval_batch_size)
+    queries = [(item.query, item.document_id, item.top_k or body.top_k) for item in body.queries]
+    return [(offset, queries[offset:offset + size]) for offset in range(0, len(queries), size)]
+
+
+@router.post("/batch", response_model=BatchRetrievalResponse)
+async def retrieve_batch_endpoint(body: BatchRetrievalRequest):
+    """Retrieve chunks for many queries, one embed call and one Qdrant round trip per slice.
+
+    Large batches (or stream=true) are answered as NDJSON: one {"index", "chunks"} line per query
+    as each slice finishes, then {"done": true, "queries": n}.
+    """
+    if len(body.queries) > settings.retrieval_batch_max_queries:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.retrieval_batch_max_queries} queries per request; got {len(body.queries)}.",
+        )
+    stream = body.stream if body.stream is not None else len(body.queries) > settings.retrieval_batch_stream_threshold
+
+    if not stream:
+        results: List[BatchRetrievalResult] = []
+        for offset, queries in _batches(body):
+            try:
+                chunks = await retrieve_batch(queries)
+            except Exception as exc:
+                logger.error("Batch retrieval failed at query %s: %s", offset, exc)
+                raise HTTPException(status_code=503, detail=f"Batch retrieval failed: {exc}")
+            results += [BatchRetrievalResult(index=offset + i, chunks=found) for i, found in enumerate(chunks)]
+        return BatchRetrievalResponse(results=results)
+
+    async def lines() -> AsyncIterator[str]:
+        for offset, queries in _batches(body):
+            try:
+                chunks = await retrieve_batch(queries)
+            except Exception as exc:
+                # Headers are already sent, so the failure goes in the body; earlier lines stay valid.
+                logger.error("Batch retrieval stream failed at query %s: %s", offset, exc)
+                yield json.dumps({"index": offset, "error": f"Batch retrieval failed: {exc}"}) + "\n"
+                return
+            for i, found in enumerate(chunks):
+                yield BatchRetrievalResult(index=offset + i, chunks=found).model_dump_json() + "\n"
+        yield json.dumps({"done": True, "queries": len(body.queries)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
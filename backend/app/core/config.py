@@ -5,6 +5,80 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_name: str = "Docinges RAG"
     database_url: str = "sqlite:///./PMrag.db"
+    # Derived from database_url (sqlite -> aiosqlite, postgresql -> asyncpg) when unset.
+    async_database_url: str | None = None
+    database_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    sqlite_busy_timeout_ms: int = 5000
     redis_url: str = "redis://localhost:6379/0"
+    redis_max_connections: int = 50
     ollama_url: str = "http://localhost:11434"
+    ollama_model: str = "deepseek-r1:1.5b"
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 20.0
+    llm_max_connections: int = 10
+    llm_max_concurrency: int = 4
+    # Preload the Ollama model during startup warm-up; readiness does not wait on it.
+    warmup_llm: bool = True
+    max_upload_bytes: int = 500 * 1024 * 1024
+    upload_dir: str | None = None
+    ingestion_workers: int = 2
+    ingestion_job_dir: str = "./ingestion_jobs"
+    pdf_extract_workers: int = 4
+    pdf_pages_per_task: int = 16
+    pdf_parallel_min_pages: int = 32
+    sentence_chunk_fast: bool = False
+    # "torch" (float32), "torch_int8" (dynamic int8 Linear layers) or "onnx" (ONNX Runtime, needs optimum[onnxruntime]).
+    embedding_backend: str = "torch"
+    # Intra-op threads for the embedding backend; 0 keeps the library default (one per core).
+    embedding_threads: int = 0
+    # ONNX file inside the model repo, e.g. onnx/model_qint8_avx512_vnni.onnx for a pre-quantized export.
+    embedding_onnx_file: str = "onnx/model.onnx"
+    embed_batch_window_ms: float = 5.0
+    embed_max_batch_size: int = 32
+    embed_cache_size: int = 1024
+    embed_cache_redis: bool = False
+    embed_cache_ttl: int = 24 * 60 * 60
+    answer_cache_enabled: bool = False
+    answer_cache_threshold: float = 0.95
+    answer_cache_size: int = 512
+    answer_cache_ttl: int = 60 * 60
+    retrieval_mode: str = "dense"
+    # Batch retrieval: queries per embed + Qdrant batch call, batch size that switches to streaming, request cap.
+    retrieval_batch_size: int = 64
+    retrieval_batch_stream_threshold: int = 256
+    retrieval_batch_max_queries: int = 10000
+    hybrid_candidates: int = 20
+    rrf_k: int = 60
+    retrieval_diversify: bool = False
+    mmr_lambda: float = 0.5
+    mmr_candidates: int = 20
+    prompt_system_tokens: int = 300
+    prompt_context_tokens: int = 2000
+    prompt_history_tokens: int = 600
+    prompt_history_turns: int = 6
+    prompt_tokenizer: str | None = None
+    chat_history_window: int = 20
+    chat_history_ttl: int = 7 * 24 * 60 * 60
+    chat_summary_enabled: bool = False
+    chat_summary_batch: int = 10
+    booking_fast_confidence: float = 0.8
+    # ":memory:" runs an in-process Qdrant, for benchmarks and local experiments.
+    qdrant_url: str = "http://localhost:6333"
+    qdrant_timeout: int = 40
+    # Collection profile: HNSW graph, search-time ef, and optional int8 quantization with rescoring.
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    qdrant_search_ef: int = 128
+    qdrant_quantization: str = "none"
+    qdrant_quantization_rescore: bool = True
+    qdrant_quantization_oversampling: float = 2.0
+    qdrant_on_disk_vectors: bool = False
+    # Bring an existing collection to the profile at startup (in place, or by rebuilding to add sparse vectors).
+    qdrant_migrate: bool = False
+    qdrant_upsert_batch_size: int = 256
+    qdrant_upsert_max_retries: int = 3
+    qdrant_upsert_backoff: float = 0.5
 settings = Settings()
@@ -0,0 +1,126 @@
+"""Prometheus metrics for the hot pipeline stages, plus a per-request Server-Timing breakdown."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Spans a cache hit (sub-millisecond) up to a slow generation on a CPU-only Ollama host.
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds", "Time spent in each pipeline stage.", ["stage"], buckets=STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter("rag_stage_errors_total", "Pipeline stage calls that raised.", ["stage"])
+LLM_TOKENS = Counter("rag_llm_tokens_total", "Tokens sent to (prompt) and generated by (completion) the LLM.", ["direction"])
+HTTP_SECONDS = Histogram(
+    "rag_http_request_duration_seconds",
+    "Time to the first response byte, by route template.",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+STARTUP_SECONDS = Gauge("rag_startup_component_seconds", "Time each component took to initialize at startup.", ["component"])
+
+# Stage -> seconds for the request being served; None outside a request.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+# labels() hashes and locks on every call; resolve each stage's children once.
+_stage_children: Dict[str, Tuple[Any, Any]] = {}
+
+
+def _children(stage: str) -> Tuple[Any, Any]:
+    children = _stage_children.get(stage)
+    if children is None:
+        children = _stage_children[stage] = (STAGE_SECONDS.labels(stage), STAGE_ERRORS.labels(stage))
+    return children
+
+
+@contextmanager
+def track(stage: str) -> Iterator[None]:
+    """Time a block into the stage histogram and the current request's Server-Timing.
+
+    Also works as a decorator on sync functions; for coroutines, use it as a with block inside.
+    """
+    seconds, errors = _children(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        errors.inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        seconds.observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def record_llm_tokens(response: Dict[str, Any]) -> None:
+    """Count prompt and completion tokens from an Ollama final response, when it reports them."""
+    prompt = response.get("prompt_eval_count")
+    completion = response.get("eval_count")
+    if prompt:
+        LLM_TOKENS.labels("prompt").inc(prompt)
+    if completion:
+        LLM_TOKENS.labels("completion").inc(completion)
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _route_template(scope) -> str:
+    """Route template of the matched endpoint, e.g. /document/ingestion/jobs/{job_id}; raw paths would explode cardinality."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Routes of an included router may carry only their own path; the leading request segments are the prefix.
+    parts = scope["path"].split("/")
+    return "/".join(parts[:len(parts) - template.count("/")]) + template
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the registry in Prometheus text format with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware: collects stage timings per request and reports them in Server-Timing.
+
+    The header goes out with the response start, so a streamed body's later stages are only in /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        first_byte = None
+
+        async def send_with_timing(message):
+            nonlocal status, first_byte
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                first_byte = time.perf_counter() - start
+                header = server_timing(timings, first_byte).encode("latin-1")
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = _route_template(scope)
+            elapsed = first_byte if first_byte is not None else time.perf_counter() - start
+            HTTP_SECONDS.labels(scope["method"], route, str(status)).observe(elapsed)
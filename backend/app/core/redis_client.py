@@ -1,6 +1,7 @@
 """Redis client bootstrap with graceful fallback when Redis is down."""
 import logging
 import redis
+import redis.asyncio
 
 from app.core.config import settings
 
@@ -11,3 +12,23 @@ try:
 except Exception as exc:
     redis_client = None
     logger.warning("Failed to initialize Redis client: %s", exc)
+
+try:
+    # Pooled, non-blocking client for per-turn session state on the request path.
+    async_redis_client = redis.asyncio.Redis.from_url(
+        settings.redis_url, decode_responses=True, max_connections=settings.redis_max_connections
+    )
+    # Same server, but returns raw bytes for binary values such as cached embeddings.
+    async_redis_bytes_client = redis.asyncio.Redis.from_url(
+        settings.redis_url, max_connections=settings.redis_max_connections
+    )
+except Exception as exc:
+    async_redis_client = None
+    async_redis_bytes_client = None
+    logger.warning("Failed to initialize async Redis client: %s", exc)
+
+
+async def close_async_redis() -> None:
+    for client in (async_redis_client, async_redis_bytes_client):
+        if client is not None:
+            await client.aclose()
@@ -1,35 +1,143 @@
-"""Database session helpers and startup init."""
+"""Database engines, session helpers and startup init.
+
+Request handlers and background jobs use the async engine; the sync engine only runs startup DDL.
+"""
 import logging
-from sqlmodel import SQLModel, create_engine, Session
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _async_url(url: str) -> str:
+    """Swap the sync driver in url for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver known for database backend '{backend}'.")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"echo": settings.database_echo}
+    # In-memory SQLite uses a single shared connection; pool sizing does not apply to it.
+    if not _is_memory_sqlite(url):
+        options.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_pre_ping=make_url(url).get_backend_name() != "sqlite",
+        )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """WAL lets readers run alongside the single writer; busy_timeout makes writers queue instead of failing."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption.
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def _configure_sqlite(sync_engine) -> None:
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+
+
 try:
-    engine = create_engine(settings.database_url, echo=True)
+    engine = create_engine(settings.database_url, **_engine_options(settings.database_url))
+    _configure_sqlite(engine)
 except Exception as exc:
     engine = None
     logger.error("Failed to create database engine: %s", exc)
 
+async_engine: Optional[AsyncEngine]
+try:
+    _async_database_url = settings.async_database_url or _async_url(settings.database_url)
+    async_engine = create_async_engine(_async_database_url, **_engine_options(_async_database_url))
+    _configure_sqlite(async_engine.sync_engine)
+except Exception as exc:
+    async_engine = None
+    logger.error("Failed to create async database engine: %s", exc)
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (awaitable) refresh.
+async_session_maker = (
+    async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    if async_engine is not None else None
+)
+
 
 def init_db() -> None:
-    """Create tables if the engine is available."""
+    """Create tables and add missing columns; raises so startup can report the database as down."""
     if engine is None:
-        logger.warning("Database engine unavailable; skipping init.")
-        return
+        raise RuntimeError("Database engine is not initialized.")
     try:
         from app.models.document import Document  # noqa: F401
         from app.models.booking import Booking  # noqa: F401
+        from app.models.ingestion_job import IngestionJob  # noqa: F401
+        from app.models.chunk_embedding import ChunkEmbedding  # noqa: F401
         SQLModel.metadata.create_all(engine)
+        _add_missing_columns()
         logger.info("Database initialized")
     except Exception as exc:
         logger.error("Failed to initialize database: %s", exc)
+        raise RuntimeError(f"Failed to initialize database: {exc}") from exc
 
 
-def get_session():
-    """Provide a SQLModel session dependency."""
-    if engine is None:
-        raise RuntimeError("Database engine is not initialized.")
-    with Session(engine) as session:
+def _add_missing_columns() -> None:
+    """Add nullable columns introduced after a table was created; create_all never alters."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    logger.warning("Cannot add non-nullable column %s.%s automatically", table.name, column.name)
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                logger.info("Added column %s.%s", table.name, column.name)
+
+
+def new_session() -> AsyncSession:
+    """Open an async session outside a request, e.g. in a background job."""
+    if async_session_maker is None:
+        raise RuntimeError("Async database engine is not initialized.")
+    return async_session_maker()
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Provide an async SQLModel session dependency."""
+    async with new_session() as session:
         yield session
+
+
+async def dispose_engines() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
@@ -2,31 +2,72 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
-from app.db.session import init_db
+from app.core.metrics import ServerTimingMiddleware, render_metrics
+from app.core.redis_client import close_async_redis
+from app.db.session import dispose_engines, init_db
+from app.services.answer_cache import answer_cache
+from app.services.booking_extractor import extraction_stats
+from app.services.embedding_cache import query_cache
+from app.services import ingestion_jobs, warmup
+from app.services.llm import close_llm_client
+from app.services.text_extractor import shutdown_pdf_pool
 from app.api import chat as chat_router
 from app.api import document as doc_router
+from app.api import retrieval as retrieval_router
 
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize the DB on startup and log lifecycle events."""
+    """Initialize the DB, then warm up in the background (ingestion workers start once Qdrant is checked)."""
     logger.info("starting up")
-    init_db()
+    await warmup.run_step("database", lambda: run_in_threadpool(init_db))
+    warmup.start_warm_up()
     yield
     logger.info("shutting down")
+    await warmup.stop_warm_up()
+    await ingestion_jobs.stop_workers()
+    await close_llm_client()
+    await close_async_redis()
+    shutdown_pdf_pool()
+    await dispose_engines()
 
 app = FastAPI(
     title = settings.app_name,
     lifespan=lifespan
 )
+app.add_middleware(ServerTimingMiddleware)
+
 @app.get("/health")
 async def health_check() -> dict:
-    """Lightweight readiness probe."""
-    return {"status": "ok"}
+    """Lightweight readiness probe plus cache and booking fast-path counters for sizing."""
+    return {
+        "status": "ok",
+        "embedding_cache": query_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "booking_extraction": extraction_stats(),
+    }
+
+
+@app.get("/ready")
+async def ready(response: Response) -> dict:
+    """Readiness probe: 503 until startup warm-up has loaded the model and reached Qdrant."""
+    is_ready, report = warmup.readiness()
+    if not is_ready:
+        response.status_code = 503
+    return report
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Stage latency histograms, error and LLM token counters in Prometheus text format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
 app.include_router(chat_router.router, prefix="/chat", tags=["chat"])
 app.include_router(doc_router.router, prefix="/document", tags=["document"])
+app.include_router(retrieval_router.router, prefix="/retrieval", tags=["retrieval"])
@@ -0,0 +1,7 @@
+"""Chunk embeddings keyed by a hash of model name plus chunk text, so identical text is encoded once."""
+from sqlmodel import SQLModel, Field
+
+class ChunkEmbedding(SQLModel, table = True):
+    """A stored float32 embedding for one distinct chunk text."""
+    chunk_hash: str = Field(primary_key=True)
+    embedding: bytes
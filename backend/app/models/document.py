@@ -8,4 +8,7 @@ class Document(SQLModel, table = True):
     external_id: str = Field(index=True, unique=True)
     filename: str
     content_type: str
+    content_hash: str | None = Field(default=None, index=True)
+    chunking_strategy: str | None = None
+    num_chunks: int | None = None
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,21 @@
+"""Background ingestion jobs, persisted so progress survives restarts."""
+from sqlmodel import SQLModel, Field
+from datetime import datetime, timezone
+
+class IngestionJob(SQLModel, table = True):
+    """One queued upload and how far the pipeline has got with it."""
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: str = Field(index=True, unique=True)
+    filename: str
+    content_type: str
+    file_path: str
+    content_hash: str | None = None
+    chunking_strategy: str
+    status: str = Field(default="queued", index=True)
+    phase: str | None = None
+    chunks_done: int = 0
+    chunks_total: int = 0
+    document_id: str | None = None
+    error: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -1,6 +1,6 @@
 """Pydantic schemas for chat requests and responses."""
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any
 
 
 class RetrievedChunk(BaseModel):
@@ -8,6 +8,7 @@ class RetrievedChunk(BaseModel):
     text: str
     document_id: Optional[str]
     chunk_id: Optional[int]
+    chunk_ids: Optional[List[int]] = None
     score: float
 
 
@@ -23,3 +24,4 @@ class ChatResponse(BaseModel):
     answer: str | None = None
     sources: List[RetrievedChunk] | None = None
     booking: dict | None = None
+    prompt_tokens: Dict[str, int] | None = None
@@ -1,5 +1,6 @@
 """Schemas describing document ingestion requests/responses."""
 from pydantic import BaseModel
+from datetime import datetime
 from enum import Enum
 
 class ChunkStrategy(str, Enum):
@@ -14,4 +15,21 @@ class DocIngest(BaseModel):
     external_id: str
     chunking_strategy: ChunkStrategy
     num_chunks: int
+    chunks_reused: int = 0
+    chunks_embedded: int = 0
+    chunks_deleted: int = 0
     status: str
+
+
+class IngestionJobStatus(BaseModel):
+    """Progress of a background ingestion job."""
+    job_id: str
+    filename: str
+    status: str
+    phase: str | None = None
+    chunks_done: int
+    chunks_total: int
+    document_id: str | None = None
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
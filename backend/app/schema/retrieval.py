@@ -0,0 +1,30 @@
+"""Schemas for batch retrieval requests and responses."""
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from app.schema.chat import RetrievedChunk
+
+
+class BatchQuery(BaseModel):
+    """One question in a batch, optionally restricted to a document."""
+    query: str
+    document_id: str | None = None
+    top_k: int | None = Field(default=None, ge=1, le=100)
+
+
+class BatchRetrievalRequest(BaseModel):
+    """Questions to retrieve chunks for; top_k applies to queries that do not set their own."""
+    queries: List[BatchQuery]
+    top_k: int = Field(default=5, ge=1, le=100)
+    stream: bool | None = None
+
+
+class BatchRetrievalResult(BaseModel):
+    """Chunks for the query at index in the request."""
+    index: int
+    chunks: List[RetrievedChunk]
+
+
+class BatchRetrievalResponse(BaseModel):
+    results: List[BatchRetrievalResult]
@@ -0,0 +1,119 @@
+"""Semantic answer cache: reuse an answer when a new question is a close paraphrase."""
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    document_id: Optional[str]
+    answer: str
+    sources: List[Dict[str, Any]]
+    llm_seconds: float
+    created_at: float
+
+
+class AnswerCache:
+    """Bounded, TTL'd store of answers looked up by cosine similarity per document."""
+
+    def __init__(self, enabled: bool, threshold: float, max_size: int, ttl: int):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.saved_llm_seconds = 0.0
+
+    def lookup(self, vector: np.ndarray, document_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the closest cached answer for this document if it clears the threshold."""
+        if not self.enabled:
+            return None
+        self._expire()
+        candidates = [(key, entry) for key, entry in self._entries.items() if entry.document_id == document_id]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        matrix = np.stack([entry.vector for _, entry in candidates])
+        scores = matrix @ _unit(vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        key, entry = candidates[best]
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.saved_llm_seconds += entry.llm_seconds
+        logger.debug("Answer cache hit (similarity %.3f) for document %s", scores[best], document_id)
+        return {"answer": entry.answer, "sources": entry.sources, "similarity": float(scores[best])}
+
+    def store(self, vector: np.ndarray, document_id: Optional[str], answer: str, sources: List[Dict[str, Any]], llm_seconds: float) -> None:
+        if not self.enabled or self.max_size <= 0:
+            return
+        self._entries[next(self._ids)] = _Entry(
+            vector=_unit(vector),
+            document_id=document_id,
+            answer=answer,
+            sources=sources,
+            llm_seconds=llm_seconds,
+            created_at=time.monotonic(),
+        )
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_document(self, document_id: Optional[str]) -> int:
+        """Drop answers for a changed document, plus unscoped answers that may have drawn on it."""
+        stale = [key for key, entry in self._entries.items() if entry.document_id in (document_id, None)]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            logger.info("Invalidated %s cached answers for document %s", len(stale), document_id)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_llm_seconds": round(self.saved_llm_seconds, 3),
+        }
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+answer_cache = AnswerCache(
+    enabled=settings.answer_cache_enabled,
+    threshold=settings.answer_cache_threshold,
+    max_size=settings.answer_cache_size,
+    ttl=settings.answer_cache_ttl,
+)
@@ -1,45 +1,90 @@
-"""Booking field extraction via LLM with a regex safety net."""
+"""Booking field extraction: a confidence-scored regex pass first, the LLM only for what it leaves open."""
 import json
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from app.core.config import settings
+from app.core.metrics import track
 from app.services.llm import call_llm
 
 logger = logging.getLogger(__name__)
 
 
-EMAIL_REGEX = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
-TIME_REGEX = re.compile(
-    r"\b(?:(?:1[0-2]|0?\d)(?::[0-5]\d)?\s?(?:am|pm)|noon|midnight)\b",
-    re.IGNORECASE,
+BOOKING_FIELDS = ("name", "email", "date", "time")
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+EMAIL_PATTERN = r"[\w\.+-]+@[\w-]+(?:\.[\w-]+)*\.\w+"
+# "17:30" and "09:00" read as 24-hour times; a bare "5:30" could be morning or evening.
+BARE_TIME_PATTERN = r"(?:1[0-2]|[1-9]):[0-5]\d"
+TIME_PATTERN = (
+    r"\b(?:(?:1[0-2]|0?\d)(?::[0-5]\d)?\s?(?:am|pm)|(?:0\d|1[3-9]|2[0-3]):[0-5]\d|"
+    rf"{BARE_TIME_PATTERN}|noon|midnight)\b"
 )
-WEEKDAY_REGEX = re.compile(
-    r"\b(?:next|this|coming)?\s*(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b",
+DATE_PATTERN = rf"\b(?:(?:next|this|coming)\s+)?(?:{'|'.join(WEEKDAY_NAMES)})\b"
+# The introduction is case-insensitive; the name itself must be capitalized words. It is captured
+# in a lookahead so a rejected "name" (e.g. "this is Friday") is still scanned for other fields.
+NAME_PATTERN = r"\b(?:my name is|i am|i'm|this is)\s+(?=(?P<name_value>(?-i:[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*){0,2})))"
+
+EMAIL_REGEX = re.compile(EMAIL_PATTERN)
+TIME_REGEX = re.compile(TIME_PATTERN, re.IGNORECASE)
+BARE_TIME_REGEX = re.compile(BARE_TIME_PATTERN)
+WEEKDAY_REGEX = re.compile(DATE_PATTERN, re.IGNORECASE)
+# All four fields in one left-to-right scan.
+FIELD_REGEX = re.compile(
+    rf"(?P<email>{EMAIL_PATTERN})|(?P<time>{TIME_PATTERN})|(?P<date>{DATE_PATTERN})|(?P<name>{NAME_PATTERN})",
     re.IGNORECASE,
 )
+# Capitalized words that end a name rather than belong to it.
+NOT_NAMES = set(WEEKDAY_NAMES) | {
+    "next", "this", "coming", "free", "available", "interested", "looking",
+    "book", "booking", "schedule", "appointment", "meeting", "interview", "please", "i",
+}
 
+# Confidence of a single unambiguous match per field; conflicting matches and a bare H:MM time
+# (no am/pm, hour 1-12) drop to AMBIGUOUS.
+FIELD_CONFIDENCE = {"email": 1.0, "date": 1.0, "time": 1.0, "name": 0.9}
+AMBIGUOUS = 0.4
 
-def _fallback_extract(document_text: str) -> Dict[str, Optional[str]]:
-    """Basic regex grab when the LLM reply is missing or broken."""
-    email_match = EMAIL_REGEX.search(document_text)
-    time_match = TIME_REGEX.search(document_text)
-    date_match = WEEKDAY_REGEX.search(document_text)
+_stats = {"turns": 0, "without_llm": 0}
 
-    name_match = re.search(
-        r"(?:my name is|i am|i'm|this is)\s+([A-Za-z][A-Za-z\s\.'-]{0,40})",
-        document_text,
-        re.IGNORECASE,
-    )
 
-    extracted = {
-        "name": name_match.group(1).strip() if name_match else None,
-        "email": email_match.group(0) if email_match else None,
-        "date": date_match.group(0) if date_match else None,
-        "time": time_match.group(0) if time_match else None,
+@track("booking_extract_regex")
+def deterministic_extract(document_text: str) -> Dict[str, Tuple[str, float]]:
+    """Scan once for every field; returns {field: (value, confidence)} for fields that matched."""
+    found: Dict[str, List[str]] = {}
+    for match in FIELD_REGEX.finditer(document_text):
+        field = match.lastgroup
+        if field == "name":
+            words = []
+            for word in match.group("name_value").split():
+                if word.lower() in NOT_NAMES:
+                    break
+                words.append(word)
+            if not words:
+                continue
+            value = " ".join(words)
+        else:
+            value = match.group(field)
+        found.setdefault(field, []).append(value.strip())
+
+    candidates: Dict[str, Tuple[str, float]] = {}
+    for field, values in found.items():
+        distinct = {value.lower() for value in values}
+        confidence = FIELD_CONFIDENCE[field] if len(distinct) == 1 else AMBIGUOUS
+        if field == "time" and BARE_TIME_REGEX.fullmatch(values[0]):
+            confidence = AMBIGUOUS
+        candidates[field] = (values[0], confidence)
+    logger.debug("Deterministic extractor candidates: %s", candidates)
+    return candidates
+
+
+def extraction_stats() -> Dict[str, Any]:
+    turns = _stats["turns"]
+    return {
+        **_stats,
+        "without_llm_share": round(_stats["without_llm"] / turns, 4) if turns else 0.0,
     }
-    logger.debug("Fallback extractor values: %s", extracted)
-    return extracted
 
 
 def _sanitize_data(data: Dict[str, Any], document_text: str) -> Dict[str, Optional[str]]:
@@ -137,9 +182,23 @@ def _parse_llm_json(raw_answer: str, document_text: str) -> Optional[Dict[str, O
     return None
 
 
-async def extract_booking_info(document_text: str) -> Dict[str, Optional[str]]:
-    """Ask the LLM for booking fields; lean on regex fallback if the reply is messy."""
+async def extract_booking_info(document_text: str, needed: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+    """Return booking fields, asking the LLM only for needed fields the regex pass did not settle.
+
+    needed defaults to all four; callers pass the fields a booking draft does not have yet.
+    """
     logger.info("Booking extractor called")
+    _stats["turns"] += 1
+    candidates = deterministic_extract(document_text)
+    result: Dict[str, Optional[str]] = {field: None for field in BOOKING_FIELDS}
+    for field, (value, confidence) in candidates.items():
+        if confidence >= settings.booking_fast_confidence:
+            result[field] = value
+    unresolved = [field for field in (needed if needed is not None else BOOKING_FIELDS) if not result.get(field)]
+    if not unresolved:
+        _stats["without_llm"] += 1
+        logger.debug("Booking fields settled without the LLM: %s", result)
+        return result
 
     system_prompt = (
         "You are a strict meeting booking extraction assistant.\\n"
@@ -186,21 +245,26 @@ async def extract_booking_info(document_text: str) -> Dict[str, Optional[str]]:
         {"role": "system", "content": system_prompt},
         {
             "role": "user",
-            "content": f"Extract the booking details from:\\n\\n{document_text}",
+            "content": (
+                f"Extract the booking details from:\\n\\n{document_text}\\n\\n"
+                f"Only these fields are needed: {', '.join(unresolved)}. Set every other field to null."
+            ),
         },
     ]
 
-    try:
-        raw_answer = await call_llm(messages)
-    except Exception as exc:
-        logger.warning("Booking extractor LLM call failed: %s", exc)
-        return _fallback_extract(document_text)
-
-    logger.debug("Raw extractor output: %s", raw_answer)
-
-    parsed = _parse_llm_json(raw_answer, document_text)
-    if parsed:
-        return parsed
+    parsed: Optional[Dict[str, Optional[str]]] = None
+    with track("booking_extract_llm"):
+        try:
+            raw_answer = await call_llm(messages)
+            logger.debug("Raw extractor output: %s", raw_answer)
+            parsed = _parse_llm_json(raw_answer, document_text)
+        except Exception as exc:
+            logger.warning("Booking extractor LLM call failed: %s", exc)
+    if not parsed:
+        logger.info("LLM output unusable, falling back to regex extraction")
+        parsed = {}
 
-    logger.info("LLM output unusable, falling back to regex extraction")
-    return _sanitize_data(_fallback_extract(document_text), document_text)
+    for field in unresolved:
+        # A low-confidence regex match still beats nothing when the LLM has no answer.
+        result[field] = parsed.get(field) or (candidates[field][0] if field in candidates else None)
+    return result
@@ -22,32 +22,20 @@ OBJECT_KEYWORDS = [
 ]
 
 
+# One precompiled pattern: any action verb followed later by any meeting noun. It also covers
+# the fixed phrases ("book an interview", "set up a call", ...) the detector used to check separately.
+BOOKING_REGEX = re.compile(
+    rf"\b(?:{'|'.join(re.escape(action) for action in ACTION_KEYWORDS)})\b"
+    rf".*\b(?:{'|'.join(re.escape(obj) for obj in OBJECT_KEYWORDS)})\b",
+    re.IGNORECASE,
+)
+
+
 def is_booking_request(text: str) -> bool:
     """Return True when the message looks like a booking request."""
     if not text:
         return False
-
-    lowered = text.lower()
-
-    # Look for verbs combined with the meeting/interview nouns in any order.
-    for action in ACTION_KEYWORDS:
-        for obj in OBJECT_KEYWORDS:
-            pattern = rf"\b{re.escape(action)}\b.*\b{obj}\b"
-            if re.search(pattern, lowered):
-                logger.debug("Detected booking intent via pattern '%s' then '%s'", action, obj)
-                return True
-
-    # Fallback simple phrases to catch common wording.
-    matched = any(phrase in lowered for phrase in [
-        "book me an interview",
-        "book an interview",
-        "book a meeting",
-        "schedule an interview",
-        "schedule a meeting",
-        "schedule a call",
-        "set up a call",
-        "set up a meeting",
-    ])
+    matched = BOOKING_REGEX.search(text) is not None
     if matched:
-        logger.debug("Detected booking intent via simple phrase")
+        logger.debug("Detected booking intent")
     return matched
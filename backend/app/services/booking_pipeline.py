@@ -1,59 +1,18 @@
 """Multi-turn booking handler that caches partial info and saves appointments."""
-import json
 import logging
 from datetime import datetime
 from typing import Any, Dict
 
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.redis_client import redis_client
 from app.models.booking import Booking
-from app.services.booking_extractor import extract_booking_info
-from app.services.date_normalizer import normalize_date_time
+from app.services.booking_extractor import BOOKING_FIELDS, extract_booking_info
+from app.services.date_normalizer import NP_TZ, normalize_date_time
+from app.services.session_state import SessionState
 
-BOOKING_DRAFT_PREFIX = "booking_draft:"
 logger = logging.getLogger(__name__)
 
 
-def _load_draft(session_id: str) -> Dict[str, Any]:
-    """Pull any partial booking info from Redis for this session."""
-    if redis_client is None:
-        logger.debug("Redis disabled; no draft to load for %s", session_id)
-        return {}
-    try:
-        raw = redis_client.get(f"{BOOKING_DRAFT_PREFIX}{session_id}")
-        return json.loads(raw) if raw else {}
-    except Exception as exc:
-        logger.warning("Failed to load booking draft for %s: %s", session_id, exc)
-        return {}
-
-
-def _save_draft(session_id: str, data: Dict[str, Any]) -> None:
-    """Cache partial booking info so we can ask for whatever is missing next turn."""
-    if redis_client is None:
-        return
-    try:
-        redis_client.set(f"{BOOKING_DRAFT_PREFIX}{session_id}", json.dumps(data), ex=60 * 60)
-    except Exception as exc:
-        logger.warning("Failed to save booking draft for %s: %s", session_id, exc)
-
-
-def _clear_draft(session_id: str) -> None:
-    """Remove any cached booking info once we successfully save it."""
-    if redis_client is None:
-        return
-    try:
-        redis_client.delete(f"{BOOKING_DRAFT_PREFIX}{session_id}")
-    except Exception as exc:
-        logger.warning("Failed to clear booking draft for %s: %s", session_id, exc)
-
-
-def has_booking_draft(session_id: str) -> bool:
-    """Check if we already have some info stored for this session."""
-    draft = _load_draft(session_id)
-    return bool(draft)
-
-
 def _missing_message(missing: list[str]) -> str:
     """Human-friendly ask for whatever booking fields we still need."""
     labels = {
@@ -70,12 +29,16 @@ def _missing_message(missing: list[str]) -> str:
     return f"I'm sorry, I didn't get {', '.join(parts[:-1])} or {parts[-1]}. Could you share them?"
 
 
-async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str, Any]:
-    """Collect booking details, ask for missing bits, then store the appointment."""
+async def handle_booking(user_id: str, user_text: str, db: AsyncSession, state: SessionState) -> Dict[str, Any]:
+    """Collect booking details, ask for missing bits, then store the appointment.
+
+    The draft comes from the turn's already-loaded state; changes are saved with the rest of the turn.
+    """
     logger.info("Handling booking request for session %s", user_id)
     # Merge this turn with any prior partial info for the session.
-    draft = _load_draft(user_id)
-    extracted = await extract_booking_info(user_text)
+    draft = state.draft
+    # Fields the draft already holds need no LLM help this turn.
+    extracted = await extract_booking_info(user_text, needed=[field for field in BOOKING_FIELDS if not draft.get(field)])
 
     merged = {
         "name": extracted.get("name") or draft.get("name"),
@@ -86,7 +49,7 @@ async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str,
 
     missing = [field for field, value in merged.items() if not value]
     if missing:
-        _save_draft(user_id, merged)
+        state.save_draft(merged)
         logger.info("Booking info still missing %s for session %s", missing, user_id)
         return {
             "error": True,
@@ -97,7 +60,7 @@ async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str,
 
     normalized = normalize_date_time(merged["date"], merged["time"])
     if not normalized:
-        _save_draft(user_id, merged)
+        state.save_draft(merged)
         logger.info("Could not normalize datetime for session %s: %s", user_id, merged)
         return {
             "error": True,
@@ -107,10 +70,11 @@ async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str,
         }
     normalized_date, normalized_time = normalized
 
+    # The normalizer resolves phrases in NP_TZ; keep that zone so the stored datetime is aware.
     meeting_datetime = datetime.strptime(
         f"{normalized_date} {normalized_time}",
         "%Y-%m-%d %H:%M"
-    )
+    ).replace(tzinfo=NP_TZ)
 
     booking = Booking(
         session_id=user_id,
@@ -122,11 +86,10 @@ async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str,
 
     try:
         db.add(booking)
-        db.commit()
-        db.refresh(booking)
+        await db.commit()
     except Exception as exc:
-        db.rollback()
-        _save_draft(user_id, merged)
+        await db.rollback()
+        state.save_draft(merged)
         logger.error("Failed to persist booking for session %s: %s", user_id, exc)
         return {
             "error": True,
@@ -142,7 +105,7 @@ async def handle_booking(user_id: str, user_text: str, db: Session) -> Dict[str,
     if merged.get("email"):
         confirmation_message += f" We'll reach out at {merged['email']}."
 
-    _clear_draft(user_id)
+    state.clear_draft()
     logger.info("Booking %s saved for session %s", booking.id, user_id)
     return {
         "error": False,
@@ -1,39 +1,165 @@
-"""Chat history helpers stored in Redis."""
+"""Chat history stored in Redis: a capped list per session plus an optional rolling summary.
+
+Reads and writes are queued on a caller's pipeline so a chat turn costs one round trip each way.
+"""
+import asyncio
 import logging
 import json
-from typing import List
+import re
+from typing import Any, List, Optional, Sequence, Set, Tuple
 
-from redis import RedisError
+from redis.exceptions import WatchError
 
-from app.core.redis_client import redis_client
+from app.core.config import settings
+from app.core.metrics import track
+from app.core.redis_client import async_redis_client
+from app.services.llm import call_llm
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_PREFIX = "chat_summary:"
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation. Keep names, dates, numbers and open questions; "
+    "drop pleasantries. Reply with the summary only, at most 150 words."
+)
+# deepseek-r1 prefixes replies with its reasoning.
+THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+_compacting: Set[str] = set()
+_background: Set[asyncio.Task] = set()
+
+
+def _history_key(session_id: str) -> str:
+    return f"chat:{session_id}"
+
+
+def _summary_key(session_id: str) -> str:
+    return f"{SUMMARY_PREFIX}{session_id}"
+
+
+def queue_history_read(pipe: Any, session_id: str, limit: Optional[int] = None) -> None:
+    """Queue GET summary + LRANGE tail; parse the two replies with parse_history."""
+    pipe.get(_summary_key(session_id))
+    pipe.lrange(_history_key(session_id), -limit if limit else 0, -1)
+
+
+def parse_history(summary: Optional[str], messages: Sequence[str]) -> List[dict]:
+    history = [json.loads(message) for message in messages]
+    if summary:
+        history.insert(0, {"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    return history
+
+
+def queue_append(pipe: Any, session_id: str, messages: Sequence[Tuple[str, str]]) -> None:
+    """Queue RPUSH of (role, content) messages, the LTRIM cap and the TTL refresh; RPUSH replies with the length."""
+    key = _history_key(session_id)
+    window = settings.chat_history_window
+    # With compaction on, keep a little slack past the window so old turns survive until summarized.
+    cap = window + 2 * settings.chat_summary_batch if settings.chat_summary_enabled else window
+    pipe.rpush(key, *(json.dumps({"role": role, "content": content}) for role, content in messages))
+    pipe.ltrim(key, -cap, -1)
+    pipe.expire(key, settings.chat_history_ttl)
+
+
+def after_append(session_id: str, length: int) -> None:
+    """Start background compaction once enough messages have piled up past the window."""
+    if not settings.chat_summary_enabled or length < settings.chat_history_window + settings.chat_summary_batch:
+        return
+    if session_id in _compacting:
+        return
+    _compacting.add(session_id)
+    task = asyncio.get_running_loop().create_task(compact_history(session_id))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
 
-def append_message(session_id: str, role: str, content: str) -> None:
-    key = f"chat:{session_id}"
-    message = json.dumps({"role": role, "content": content})
+
+async def append_messages(session_id: str, messages: Sequence[Tuple[str, str]]) -> None:
+    if async_redis_client is None or not messages:
+        return
     try:
-        if redis_client is None:
-            raise RuntimeError("Redis client not initialized.")
-        redis_client.rpush(key, message)
-    except RedisError as exc:
-        # Fail closed so we do not crash the request if Redis is down.
-        logger.warning("Redis unavailable while appending message: %s", exc)
+        pipe = async_redis_client.pipeline(transaction=False)
+        queue_append(pipe, session_id, messages)
+        with track("redis_append_messages"):
+            length = (await pipe.execute())[0]
     except Exception as exc:
-        logger.error("Unexpected error while appending message: %s", exc)
+        # Fail closed so we do not crash the request if Redis is down.
+        logger.warning("Redis unavailable while appending messages: %s", exc)
+        return
+    after_append(session_id, length)
 
 
-def get_history(session_id: str) -> List[dict]:
-    key = f"chat:{session_id}"
+async def get_history(session_id: str, limit: Optional[int] = None) -> List[dict]:
+    """Return the last limit messages (all kept ones if None), preceded by the rolling summary if any."""
+    if async_redis_client is None:
+        return []
     try:
-        if redis_client is None:
-            raise RuntimeError("Redis client not initialized.")
-        messages = redis_client.lrange(key, 0, -1)
-    except RedisError as exc:
+        pipe = async_redis_client.pipeline(transaction=False)
+        queue_history_read(pipe, session_id, limit)
+        with track("redis_get_history"):
+            summary, messages = await pipe.execute()
+    except Exception as exc:
         logger.warning("Redis unavailable while fetching history: %s", exc)
         return []
+    return parse_history(summary, messages)
+
+
+def _summarized_remaining(summarized: List[str], head: List[str]) -> int:
+    """How many summarized messages still lead the list.
+
+    Appends only add at the tail, but their cap LTRIM may have dropped some of the summarized
+    head while the LLM was running; those are gone already and must not be trimmed again.
+    """
+    for dropped in range(len(summarized) + 1):
+        remaining = summarized[dropped:]
+        if head[:len(remaining)] == remaining:
+            return len(remaining)
+    return 0
+
+
+async def _store_summary(client: Any, key: str, summary_key: str, summary: str, summarized: List[str]) -> int:
+    """Save the summary and trim exactly the summarized messages, atomically with respect to appends."""
+    async with client.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(key)
+                head = await pipe.lrange(key, 0, len(summarized) - 1)
+                remaining = _summarized_remaining(summarized, head)
+                pipe.multi()
+                pipe.set(summary_key, summary, ex=settings.chat_history_ttl)
+                if remaining:
+                    pipe.ltrim(key, remaining, -1)
+                await pipe.execute()
+                return remaining
+            except WatchError:
+                # An append landed between the read and the trim; look at the list again.
+                continue
+
+
+async def compact_history(session_id: str) -> None:
+    """Fold turns older than the window into the session summary, then trim them from the list."""
+    client = async_redis_client
+    key = _history_key(session_id)
+    summary_key = _summary_key(session_id)
+    try:
+        if client is None:
+            return
+        pipe = client.pipeline(transaction=False)
+        pipe.llen(key)
+        pipe.get(summary_key)
+        length, previous = await pipe.execute()
+        excess = length - settings.chat_history_window
+        if excess <= 0:
+            return
+        raw = await client.lrange(key, 0, excess - 1)
+        old = [json.loads(message) for message in raw]
+        transcript = "\n".join(f"{item['role']}: {item['content']}" for item in old)
+        summary = await call_llm([
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"},
+        ])
+        trimmed = await _store_summary(client, key, summary_key, THINK_BLOCK.sub("", summary).strip(), raw)
+        logger.info("Compacted %s messages of session %s into its summary", trimmed, session_id)
     except Exception as exc:
-        logger.error("Unexpected error while fetching history: %s", exc)
-        return []
-    return [json.loads(message) for message in messages]
+        logger.warning("History compaction failed for session %s: %s", session_id, exc)
+    finally:
+        _compacting.discard(session_id)
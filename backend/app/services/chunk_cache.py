@@ -0,0 +1,90 @@
+"""Persistent chunk-hash -> embedding cache so identical chunk text is never encoded twice."""
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.chunk_embedding import ChunkEmbedding
+from app.services.embedings import embed_chunks, model_id
+
+LOOKUP_BATCH = 500
+# Dialects with INSERT ... ON CONFLICT DO NOTHING; others fall back to a plain bulk insert.
+UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+EMBED_BATCH = 256
+logger = logging.getLogger(__name__)
+
+
+def chunk_hash(text: str) -> str:
+    """Hash chunk text together with the model identity so a model swap never reuses stale vectors."""
+    return hashlib.sha256(f"{model_id()}\x00{text}".encode("utf-8")).hexdigest()
+
+
+async def load_cached(session: AsyncSession, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+    found: Dict[str, np.ndarray] = {}
+    unique = list(dict.fromkeys(hashes))
+    for start in range(0, len(unique), LOOKUP_BATCH):
+        batch = unique[start:start + LOOKUP_BATCH]
+        rows = (await session.exec(select(ChunkEmbedding).where(ChunkEmbedding.chunk_hash.in_(batch)))).all()
+        for row in rows:
+            found[row.chunk_hash] = np.frombuffer(row.embedding, dtype=np.float32)
+    return found
+
+
+async def save_embeddings(session: AsyncSession, vectors: Dict[str, np.ndarray]) -> None:
+    """Insert vectors load_cached found missing; rows a concurrent ingest wrote first are kept."""
+    rows = [
+        {"chunk_hash": key, "embedding": np.asarray(vector, dtype=np.float32).tobytes()}
+        for key, vector in vectors.items()
+    ]
+    insert = UPSERT_INSERTS.get(session.bind.dialect.name)
+    try:
+        if insert is None:
+            session.add_all(ChunkEmbedding(**row) for row in rows)
+        else:
+            for start in range(0, len(rows), LOOKUP_BATCH):
+                await session.exec(
+                    insert(ChunkEmbedding).values(rows[start:start + LOOKUP_BATCH]).on_conflict_do_nothing()
+                )
+        await session.commit()
+    except Exception as exc:
+        # The cache is an optimization; a failed write must not fail ingestion.
+        await session.rollback()
+        logger.warning("Failed to persist chunk embeddings: %s", exc)
+
+
+async def embed_with_cache(
+    chunks: List[str],
+    session: AsyncSession,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[np.ndarray, int, int]:
+    """Return the embedding matrix for chunks plus (reused, embedded) counts."""
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    cached = await load_cached(session, hashes)
+
+    # Distinct texts still missing, in first-seen order.
+    missing: Dict[str, str] = {}
+    for key, chunk in zip(hashes, chunks):
+        if key not in cached and key not in missing:
+            missing[key] = chunk
+
+    fresh: Dict[str, np.ndarray] = {}
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), EMBED_BATCH):
+        keys = missing_keys[start:start + EMBED_BATCH]
+        vectors = await embed_chunks([missing[key] for key in keys])
+        fresh.update(zip(keys, np.asarray(vectors, dtype=np.float32)))
+        if progress:
+            progress(sum(1 for key in hashes if key in cached or key in fresh), len(chunks))
+    if fresh:
+        await save_embeddings(session, fresh)
+
+    lookup = {**cached, **fresh}
+    matrix = np.vstack([lookup[key] for key in hashes])
+    # Repeated text inside one document also counts as reused.
+    reused = len(chunks) - len(fresh)
+    logger.info("Chunk embeddings: %s reused, %s embedded", reused, len(fresh))
+    return matrix, reused, len(fresh)
@@ -1,12 +1,17 @@
 """Chunking utilities to split text before embedding."""
 import logging
-from typing import List
+from functools import lru_cache
+from typing import Iterator, List, Optional
 
+from app.core.config import settings
+from app.core.metrics import track
 from app.schema.document import ChunkStrategy
 # https://www.nb-data.com/p/9-chunking-strategis-to-improve-rag
 
 logger = logging.getLogger(__name__)
 
+SPACY_BLOCK_CHARS = 100_000
+
 
 def chunk_fixed(text: str, chunk_size: int = 500) -> List[str]:
     """Split text by word count, no overlap."""
@@ -14,15 +19,71 @@ def chunk_fixed(text: str, chunk_size: int = 500) -> List[str]:
     return [' '.join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
 
 
-def chunk_sentence(text: str) -> List[str]:
-    """Use spaCy sentence boundaries to chunk."""
+@lru_cache(maxsize=2)
+def _get_nlp(fast: bool):
+    """Load the sentence splitter once per process; fast mode is a rule-based sentencizer."""
     try:
         import spacy
-        nlp = spacy.load("en_core_web_sm")
+        if fast:
+            nlp = spacy.blank("en")
+            nlp.add_pipe("sentencizer")
+        else:
+            # Only the parser is needed for sentence boundaries.
+            nlp = spacy.load("en_core_web_sm", exclude=["tagger", "attribute_ruler", "lemmatizer", "ner"])
     except Exception as exc:
         raise RuntimeError("spaCy model 'en_core_web_sm' is not available. Please install it before using sentence chunking.") from exc
-    doc = nlp(text)
-    return [sent.text.strip() for sent in doc.sents]
+    return nlp
+
+
+def _text_blocks(text: str, max_chars: int = SPACY_BLOCK_CHARS) -> Iterator[str]:
+    """Cut text into paragraph-aligned blocks small enough for spaCy to stream."""
+    block: List[str] = []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        if block and size + len(paragraph) > max_chars:
+            yield "\n\n".join(block)
+            block, size = [], 0
+        # A single oversized paragraph still has to be split somewhere.
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            yield paragraph[:cut]
+            paragraph = paragraph[cut:]
+        block.append(paragraph)
+        size += len(paragraph)
+    if block:
+        yield "\n\n".join(block)
+
+
+def _split_sentences(text: str, fast: bool) -> Iterator[str]:
+    nlp = _get_nlp(fast)
+    for doc in nlp.pipe(_text_blocks(text), batch_size=8):
+        for sent in doc.sents:
+            sentence = sent.text.strip()
+            if sentence:
+                yield sentence
+
+
+def chunk_sentence(text: str, chunk_size: int = 200, overlap: int = 0, fast: Optional[bool] = None) -> List[str]:
+    """Pack consecutive spaCy sentences into chunks of about chunk_size words.
+
+    overlap repeats that many trailing sentences at the start of the next chunk.
+    """
+    fast = settings.sentence_chunk_fast if fast is None else fast
+    chunks: List[str] = []
+    current: List[str] = []
+    current_words = 0
+    for sentence in _split_sentences(text, fast):
+        words = len(sentence.split())
+        if current and current_words + words > chunk_size:
+            chunks.append(" ".join(current))
+            current = current[-overlap:] if 0 < overlap < len(current) else []
+            current_words = sum(len(s.split()) for s in current)
+        current.append(sentence)
+        current_words += words
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
 
 
 def chunk_sliding(text: str, chunk_size: int = 500, overlap: int = 200) -> List[str]:
@@ -36,6 +97,7 @@ def chunk_sliding(text: str, chunk_size: int = 500, overlap: int = 200) -> List[
     return chunks
 
 
+@track("chunk_text")
 def chunk_text(text: str, strategy: ChunkStrategy) -> List[str]:
     """Route to the chosen chunking strategy."""
     if strategy == ChunkStrategy.fixed:
@@ -0,0 +1,79 @@
+"""Post-retrieval diversification: maximal marginal relevance and merging of adjacent chunks."""
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def mmr_select(relevance: Sequence[float], vectors: np.ndarray, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """Pick k candidate indexes trading relevance against similarity to what is already picked.
+
+    The candidate similarity matrix is computed once; each round is a single vectorized argmax.
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms == 0, 1.0, norms)
+    similarity = matrix @ matrix.T
+
+    rel = np.asarray(relevance, dtype=np.float32)
+    top = rel.max()
+    if top > 0:
+        rel = rel / top
+
+    selected = [int(np.argmax(rel))]
+    # Highest similarity of every candidate to anything selected so far.
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, n):
+        scores = lambda_mult * rel - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, similarity[pick], out=redundancy)
+    return selected
+
+
+def _join_overlapping(left: str, right: str) -> str:
+    """Concatenate two neighbouring chunks, dropping the words they share at the seam."""
+    left_words, right_words = left.split(), right.split()
+    for size in range(min(len(left_words), len(right_words)), 0, -1):
+        if left_words[-size:] == right_words[:size]:
+            return " ".join(left_words + right_words[size:])
+    return f"{left} {right}"
+
+
+def merge_adjacent(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge chunks of the same document with consecutive chunk_ids into one span.
+
+    A span keeps its first chunk_id, lists every member in chunk_ids, and scores as its best member.
+    """
+    by_document: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    passthrough = []
+    for chunk in chunks:
+        if chunk.get("chunk_id") is None:
+            passthrough.append(chunk)
+        else:
+            by_document[chunk.get("document_id")].append(chunk)
+
+    spans: List[Dict[str, Any]] = []
+    for members in by_document.values():
+        members.sort(key=lambda c: c["chunk_id"])
+        current = None
+        for chunk in members:
+            last = current["chunk_ids"][-1] if current else None
+            if chunk["chunk_id"] == last:
+                continue
+            if last is not None and chunk["chunk_id"] == last + 1:
+                current["text"] = _join_overlapping(current["text"], chunk["text"])
+                current["chunk_ids"].append(chunk["chunk_id"])
+                current["score"] = max(current["score"], chunk["score"])
+                continue
+            current = {**chunk, "chunk_ids": [chunk["chunk_id"]]}
+            spans.append(current)
+
+    return sorted(spans + passthrough, key=lambda c: c["score"], reverse=True)
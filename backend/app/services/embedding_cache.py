@@ -0,0 +1,123 @@
+"""Query-embedding cache: bounded in-process LRU with an optional shared Redis tier."""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from redis import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import async_redis_bytes_client
+
+EMBED_CACHE_PREFIX = "qemb:"
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial variants share an entry."""
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """LRU of query vectors keyed by normalized text plus model identity."""
+
+    def __init__(self, max_size: int, ttl: int, use_redis: bool):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, model_id: str) -> str:
+        digest = hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"{EMBED_CACHE_PREFIX}{model_id}:{digest}"
+
+    async def get(self, text: str, model_id: str) -> Optional[np.ndarray]:
+        return (await self.get_many([text], model_id))[0]
+
+    async def get_many(self, texts: Sequence[str], model_id: str) -> List[Optional[np.ndarray]]:
+        """Vectors for texts in order (None on a miss); the Redis tier is asked once for all local misses."""
+        keys = [self.key(text, model_id) for text in texts]
+        vectors: List[Optional[np.ndarray]] = []
+        for key in keys:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            vectors.append(vector)
+
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        if missing:
+            shared = await self._redis_get([keys[index] for index in missing])
+            for index, vector in zip(missing, shared):
+                if vector is None:
+                    self.misses += 1
+                    continue
+                self.redis_hits += 1
+                self._remember(keys[index], vector)
+                vectors[index] = vector
+        return vectors
+
+    async def put(self, text: str, model_id: str, vector: np.ndarray) -> None:
+        await self.put_many([text], model_id, [vector])
+
+    async def put_many(self, texts: Sequence[str], model_id: str, vectors: Sequence[np.ndarray]) -> None:
+        entries = {self.key(text, model_id): np.asarray(vector, dtype=np.float32) for text, vector in zip(texts, vectors)}
+        for key, vector in entries.items():
+            self._remember(key, vector)
+        await self._redis_set(entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        vector.setflags(write=False)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _redis_get(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        if not self.use_redis or async_redis_bytes_client is None:
+            return [None] * len(keys)
+        try:
+            raws = await async_redis_bytes_client.mget(keys)
+        except RedisError as exc:
+            logger.warning("Redis unavailable while reading embedding cache: %s", exc)
+            return [None] * len(keys)
+        return [np.frombuffer(raw, dtype=np.float32) if raw else None for raw in raws]
+
+    async def _redis_set(self, entries: Dict[str, np.ndarray]) -> None:
+        if not self.use_redis or async_redis_bytes_client is None or not entries:
+            return
+        try:
+            async with async_redis_bytes_client.pipeline(transaction=False) as pipe:
+                for key, vector in entries.items():
+                    pipe.set(key, vector.tobytes(), ex=self.ttl)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning("Redis unavailable while writing embedding cache: %s", exc)
+
+
+query_cache = QueryEmbeddingCache(
+    max_size=settings.embed_cache_size,
+    ttl=settings.embed_cache_ttl,
+    use_redis=settings.embed_cache_redis,
+)
@@ -1,26 +1,217 @@
-"""Embedding helper using sentence-transformers."""
+"""Embedding helper using sentence-transformers; the model loads at startup warm-up or on first use.
+
+The backend (float32 torch, int8 torch or ONNX Runtime) and its thread count come from settings;
+all of them run the same MiniLM weights and return vectors of the same shape.
+"""
+import asyncio
 import logging
-from typing import Iterable, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
 
-from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+from app.core.metrics import track
+from app.services.embedding_cache import query_cache
 
+MODEL_NAME = "all-MiniLM-L6-v2"
 logger = logging.getLogger(__name__)
 
-try:
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-except Exception as exc:
-    model = None
-    logger.error("Failed to load embedding model: %s", exc)
+WARM_UP_TEXT = "warm-up"
+# torch dtype of the torch_int8 backend's quantized Linear weights; part of model_id().
+INT8_DTYPE = "qint8"
 
+# Anything with SentenceTransformer's encode() works; benchmarks assign stand-ins here.
+model = None
+_model_error: Optional[str] = None
+_model_lock = threading.Lock()
 
-async def embed_chunks(chunks: Union[str, Iterable[str]]):
-    """Encode text or chunks into dense vectors."""
+# One worker keeps encode calls serialized off the event loop; the backend parallelizes inside a call.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+_background: Set[asyncio.Task] = set()
+
+
+def _load_torch(threads: int) -> Any:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+    return SentenceTransformer(MODEL_NAME, device="cpu")
+
+
+def _load_torch_int8(threads: int) -> Any:
+    """float32 model with its Linear layers swapped for dynamically quantized int8 ones (CPU only)."""
+    import torch
+
+    encoder = _load_torch(threads)
+    torch.ao.quantization.quantize_dynamic(encoder, {torch.nn.Linear}, dtype=getattr(torch, INT8_DTYPE), inplace=True)
+    return encoder
+
+
+def _load_onnx(threads: int) -> Any:
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs: Dict[str, Any] = {"file_name": settings.embedding_onnx_file, "provider": "CPUExecutionProvider"}
+    if threads:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = options
+    return SentenceTransformer(MODEL_NAME, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+
+BACKENDS: Dict[str, Callable[[int], Any]] = {
+    "torch": _load_torch,
+    "torch_int8": _load_torch_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend(name: str, threads: int = 0) -> Any:
+    """Build an encoder for backend name; used by load_model and by benchmarks comparing backends."""
+    if name not in BACKENDS:
+        raise RuntimeError(f"Unknown embedding backend '{name}'. Expected one of {sorted(BACKENDS)}.")
+    return BACKENDS[name](threads)
+
+
+def model_id() -> str:
+    """Identity of the vectors the configured backend produces, for cache keys; torch keeps the bare name.
+
+    Includes what changes the vectors within a backend: the ONNX export file and the int8 dtype.
+    """
+    backend = settings.embedding_backend
+    if backend == "torch":
+        return MODEL_NAME
+    if backend == "onnx":
+        return f"{MODEL_NAME}@onnx:{settings.embedding_onnx_file}"
+    if backend == "torch_int8":
+        return f"{MODEL_NAME}@torch_int8:{INT8_DTYPE}"
+    return f"{MODEL_NAME}@{backend}"
+
+
+def load_model():
+    """Load the model once, importing sentence-transformers (and torch) only now; a failure is remembered."""
+    global model, _model_error
+    if model is not None:
+        return model
+    with _model_lock:
+        if model is None and _model_error is None:
+            try:
+                model = load_backend(settings.embedding_backend, settings.embedding_threads)
+                logger.info("Loaded embedding model %s with the %s backend", MODEL_NAME, settings.embedding_backend)
+            except Exception as exc:
+                _model_error = str(exc)
+                logger.error("Failed to load embedding model: %s", exc)
     if model is None:
-        raise RuntimeError("Embedding model is not available. Ensure sentence-transformers assets are installed.")
+        raise RuntimeError(
+            f"Embedding model is not available. Ensure sentence-transformers assets are installed: {_model_error}"
+        )
+    return model
+
 
+def _encode(texts: Union[str, List[str]]) -> np.ndarray:
+    """Run the model synchronously; meant to be called on the embedding worker thread."""
+    encoder = load_model()
     try:
-        embeddings = model.encode(chunks)
-        return embeddings
+        return encoder.encode(texts)
     except Exception as exc:
         logger.error("Failed to generate embeddings: %s", exc)
         raise RuntimeError(f"Failed to generate embeddings: {exc}") from exc
+
+
+class QueryBatcher:
+    """Collect queries that arrive within a short window and encode them in one call."""
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window = window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.loop = asyncio.get_running_loop()
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def embed(self, query: str) -> np.ndarray:
+        future = self.loop.create_future()
+        self._pending.append((query, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = self.loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = self.loop.create_task(self._run(batch))
+            # The loop only holds tasks weakly; keep a reference until the batch is done.
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vectors = await self.loop.run_in_executor(_executor, _encode, texts)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        logger.debug("Encoded query micro-batch of %s", len(texts))
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+_batcher: Optional[QueryBatcher] = None
+
+
+def _get_batcher() -> QueryBatcher:
+    """Return the batcher bound to the running event loop."""
+    global _batcher
+    if _batcher is None or _batcher.loop is not asyncio.get_running_loop():
+        _batcher = QueryBatcher(settings.embed_batch_window_ms, settings.embed_max_batch_size)
+    return _batcher
+
+
+async def embed_query(query: str) -> np.ndarray:
+    """Encode one query off the event loop, micro-batched with concurrent callers; cached by text."""
+    cached = await query_cache.get(query, model_id())
+    if cached is not None:
+        return cached
+    with track("embed_query"):
+        vector = await _get_batcher().embed(query)
+    await query_cache.put(query, model_id(), vector)
+    return vector
+
+
+async def embed_queries(queries: Sequence[str]) -> List[np.ndarray]:
+    """Encode many queries with one backend call (for batch retrieval); cached vectors are reused."""
+    key = model_id()
+    vectors = await query_cache.get_many(queries, key)
+    missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+    if missing:
+        with track("embed_query_batch"):
+            encoded = await asyncio.get_running_loop().run_in_executor(_executor, _encode, missing)
+        fresh = dict(zip(missing, encoded))
+        await query_cache.put_many(list(fresh), key, list(fresh.values()))
+        vectors = [fresh[query] if vector is None else vector for query, vector in zip(queries, vectors)]
+    return vectors
+
+
+async def warm_up() -> None:
+    """Load the model and run one encode on the embedding thread, so the first request pays neither."""
+    await asyncio.get_running_loop().run_in_executor(_executor, _encode, [WARM_UP_TEXT])
+
+
+async def embed_chunks(chunks: Union[str, Iterable[str]]):
+    """Encode text or chunks into dense vectors."""
+    if isinstance(chunks, str):
+        return await embed_query(chunks)
+    with track("embed_chunks"):
+        return await asyncio.get_running_loop().run_in_executor(_executor, _encode, list(chunks))
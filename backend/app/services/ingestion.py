@@ -0,0 +1,291 @@
+"""Ingestion pipeline shared by the upload endpoint and background jobs."""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.document import Document
+from app.schema.document import ChunkStrategy, DocIngest
+from app.services.answer_cache import answer_cache
+from app.services.chunk_cache import chunk_hash, embed_with_cache
+from app.services.chunker import chunk_text
+from app.services.lexical import encode_documents
+from app.services.text_extractor import extract_text
+from app.services.vector_store import (
+    delete_document_points,
+    ensure_collection,
+    fetch_document_points,
+    renumber_chunks,
+    store_vectors,
+)
+
+logger = logging.getLogger(__name__)
+
+# Called with (phase, chunks_done, chunks_total).
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class IngestionError(Exception):
+    """A pipeline failure carrying the HTTP status the caller should report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def find_duplicate(session: AsyncSession, content_hash: Optional[str], chunking_strategy: ChunkStrategy) -> Optional[Document]:
+    """Return an already-ingested document with identical contents and chunking, if any."""
+    if not content_hash:
+        return None
+    result = await session.exec(
+        select(Document)
+        .where(Document.content_hash == content_hash)
+        .where(Document.chunking_strategy == chunking_strategy.value)
+    )
+    return result.first()
+
+
+async def _extract_and_chunk(
+    path: str,
+    filename: str,
+    content_type: str,
+    chunking_strategy: ChunkStrategy,
+    report: Callable[..., None],
+) -> List[str]:
+    report("extracting")
+    try:
+        text = await run_in_threadpool(extract_text, path, content_type=content_type, filename=filename)
+    except ValueError as exc:
+        raise IngestionError(400, str(exc))
+    except Exception as exc:
+        logger.error("Failed to extract text: %s", exc)
+        raise IngestionError(500, "Failed to extract text from file")
+
+    try:
+        await run_in_threadpool(ensure_collection)
+    except Exception as exc:
+        logger.error("Vector store unavailable: %s", exc)
+        raise IngestionError(503, f"Vector store unavailable: {exc}")
+
+    report("chunking")
+    try:
+        chunks = await run_in_threadpool(chunk_text, text, chunking_strategy)
+    except Exception as exc:
+        raise IngestionError(500, f"Chunking failed: {exc}")
+    if not chunks:
+        raise IngestionError(400, "chunking failed, no chunks created")
+    return chunks
+
+
+async def ingest_file(
+    path: str,
+    filename: str,
+    content_type: str,
+    chunking_strategy: ChunkStrategy,
+    session: AsyncSession,
+    progress: Optional[ProgressCallback] = None,
+    content_hash: Optional[str] = None,
+) -> DocIngest:
+    """Extract, chunk, embed, and store a spooled file; heavy steps run off the event loop."""
+    loop = asyncio.get_running_loop()
+
+    def report(phase: str, done: int = 0, total: int = 0) -> None:
+        if progress:
+            progress(phase, done, total)
+
+    existing = await find_duplicate(session, content_hash, chunking_strategy)
+    if existing is not None:
+        logger.info("Upload %s matches document %s; skipping ingest", filename, existing.external_id)
+        return DocIngest(
+            document_id=existing.external_id,
+            external_id=existing.external_id,
+            chunking_strategy=chunking_strategy,
+            num_chunks=existing.num_chunks or 0,
+            chunks_reused=existing.num_chunks or 0,
+            status="Document already ingested"
+        )
+
+    chunks = await _extract_and_chunk(path, filename, content_type, chunking_strategy, report)
+
+    total = len(chunks)
+    report("embedding", 0, total)
+    try:
+        embeddings, reused, embedded = await embed_with_cache(
+            chunks, session, progress=lambda done, _: report("embedding", done, total)
+        )
+    except Exception as exc:
+        logger.error("Embedding failed: %s", exc)
+        raise IngestionError(500, f"Embedding failed: {exc}")
+    if len(embeddings) != total:
+        raise IngestionError(500, "embedding failed, not same number of embeddings and chunks")
+
+    external_id = str(uuid4())
+    doc = Document(
+        filename=filename,
+        external_id=external_id,
+        content_type=content_type,
+        content_hash=content_hash,
+        chunking_strategy=chunking_strategy.value,
+        num_chunks=total
+    )
+    try:
+        session.add(doc)
+        await session.commit()
+    except Exception as exc:
+        await session.rollback()
+        logger.error("Failed to persist document metadata: %s", exc)
+        raise IngestionError(500, f"Failed to persist document metadata: {exc}")
+
+    report("storing", 0, total)
+    try:
+        sparse_vectors = await run_in_threadpool(encode_documents, chunks)
+        await run_in_threadpool(
+            store_vectors,
+            ids=[str(uuid4()) for _ in chunks],
+            vectors=embeddings,
+            payloads=[
+                {
+                    "text": chunk,
+                    "document_id": external_id,
+                    "chunk_id": i,
+                    "filename": filename
+                }
+                for i, chunk in enumerate(chunks)
+            ],
+            # store_vectors runs on a worker thread; hop back to the loop to report.
+            on_progress=lambda done: loop.call_soon_threadsafe(report, "storing", done, total),
+            sparse_vectors=sparse_vectors,
+        )
+    except Exception as exc:
+        # Drop the metadata row so a retry of the same file is not deduplicated to an empty document.
+        try:
+            await session.delete(doc)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+        logger.error("Failed to store vectors for document %s: %s", external_id, exc)
+        raise IngestionError(503, f"Failed to store vector: {exc}")
+
+    answer_cache.invalidate_document(external_id)
+    logger.info("Document %s stored with %s chunks", external_id, total)
+    return DocIngest(
+        document_id=external_id,
+        external_id=external_id,
+        chunking_strategy=chunking_strategy,
+        num_chunks=total,
+        chunks_reused=reused,
+        chunks_embedded=embedded,
+        status="Document ingested successfully"
+    )
+
+
+async def update_document(
+    doc: Document,
+    path: str,
+    filename: str,
+    content_type: str,
+    chunking_strategy: ChunkStrategy,
+    session: AsyncSession,
+    content_hash: Optional[str] = None,
+) -> DocIngest:
+    """Re-chunk a new version of a document and touch only the chunks that changed."""
+    external_id = doc.external_id
+    if content_hash and content_hash == doc.content_hash and chunking_strategy.value == doc.chunking_strategy:
+        return DocIngest(
+            document_id=external_id,
+            external_id=external_id,
+            chunking_strategy=chunking_strategy,
+            num_chunks=doc.num_chunks or 0,
+            chunks_reused=doc.num_chunks or 0,
+            status="Document unchanged"
+        )
+
+    chunks = await _extract_and_chunk(path, filename, content_type, chunking_strategy, lambda *args: None)
+
+    try:
+        existing = await run_in_threadpool(fetch_document_points, external_id)
+    except Exception as exc:
+        logger.error("Failed to load stored chunks for document %s: %s", external_id, exc)
+        raise IngestionError(503, f"Vector store unavailable: {exc}")
+
+    # Old points by text hash; each can be claimed once, preferring the same position.
+    stored: Dict[str, List[Any]] = defaultdict(list)
+    for point in existing:
+        payload = point.payload or {}
+        stored[chunk_hash(payload.get("text", ""))].append((payload.get("chunk_id"), point.id))
+
+    renumber: Dict[Any, int] = {}
+    new_positions: List[int] = []
+    for position, chunk in enumerate(chunks):
+        candidates = stored.get(chunk_hash(chunk))
+        if not candidates:
+            new_positions.append(position)
+            continue
+        match = next((c for c in candidates if c[0] == position), candidates[0])
+        candidates.remove(match)
+        old_chunk_id, point_id = match
+        if old_chunk_id != position:
+            renumber[point_id] = position
+    stale_ids = [point_id for leftovers in stored.values() for _, point_id in leftovers]
+
+    embedded = 0
+    try:
+        if new_positions:
+            new_chunks = [chunks[i] for i in new_positions]
+            vectors, _, embedded = await embed_with_cache(new_chunks, session)
+            sparse_vectors = await run_in_threadpool(encode_documents, new_chunks)
+            await run_in_threadpool(
+                store_vectors,
+                ids=[str(uuid4()) for _ in new_positions],
+                vectors=vectors,
+                payloads=[
+                    {
+                        "text": chunks[i],
+                        "document_id": external_id,
+                        "chunk_id": i,
+                        "filename": filename
+                    }
+                    for i in new_positions
+                ],
+                sparse_vectors=sparse_vectors,
+            )
+        await run_in_threadpool(delete_document_points, external_id, stale_ids)
+        await run_in_threadpool(renumber_chunks, renumber)
+    except Exception as exc:
+        logger.error("Failed to update vectors for document %s: %s", external_id, exc)
+        raise IngestionError(503, f"Failed to update vectors: {exc}")
+
+    doc.filename = filename
+    doc.content_type = content_type
+    doc.content_hash = content_hash
+    doc.chunking_strategy = chunking_strategy.value
+    doc.num_chunks = len(chunks)
+    try:
+        session.add(doc)
+        await session.commit()
+    except Exception as exc:
+        await session.rollback()
+        logger.error("Failed to persist document metadata: %s", exc)
+        raise IngestionError(500, f"Failed to persist document metadata: {exc}")
+
+    answer_cache.invalidate_document(external_id)
+    logger.info(
+        "Document %s updated: %s new, %s kept (%s renumbered), %s deleted",
+        external_id, len(new_positions), len(chunks) - len(new_positions), len(renumber), len(stale_ids),
+    )
+    return DocIngest(
+        document_id=external_id,
+        external_id=external_id,
+        chunking_strategy=chunking_strategy,
+        num_chunks=len(chunks),
+        chunks_reused=len(chunks) - embedded,
+        chunks_embedded=embedded,
+        chunks_deleted=len(stale_ids),
+        status="Document updated"
+    )
@@ -0,0 +1,195 @@
+"""Background ingestion: persisted jobs drained by a bounded pool of asyncio workers."""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from uuid import uuid4
+
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_engine, new_session
+from app.models.ingestion_job import IngestionJob
+from app.schema.document import ChunkStrategy
+from app.services.ingestion import IngestionError, ingest_file
+from app.services.upload_store import SpooledUpload
+
+UNFINISHED_STATUSES = ("queued", "running")
+logger = logging.getLogger(__name__)
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+# Job ids waiting in the queue, so the startup scan can't queue a job the API already queued.
+_queued: Set[str] = set()
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue()
+    return _queue
+
+
+async def create_job(session: AsyncSession, upload: SpooledUpload, filename: str, content_type: str, chunking_strategy: ChunkStrategy) -> IngestionJob:
+    """Record a queued job for an upload already spooled to disk."""
+    job = IngestionJob(
+        job_id=str(uuid4()),
+        filename=filename,
+        content_type=content_type,
+        file_path=upload.path,
+        content_hash=upload.sha256,
+        chunking_strategy=chunking_strategy.value,
+    )
+    session.add(job)
+    await session.commit()
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: str) -> Optional[IngestionJob]:
+    return (await session.exec(select(IngestionJob).where(IngestionJob.job_id == job_id))).first()
+
+
+async def _update_job(job_id: str, **fields) -> None:
+    """Write job fields in a short-lived session so status reads see them immediately."""
+    try:
+        async with new_session() as session:
+            job = await get_job(session, job_id)
+            if job is None:
+                return
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.now(timezone.utc)
+            session.add(job)
+            await session.commit()
+    except Exception as exc:
+        logger.warning("Failed to update ingestion job %s: %s", job_id, exc)
+
+
+async def _write_progress(job_id: str, updates: asyncio.Queue) -> None:
+    """Persist progress in arrival order, skipping to the newest when writes fall behind; None stops it."""
+    while True:
+        latest = await updates.get()
+        stop = latest is None
+        while not stop and not updates.empty():
+            update = updates.get_nowait()
+            if update is None:
+                stop = True
+            else:
+                latest = update
+        if latest is not None:
+            phase, done, total = latest
+            await _update_job(job_id, phase=phase, chunks_done=done, chunks_total=total)
+        if stop:
+            return
+
+
+async def enqueue(job_id: str) -> None:
+    if job_id in _queued:
+        return
+    _queued.add(job_id)
+    await _get_queue().put(job_id)
+
+
+async def _claim_job(session: AsyncSession, job_id: str) -> bool:
+    """Move a queued job to running; False when another worker already claimed it."""
+    result = await session.exec(
+        update(IngestionJob)
+        .where(IngestionJob.job_id == job_id, IngestionJob.status == "queued")
+        .values(status="running", error=None, updated_at=datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def _run_job(job_id: str) -> None:
+    async with new_session() as session:
+        if not await _claim_job(session, job_id):
+            return
+        job = await get_job(session, job_id)
+        path, filename, content_type, content_hash = job.file_path, job.filename, job.content_type, job.content_hash
+        strategy = ChunkStrategy(job.chunking_strategy)
+
+        logger.info("Running ingestion job %s for %s", job_id, filename)
+
+        # The pipeline reports progress synchronously; one writer task keeps those updates ordered.
+        updates: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(_write_progress(job_id, updates))
+
+        def progress(phase: str, done: int, total: int) -> None:
+            updates.put_nowait((phase, done, total))
+
+        try:
+            result = await ingest_file(
+                path, filename, content_type, strategy, session, progress=progress, content_hash=content_hash
+            )
+        except IngestionError as exc:
+            fields = {"status": "failed", "error": exc.detail}
+            logger.warning("Ingestion job %s failed: %s", job_id, exc.detail)
+        except Exception as exc:
+            fields = {"status": "failed", "error": str(exc)}
+            logger.error("Ingestion job %s crashed: %s", job_id, exc)
+        else:
+            fields = {"status": "completed", "phase": None, "document_id": result.document_id}
+            logger.info("Ingestion job %s completed as document %s", job_id, result.document_id)
+        finally:
+            updates.put_nowait(None)
+            await writer
+        await _update_job(job_id, **fields)
+
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+async def _worker(index: int) -> None:
+    queue = _get_queue()
+    while True:
+        job_id = await queue.get()
+        _queued.discard(job_id)
+        try:
+            await _run_job(job_id)
+        except Exception as exc:
+            logger.error("Ingestion worker %s failed on job %s: %s", index, job_id, exc)
+        finally:
+            queue.task_done()
+
+
+async def start_workers() -> None:
+    """Spawn the worker pool and requeue jobs left unfinished by a previous process."""
+    if async_engine is None:
+        logger.warning("Database engine unavailable; ingestion workers not started.")
+        return
+    os.makedirs(settings.ingestion_job_dir, exist_ok=True)
+    async with new_session() as session:
+        # No worker runs yet, so a "running" job was interrupted by a restart and can be claimed again.
+        await session.exec(
+            update(IngestionJob)
+            .where(IngestionJob.status == "running")
+            .values(status="queued", updated_at=datetime.now(timezone.utc))
+        )
+        await session.commit()
+        pending = (await session.exec(
+            select(IngestionJob)
+            .where(IngestionJob.status.in_(UNFINISHED_STATUSES))
+            .order_by(IngestionJob.id)
+        )).all()
+    for job in pending:
+        await enqueue(job.job_id)
+    if pending:
+        logger.info("Requeued %s unfinished ingestion jobs", len(pending))
+
+    for index in range(max(1, settings.ingestion_workers)):
+        _workers.append(asyncio.create_task(_worker(index)))
+
+
+async def stop_workers() -> None:
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queued.clear()
+    _queue = None
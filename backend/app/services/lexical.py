@@ -0,0 +1,49 @@
+"""Sparse lexical vectors (BM25-style term weights) stored next to the dense ones in Qdrant."""
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from qdrant_client import models
+
+# Keeps identifiers such as "AB-1234", "E_1021" or "v2.3.1" whole, and also indexes their parts.
+TOKEN_REGEX = re.compile(r"\w+(?:[-./:]\w+)*")
+PART_SPLIT = re.compile(r"[-./:_]")
+# BM25 term-frequency saturation; Qdrant applies IDF at query time via the collection modifier.
+BM25_K1 = 1.2
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_REGEX.findall(text.lower()):
+        tokens.append(token)
+        parts = [part for part in PART_SPLIT.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def _term_index(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+
+def _sparse(weights: Dict[int, float]) -> models.SparseVector:
+    indices = sorted(weights)
+    return models.SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def encode_document(text: str) -> models.SparseVector:
+    """Saturated term frequencies for one chunk."""
+    counts: Counter = Counter()
+    for token in tokenize(text):
+        counts[_term_index(token)] += 1
+    return _sparse({index: tf * (BM25_K1 + 1) / (tf + BM25_K1) for index, tf in counts.items()})
+
+
+def encode_documents(texts: Iterable[str]) -> List[models.SparseVector]:
+    return [encode_document(text) for text in texts]
+
+
+def encode_query(text: str) -> models.SparseVector:
+    """Each distinct query term counts once."""
+    return _sparse({_term_index(token): 1.0 for token in tokenize(text)})
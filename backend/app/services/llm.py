@@ -1,32 +1,127 @@
 """Thin wrapper to call the configured chat LLM."""
+import asyncio
+import json
 import logging
-import requests
-from requests import RequestException
+from typing import AsyncIterator, Optional
+
+import httpx
 
 from app.core.config import settings
+from app.core.metrics import record_llm_tokens, track
 
 logger = logging.getLogger(__name__)
 
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for the Ollama endpoint, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=settings.ollama_url,
+            timeout=httpx.Timeout(settings.llm_read_timeout, connect=settings.llm_connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+            ),
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Cap how many generations we run against the Ollama host at once."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+    return _semaphore
+
+
+async def close_llm_client() -> None:
+    """Close the pooled client; called from the app shutdown hook."""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _semaphore = None
+
+
+async def ping_llm() -> None:
+    """Ask Ollama to load the model: a chat request with no messages loads it without generating."""
+    try:
+        response = await _get_client().post(
+            "/api/chat", json={"model": settings.ollama_model, "messages": [], "stream": False}
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"LLM ping failed: {exc}") from exc
+
+
 async def call_llm(messages: list[dict]) -> str:
     """Send a chat-style request to the LLM and return the content string."""
     payload = {
-        "model": "deepseek-r1:1.5b",
+        "model": settings.ollama_model,
         "messages": messages,
         "stream": False
     }
-    url = f"{settings.ollama_url}/api/chat"
 
+    response = None
     try:
-        response = requests.post(url, json=payload, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        return data["message"]["content"]
-    except RequestException as exc:
+        with track("llm"):
+            async with _get_semaphore():
+                response = await _get_client().post("/api/chat", json=payload)
+            response.raise_for_status()
+            data = response.json()
+            content = data["message"]["content"]
+        record_llm_tokens(data)
+        return content
+    except asyncio.CancelledError:
+        # The caller went away; httpx drops the in-flight connection and the slot is released.
+        logger.info("LLM request cancelled")
+        raise
+    except httpx.HTTPError as exc:
         logger.error("LLM request failed: %s", exc)
         raise RuntimeError(f"LLM request failed: {exc}") from exc
     except KeyError:
-        logger.error("LLM response missing expected content: %s", response.text if 'response' in locals() else "no response")
+        logger.error("LLM response missing expected content: %s", response.text if response is not None else "no response")
         raise RuntimeError("LLM response missing expected content.")
     except Exception as exc:
         logger.error("Unexpected LLM error: %s", exc)
         raise RuntimeError(f"Unexpected LLM error: {exc}") from exc
+
+
+async def stream_llm(messages: list[dict]) -> AsyncIterator[str]:
+    """Stream the LLM reply, yielding content tokens as Ollama produces them."""
+    payload = {
+        "model": settings.ollama_model,
+        "messages": messages,
+        "stream": True
+    }
+
+    try:
+        with track("llm_stream"):
+            async with _get_semaphore():
+                async with _get_client().stream("POST", "/api/chat", json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise RuntimeError(f"LLM stream error: {data['error']}")
+                        token = data.get("message", {}).get("content")
+                        if token:
+                            yield token
+                        if data.get("done"):
+                            record_llm_tokens(data)
+                            break
+    except asyncio.CancelledError:
+        logger.info("LLM stream cancelled")
+        raise
+    except httpx.HTTPError as exc:
+        logger.error("LLM stream failed: %s", exc)
+        raise RuntimeError(f"LLM request failed: {exc}") from exc
+    except json.JSONDecodeError as exc:
+        logger.error("LLM stream returned malformed line: %s", exc)
+        raise RuntimeError(f"LLM stream returned malformed data: {exc}") from exc
@@ -1,31 +1,127 @@
-from typing import Any, Dict, List
-def build_prompt(history: List[Dict[str, Any]], retrieved_chunks: List[Dict[str, Any]], question: str) -> List[Dict[str, str]]:
-    """Lay out the system context, a few recent turns, and the user's question."""
+"""Build chat prompts that combine system, context, history, and user question within token budgets."""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that answers ONLY using the provided context. "
+    "Use chat history only for conversational continuity, not as a factual source. "
+    "If the context does not contain the answer, reply: 'I don't have information about that.'"
+)
+CONTEXT_HEADER = "Context:\n\n"
+CHUNK_SEPARATOR = "\n\n---\n\n"
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# A truncated chunk shorter than this is more noise than context.
+MIN_PARTIAL_TOKENS = 32
+
+
+def _truncate_to_sentences(text: str, budget: int) -> str:
+    """Keep whole leading sentences of text that fit in budget tokens."""
+    kept: List[str] = []
+    used = 0
+    for sentence in SENTENCE_END.split(text):
+        tokens = count_tokens(sentence)
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    return " ".join(kept)
+
+
+def pack_context(retrieved_chunks: List[Dict[str, Any]], budget: int) -> Tuple[str, int, int]:
+    """Pack chunk texts best-score first; returns (context, tokens used, chunks included)."""
+    separator_tokens = count_tokens(CHUNK_SEPARATOR)
+    parts: List[str] = []
+    used = 0
+    for chunk in sorted(retrieved_chunks, key=lambda c: c.get("score") or 0.0, reverse=True):
+        overhead = separator_tokens if parts else 0
+        remaining = budget - used - overhead
+        if remaining <= 0:
+            break
+        text = chunk["text"]
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            text = _truncate_to_sentences(text, remaining)
+            if not text:
+                # Its first sentence alone is too long; a later, shorter chunk may still fit.
+                continue
+            tokens = count_tokens(text)
+        parts.append(text)
+        used += overhead + tokens
+    return CHUNK_SEPARATOR.join(parts), used, len(parts)
+
+
+def pack_history(history: List[Dict[str, Any]], budget: int, max_turns: int) -> Tuple[List[Dict[str, str]], int]:
+    """Keep the newest turns that fit in budget; older turns, then the rolling summary, are dropped first."""
+    summaries = [item for item in history if item.get("role") == "system"]
+    turns = [item for item in history if item.get("role") != "system"]
+    kept: List[Dict[str, str]] = []
+    used = 0
+    for item in reversed(turns[-max_turns:] if max_turns > 0 else []):
+        tokens = count_tokens(item["content"])
+        if used + tokens > budget:
+            break
+        kept.append({"role": item["role"], "content": item["content"]})
+        used += tokens
+    else:
+        # The summary covers turns older than any kept one, so it only goes in once every recent turn fit.
+        for item in reversed(summaries):
+            tokens = count_tokens(item["content"])
+            if used + tokens > budget:
+                break
+            kept.append({"role": item["role"], "content": item["content"]})
+            used += tokens
+    kept.reverse()
+    return kept, used
+
+
+def build_prompt(
+    history: List[Dict[str, Any]],
+    retrieved_chunks: List[Dict[str, Any]],
+    question: str,
+    usage: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, str]]:
+    """Lay out the system context, recent turns, and the user's question; pass usage to get token counts."""
+    # The pipeline records the user turn before building the prompt; do not send the question twice.
+    if history and history[-1].get("role") == "user" and history[-1].get("content") == question:
+        history = history[:-1]
+
+    system_tokens = count_tokens(SYSTEM_PROMPT)
+    if system_tokens > settings.prompt_system_tokens:
+        logger.warning("System prompt uses %s tokens, over its budget of %s", system_tokens, settings.prompt_system_tokens)
+
+    context_str, context_tokens, chunks_used = pack_context(retrieved_chunks, settings.prompt_context_tokens)
+    history_messages, history_tokens = pack_history(history, settings.prompt_history_tokens, settings.prompt_history_turns)
+    question_tokens = count_tokens(question)
+
+    if usage is not None:
+        usage.update({
+            "system": system_tokens,
+            "context": context_tokens,
+            "history": history_tokens,
+            "question": question_tokens,
+            "total": system_tokens + context_tokens + history_tokens + question_tokens,
+            "context_chunks": chunks_used,
+            "history_turns": len(history_messages),
+        })
+
     system_message = {
             "role": "system",
-            "content": (
-                "You are a helpful assistant that answers ONLY using the provided context. "
-                "Use chat history only for conversational continuity, not as a factual source. "
-                "If the context does not contain the answer, reply: 'I don't have information about that.'"
-            )
+            "content": SYSTEM_PROMPT
         }
-    chunk_text = [chunk['text'] for chunk in retrieved_chunks]
-    context_str="\n\n---\n\n".join(chunk_text)
     context_message = {
             "role": "system",
-            "content": f"Context:\n\n{context_str}"
+            "content": f"{CONTEXT_HEADER}{context_str}"
         }
-    history_messages = []
-    recent_history = history[-6:]
-    for item in recent_history:
-        history_messages.append({
-            "role": item['role'],
-            "content": item['content']
-        })
     user_message = {
             "role": "user",
             "content": question
         }
     return [system_message, context_message] + history_messages + [user_message]
-"""Build chat prompts that combine system, context, history, and user question."""
-
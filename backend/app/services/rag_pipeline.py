@@ -1,25 +1,43 @@
 """RAG pipeline: grab history, retrieve context, and ask the LLM for an answer."""
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from app.services.chat_memory import append_message, get_history
+from app.services.answer_cache import answer_cache
+from app.services.embedings import embed_query
 from app.services.retriever import retrieve_chunks
 from app.services.prompt_builder import build_prompt
-from app.services.llm import call_llm
+from app.services.llm import call_llm, stream_llm
+from app.services.session_state import SessionState
 
 logger = logging.getLogger(__name__)
 
 
-async def answer_question(session_id: str, question: str, document_id: Optional[str], db: Any) -> Dict[str, Any]:
-    """Retrieve relevant context and ask the LLM to answer the user's question."""
-    # db is accepted for interface symmetry; the flow is read-only right now.
-    logger.info("Answering question for session %s", session_id)
+def _normalize_document_id(document_id: Optional[str]) -> Optional[str]:
     # Treat empty/whitespace IDs as absent so we only restrict when a real ID is provided.
-    doc_id = document_id.strip() if document_id and document_id.strip() else None
+    return document_id.strip() if document_id and document_id.strip() else None
+
+
+async def _cached_answer(session_id: str, question: str, doc_id: Optional[str]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Look up a semantically close answer; returns the query vector for a later store."""
+    if not answer_cache.enabled:
+        return None, None
+    try:
+        vector = await embed_query(question)
+    except Exception as exc:
+        logger.warning("Answer cache lookup skipped for session %s: %s", session_id, exc)
+        return None, None
+    return vector, answer_cache.lookup(vector, doc_id)
 
-    append_message(session_id, "user", question)
+
+async def _prepare_prompt(
+    state: SessionState, question: str, doc_id: Optional[str]
+) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], Dict[str, int]]:
+    """Record the user turn, retrieve context, and build the LLM messages plus per-section token usage."""
+    session_id = state.session_id
+    state.add_message("user", question)
     # Always use the session history so multi-turn flows work even when switching documents.
-    history = get_history(session_id)
+    history = state.history
 
     try:
         retrieved_chunks = await retrieve_chunks(question, document_id=doc_id)
@@ -27,17 +45,77 @@ async def answer_question(session_id: str, question: str, document_id: Optional[
         logger.error("Retrieval failed for session %s: %s", session_id, exc)
         raise RuntimeError(f"Retrieval failed: {exc}") from exc
 
-    messages = build_prompt(history, retrieved_chunks, question)
+    usage: Dict[str, int] = {}
+    messages = build_prompt(history, retrieved_chunks, question, usage=usage)
+    logger.debug("Prompt tokens for session %s: %s", session_id, usage)
+    return messages, retrieved_chunks, usage
+
+
+async def answer_question(state: SessionState, question: str, document_id: Optional[str], db: Any) -> Dict[str, Any]:
+    """Retrieve relevant context and ask the LLM to answer the user's question; the caller saves state."""
+    session_id = state.session_id
+    # db is accepted for interface symmetry; the flow is read-only right now.
+    logger.info("Answering question for session %s", session_id)
+    doc_id = _normalize_document_id(document_id)
+
+    query_vector, cached = await _cached_answer(session_id, question, doc_id)
+    if cached:
+        logger.info("Serving cached answer for session %s", session_id)
+        state.add_message("user", question)
+        state.add_message("assistant", cached["answer"])
+        return {"answer": cached["answer"], "sources": cached["sources"]}
+
+    messages, retrieved_chunks, usage = await _prepare_prompt(state, question, doc_id)
 
+    started = time.perf_counter()
     try:
         answer = await call_llm(messages)
     except Exception as exc:
         logger.error("LLM call failed for session %s: %s", session_id, exc)
         raise RuntimeError(f"LLM call failed: {exc}") from exc
 
-    append_message(session_id, "assistant", answer)
+    if query_vector is not None:
+        answer_cache.store(query_vector, doc_id, answer, retrieved_chunks, time.perf_counter() - started)
+    state.add_message("assistant", answer)
     logger.debug("RAG answer produced for session %s", session_id)
     return {
         "answer": answer,
-        "sources": retrieved_chunks
+        "sources": retrieved_chunks,
+        "prompt_tokens": usage
     }
+
+
+async def stream_answer(state: SessionState, question: str, document_id: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield a sources event, then answer tokens; record the full answer in state once the stream ends."""
+    session_id = state.session_id
+    logger.info("Streaming answer for session %s", session_id)
+    doc_id = _normalize_document_id(document_id)
+
+    query_vector, cached = await _cached_answer(session_id, question, doc_id)
+    if cached:
+        logger.info("Serving cached answer for session %s", session_id)
+        state.add_message("user", question)
+        yield {"event": "sources", "data": cached["sources"]}
+        yield {"event": "token", "data": cached["answer"]}
+        state.add_message("assistant", cached["answer"])
+        return
+
+    messages, retrieved_chunks, usage = await _prepare_prompt(state, question, doc_id)
+    yield {"event": "sources", "data": retrieved_chunks}
+    yield {"event": "prompt_tokens", "data": usage}
+
+    started = time.perf_counter()
+    parts: List[str] = []
+    try:
+        async for token in stream_llm(messages):
+            parts.append(token)
+            yield {"event": "token", "data": token}
+    except Exception as exc:
+        logger.error("LLM stream failed for session %s: %s", session_id, exc)
+        raise RuntimeError(f"LLM call failed: {exc}") from exc
+
+    answer = "".join(parts)
+    if query_vector is not None:
+        answer_cache.store(query_vector, doc_id, answer, retrieved_chunks, time.perf_counter() - started)
+    state.add_message("assistant", answer)
+    logger.debug("Streamed RAG answer completed for session %s", session_id)
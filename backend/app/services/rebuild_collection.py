@@ -0,0 +1,25 @@
+"""Offline rebuild of a collection created before sparse vectors, into the configured profile.
+
+Stop the app (or at least ingestion) first: points written to the old collection during the copy
+would be lost, and the rebuild refuses to finish if the point count changed.
+
+Run from the backend directory: python -m app.services.rebuild_collection [--name palm_docs]
+"""
+import argparse
+import logging
+
+from app.services.vector_store import rebuild_collection
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default="palm_docs")
+    parser.add_argument("--page-size", type=int, default=256)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    target = rebuild_collection(args.name, page_size=args.page_size)
+    print(f"{args.name} now points to {target}")
+
+
+if __name__ == "__main__":
+    main()
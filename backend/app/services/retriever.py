@@ -1,51 +1,131 @@
-"""Vector retrieval against Qdrant with optional document filter."""
+"""Vector retrieval against Qdrant with optional document filter; dense or hybrid (dense + lexical, RRF)."""
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from app.services.embedings import embed_chunks
-from app.services.vector_store import qdrant
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import track
+from app.services.diversify import merge_adjacent, mmr_select
+from app.services.embedings import embed_queries, embed_query
+from app.services.lexical import encode_query
+from app.services.vector_store import SPARSE_VECTOR_NAME, CollectionProfile, collection_profile, get_client, supports_sparse
 from qdrant_client import models
 
+COLLECTION = "palm_docs"
+RETRIEVAL_MODES = ("dense", "hybrid")
 logger = logging.getLogger(__name__)
 
 
-async def retrieve_chunks(query: str, document_id: Optional[str] = None, top_k: int = 5) -> List[Dict[str, Any]]:
-    document_id = document_id.strip() if document_id and document_id.strip() else None
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
 
-    if qdrant is None:
-        raise RuntimeError("Qdrant client is unavailable. Please start Qdrant before querying.")
 
-    try:
-        query_embedding = await embed_chunks(query)
-        vector = query_embedding.tolist()
-    except Exception as exc:
-        logger.error("Failed to embed query: %s", exc)
-        raise RuntimeError(f"Failed to embed query: {exc}") from exc
+def _document_filter(document_id: Optional[str]) -> Optional[models.Filter]:
+    if not document_id:
+        return None
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="document_id",
+                match=models.MatchValue(value=document_id)
+            )
+        ]
+    )
 
-    q_filter = None
-    if document_id:
-        q_filter = models.Filter(
-            must=[
-                models.FieldCondition(
-                    key="document_id",
-                    match=models.MatchValue(value=document_id)
-                )
-            ]
-        )
 
-    try:
-        response = qdrant.query_points(
-            collection_name="palm_docs",
-            query=vector,
-            limit=top_k,
-            with_payload=True,
-            query_filter=q_filter
-        )
-    except Exception as exc:
-        logger.error("Failed to query Qdrant: %s", exc)
-        raise RuntimeError(f"Failed to query Qdrant: {exc}") from exc
+def _dense_vector(point: models.ScoredPoint) -> Optional[List[float]]:
+    # Collections with a sparse vector return every vector by name; the dense one is unnamed.
+    if isinstance(point.vector, dict):
+        return point.vector.get("")
+    return point.vector
+
+
+@track("qdrant_query_dense")
+def dense_search(
+    vector: List[float],
+    q_filter: Optional[models.Filter],
+    limit: int,
+    name: str = COLLECTION,
+    with_vectors: bool = False,
+    profile: Optional[CollectionProfile] = None,
+) -> List[models.ScoredPoint]:
+    response = get_client().query_points(
+        collection_name=name,
+        query=vector,
+        limit=limit,
+        with_payload=True,
+        with_vectors=with_vectors,
+        query_filter=q_filter,
+        search_params=(profile or collection_profile()).search_params(),
+    )
+    return response.points
+
 
-    results = response.points
+@track("qdrant_query_lexical")
+def lexical_search(
+    query: str,
+    q_filter: Optional[models.Filter],
+    limit: int,
+    name: str = COLLECTION,
+    with_vectors: bool = False,
+) -> List[models.ScoredPoint]:
+    sparse = encode_query(query)
+    if not sparse.indices:
+        return []
+    response = get_client().query_points(
+        collection_name=name,
+        query=sparse,
+        using=SPARSE_VECTOR_NAME,
+        limit=limit,
+        with_payload=True,
+        with_vectors=[""] if with_vectors else False,
+        query_filter=q_filter
+    )
+    return response.points
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[models.ScoredPoint]], k: int, limit: int) -> List[models.ScoredPoint]:
+    """Fuse ranked lists by summing 1 / (k + rank); the fused score replaces the leg scores."""
+    fused: Dict[Any, float] = {}
+    points: Dict[Any, models.ScoredPoint] = {}
+    for ranking in rankings:
+        for rank, point in enumerate(ranking, start=1):
+            fused[point.id] = fused.get(point.id, 0.0) + 1.0 / (k + rank)
+            points.setdefault(point.id, point)
+    ordered = sorted(fused, key=fused.get, reverse=True)[:limit]
+    return [points[point_id].model_copy(update={"score": fused[point_id]}) for point_id in ordered]
+
+
+def diversify_points(points: List[models.ScoredPoint], top_k: int, lambda_mult: float) -> List[models.ScoredPoint]:
+    """Re-rank over-fetched points with MMR on their dense vectors."""
+    candidates = [point for point in points if _dense_vector(point) is not None]
+    if len(candidates) <= top_k:
+        return candidates
+    vectors = np.array([_dense_vector(point) for point in candidates], dtype=np.float32)
+    picks = mmr_select([point.score for point in candidates], vectors, top_k, lambda_mult)
+    return [candidates[i] for i in picks]
+
+
+def _candidate_limits(top_k: int, diversify: bool, hybrid: bool) -> Tuple[int, int]:
+    """(pool, limit): points kept after fusion, and points each search leg fetches."""
+    pool = max(top_k, settings.mmr_candidates) if diversify else top_k
+    # Each leg over-fetches so fusion can promote chunks that only one leg ranks highly.
+    limit = max(pool, settings.hybrid_candidates) if hybrid else pool
+    return pool, limit
+
+
+def _to_chunks(
+    results: List[models.ScoredPoint],
+    top_k: int,
+    diversify: bool,
+    timings: Dict[str, float],
+) -> List[Dict[str, Any]]:
+    start = time.perf_counter()
+    if diversify:
+        results = diversify_points(results, top_k, settings.mmr_lambda)
 
     chunks = []
     for item in results:
@@ -56,4 +136,156 @@ async def retrieve_chunks(query: str, document_id: Optional[str] = None, top_k:
             "score": item.score
         })
 
+    if diversify:
+        chunks = merge_adjacent(chunks)
+        timings["diversify_ms"] = _elapsed_ms(start)
+    return chunks
+
+
+def _resolve_options(mode: Optional[str], diversify: Optional[bool]) -> Tuple[str, bool]:
+    mode = mode or settings.retrieval_mode
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{mode}'. Expected one of {RETRIEVAL_MODES}.")
+    return mode, settings.retrieval_diversify if diversify is None else diversify
+
+
+def _search_legs(
+    query: str,
+    vector: List[float],
+    q_filter: Optional[models.Filter],
+    top_k: int,
+    hybrid: bool,
+    diversify: bool,
+    timings: Dict[str, float],
+) -> Tuple[List[models.ScoredPoint], bool]:
+    """Dense search, plus lexical search and RRF when hybrid; returns the points and whether fusion ran."""
+    hybrid = hybrid and supports_sparse(COLLECTION)
+    pool, limit = _candidate_limits(top_k, diversify, hybrid)
+
+    start = time.perf_counter()
+    results = dense_search(vector, q_filter, limit, with_vectors=diversify)
+    timings["dense_ms"] = _elapsed_ms(start)
+
+    if hybrid:
+        start = time.perf_counter()
+        lexical = lexical_search(query, q_filter, limit, with_vectors=diversify)
+        timings["lexical_ms"] = _elapsed_ms(start)
+
+        start = time.perf_counter()
+        results = reciprocal_rank_fusion([results, lexical], settings.rrf_k, pool)
+        timings["fusion_ms"] = _elapsed_ms(start)
+    return results, hybrid
+
+
+async def retrieve_chunks(
+    query: str,
+    document_id: Optional[str] = None,
+    top_k: int = 5,
+    mode: Optional[str] = None,
+    timings: Optional[Dict[str, float]] = None,
+    diversify: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """Return the top_k chunks for query; pass a dict as timings to receive per-stage milliseconds.
+
+    diversify over-fetches, picks top_k by MMR and merges adjacent chunks of a document into spans.
+    """
+    document_id = document_id.strip() if document_id and document_id.strip() else None
+    mode, diversify = _resolve_options(mode, diversify)
+    timings = {} if timings is None else timings
+
+    start = time.perf_counter()
+    try:
+        query_embedding = await embed_query(query)
+        vector = query_embedding.tolist()
+    except Exception as exc:
+        logger.error("Failed to embed query: %s", exc)
+        raise RuntimeError(f"Failed to embed query: {exc}") from exc
+    timings["embed_ms"] = _elapsed_ms(start)
+
+    q_filter = _document_filter(document_id)
+    try:
+        # The Qdrant client is synchronous; both search legs share one hop off the event loop.
+        results, hybrid = await run_in_threadpool(
+            _search_legs, query, vector, q_filter, top_k, mode == "hybrid", diversify, timings
+        )
+    except Exception as exc:
+        logger.error("Failed to query Qdrant: %s", exc)
+        raise RuntimeError(f"Failed to query Qdrant: {exc}") from exc
+
+    chunks = _to_chunks(results, top_k, diversify, timings)
+    logger.debug("Retrieval (%s) timings: %s", "hybrid" if hybrid else "dense", timings)
     return chunks
+
+
+@track("qdrant_query_batch")
+def search_batch(requests: List[models.QueryRequest], name: str = COLLECTION) -> List[List[models.ScoredPoint]]:
+    """Run many searches in one Qdrant round trip; results come back in request order."""
+    if not requests:
+        return []
+    responses = get_client().query_batch_points(collection_name=name, requests=requests)
+    return [response.points for response in responses]
+
+
+async def retrieve_batch(
+    queries: Sequence[Tuple[str, Optional[str], int]],
+    mode: Optional[str] = None,
+    diversify: Optional[bool] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """retrieve_chunks for many (query, document_id, top_k) triples: one encode and one Qdrant call.
+
+    Results are per query, in input order. Callers split very large batches; see settings.retrieval_batch_size.
+    """
+    mode, diversify = _resolve_options(mode, diversify)
+    timings = {} if timings is None else timings
+    if not queries:
+        return []
+
+    start = time.perf_counter()
+    try:
+        vectors = await embed_queries([query for query, _, _ in queries])
+    except Exception as exc:
+        logger.error("Failed to embed queries: %s", exc)
+        raise RuntimeError(f"Failed to embed queries: {exc}") from exc
+    timings["embed_ms"] = _elapsed_ms(start)
+
+    try:
+        hybrid = mode == "hybrid" and supports_sparse(COLLECTION)
+        params = collection_profile().search_params()
+        requests: List[models.QueryRequest] = []
+        # Per query: (pool, index of its dense request, index of its lexical request or None).
+        plan: List[Tuple[int, int, Optional[int]]] = []
+        for (query, document_id, top_k), vector in zip(queries, vectors):
+            document_id = document_id.strip() if document_id and document_id.strip() else None
+            q_filter = _document_filter(document_id)
+            pool, limit = _candidate_limits(top_k, diversify, hybrid)
+            requests.append(models.QueryRequest(
+                query=vector.tolist(), filter=q_filter, limit=limit,
+                with_payload=True, with_vector=diversify, params=params,
+            ))
+            dense_index, lexical_index = len(requests) - 1, None
+            sparse = encode_query(query) if hybrid else None
+            if sparse is not None and sparse.indices:
+                requests.append(models.QueryRequest(
+                    query=sparse, using=SPARSE_VECTOR_NAME, filter=q_filter, limit=limit,
+                    with_payload=True, with_vector=diversify,
+                ))
+                lexical_index = len(requests) - 1
+            plan.append((pool, dense_index, lexical_index))
+
+        start = time.perf_counter()
+        responses = await run_in_threadpool(search_batch, requests)
+        timings["search_ms"] = _elapsed_ms(start)
+    except Exception as exc:
+        logger.error("Failed to query Qdrant: %s", exc)
+        raise RuntimeError(f"Failed to query Qdrant: {exc}") from exc
+
+    results = []
+    for (_, _, top_k), (pool, dense_index, lexical_index) in zip(queries, plan):
+        points = responses[dense_index]
+        if hybrid:
+            lexical = responses[lexical_index] if lexical_index is not None else []
+            points = reciprocal_rank_fusion([points, lexical], settings.rrf_k, pool)
+        results.append(_to_chunks(points, top_k, diversify, {}))
+    logger.debug("Batch retrieval of %s queries (%s) timings: %s", len(queries), mode, timings)
+    return results
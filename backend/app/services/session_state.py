@@ -0,0 +1,84 @@
+"""Per-turn session state: one pipelined Redis read when a chat turn starts, one batched write when it ends."""
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import track
+from app.core.redis_client import async_redis_client
+from app.services.chat_memory import after_append, parse_history, queue_append, queue_history_read
+
+BOOKING_DRAFT_PREFIX = "booking_draft:"
+BOOKING_DRAFT_TTL = 60 * 60
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionState:
+    """Draft and history read at the start of a turn, plus the writes to flush at its end."""
+    session_id: str
+    draft: Dict[str, Any] = field(default_factory=dict)
+    history: List[dict] = field(default_factory=list)
+    new_messages: List[Tuple[str, str]] = field(default_factory=list)
+    draft_dirty: bool = False
+
+    def add_message(self, role: str, content: str) -> None:
+        self.new_messages.append((role, content))
+        self.history.append({"role": role, "content": content})
+
+    def save_draft(self, data: Dict[str, Any]) -> None:
+        self.draft = dict(data)
+        self.draft_dirty = True
+
+    def clear_draft(self) -> None:
+        self.draft = {}
+        self.draft_dirty = True
+
+
+def _draft_key(session_id: str) -> str:
+    return f"{BOOKING_DRAFT_PREFIX}{session_id}"
+
+
+async def load_session(session_id: str, history_limit: Optional[int] = None) -> SessionState:
+    """Fetch the booking draft, rolling summary and history tail in a single round trip."""
+    state = SessionState(session_id=session_id)
+    if async_redis_client is None:
+        return state
+    limit = settings.prompt_history_turns if history_limit is None else history_limit
+    try:
+        pipe = async_redis_client.pipeline(transaction=False)
+        pipe.get(_draft_key(session_id))
+        queue_history_read(pipe, session_id, limit)
+        with track("redis_load_session"):
+            raw_draft, summary, messages = await pipe.execute()
+        state.draft = json.loads(raw_draft) if raw_draft else {}
+        state.history = parse_history(summary, messages)
+    except Exception as exc:
+        # Fail closed: the turn proceeds without history rather than erroring.
+        logger.warning("Failed to load session state for %s: %s", session_id, exc)
+    return state
+
+
+async def save_session(state: SessionState) -> None:
+    """Flush the turn's messages and draft change in a single round trip."""
+    if async_redis_client is None or not (state.new_messages or state.draft_dirty):
+        return
+    try:
+        pipe = async_redis_client.pipeline(transaction=False)
+        if state.new_messages:
+            queue_append(pipe, state.session_id, state.new_messages)
+        if state.draft_dirty:
+            if state.draft:
+                pipe.set(_draft_key(state.session_id), json.dumps(state.draft), ex=BOOKING_DRAFT_TTL)
+            else:
+                pipe.delete(_draft_key(state.session_id))
+        with track("redis_save_session"):
+            results = await pipe.execute()
+    except Exception as exc:
+        logger.warning("Failed to save session state for %s: %s", state.session_id, exc)
+        return
+    if state.new_messages:
+        after_append(state.session_id, results[0])
+    state.new_messages = []
+    state.draft_dirty = False
@@ -1,13 +1,22 @@
 """Read PDF or text files and return plain text."""
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
-from typing import Literal, Optional
+from typing import List, Literal, Optional, Union
 
-import pdfplumber
+from app.core.config import settings
+from app.core.metrics import track
 
 SupportedFileType = Literal["pdf", "txt"]
+Source = Union[bytes, str, os.PathLike]
 logger = logging.getLogger(__name__)
 
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
 
 def _detect_file_type(content_type: Optional[str], filename: Optional[str]) -> Optional[SupportedFileType]:
     """Infer file type from content-type header or file extension."""
@@ -27,35 +36,92 @@ def _detect_file_type(content_type: Optional[str], filename: Optional[str]) -> O
     return None
 
 
-def _extract_text_from_pdf(contents: bytes) -> str:
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Lazily start the page-extraction process pool (spawned, so no inherited torch threads)."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        # Extraction runs in threadpool threads; without the lock two ingests could each start a pool.
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=settings.pdf_extract_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[str]:
+    """Worker entry point: open the PDF and extract pages [start, end)."""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        pages = []
+        for page in pdf.pages[start:end]:
+            pages.append(page.extract_text() or "")
+            # Release the parsed layout so long ranges don't accumulate memory.
+            page.flush_cache()
+        return pages
+
+
+def _extract_text_from_pdf(source: Source) -> str:
+    # Imported here, not at module load: most deployments ingest PDFs far less often than they start.
+    import pdfplumber
+
     text = []
-    buffer = BytesIO(contents)
     try:
-        with pdfplumber.open(buffer) as pdf:
-            for page in pdf.pages:
-                text.append(page.extract_text() or "")
+        if isinstance(source, bytes):
+            with pdfplumber.open(BytesIO(source)) as pdf:
+                for page in pdf.pages:
+                    text.append(page.extract_text() or "")
+            return "\n".join(text)
+
+        path = os.fspath(source)
+        with pdfplumber.open(path) as pdf:
+            page_count = len(pdf.pages)
+        step = max(1, settings.pdf_pages_per_task)
+        if settings.pdf_extract_workers <= 1 or page_count < settings.pdf_parallel_min_pages:
+            text = _extract_page_range(path, 0, page_count)
+        else:
+            starts = list(range(0, page_count, step))
+            ends = [min(start + step, page_count) for start in starts]
+            # map() yields in submission order, so pages come back in document order.
+            for pages in _get_pdf_pool().map(_extract_page_range, [path] * len(starts), starts, ends):
+                text.extend(pages)
+            logger.debug("Extracted %s PDF pages across %s ranges", page_count, len(starts))
     except Exception as exc:
         logger.error("Failed to read PDF: %s", exc)
         raise RuntimeError(f"Failed to read PDF: {exc}") from exc
     return "\n".join(text)
 
 
-def _extract_text_from_txt(contents: bytes) -> str:
+def _extract_text_from_txt(source: Source) -> str:
     try:
-        return contents.decode("utf-8", errors="ignore")
+        if not isinstance(source, bytes):
+            with open(source, "rb") as handle:
+                source = handle.read()
+        return source.decode("utf-8", errors="ignore")
     except Exception as exc:
         logger.error("Failed to decode text file: %s", exc)
         raise RuntimeError(f"Failed to decode text file: {exc}") from exc
 
 
-def extract_text(contents: bytes, content_type: Optional[str] = None, filename: Optional[str] = None) -> str:
-    """Extract text from PDF or TXT; raise if unsupported."""
+@track("extract_text")
+def extract_text(source: Source, content_type: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """Extract text from PDF or TXT bytes or a file path; raise if unsupported."""
     file_type = _detect_file_type(content_type, filename)
 
     if file_type == "pdf":
-        return _extract_text_from_pdf(contents)
+        return _extract_text_from_pdf(source)
     if file_type == "txt":
-        return _extract_text_from_txt(contents)
+        return _extract_text_from_txt(source)
 
     logger.error("Unsupported file type: %s / %s", content_type, filename)
     raise ValueError("Unsupported file type. Please upload a PDF or TXT file.")
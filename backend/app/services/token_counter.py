@@ -0,0 +1,39 @@
+"""Token counting for prompt budgeting: the LLM's own tokenizer when configured, else a fast estimate."""
+import logging
+import re
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+# BPE vocabularies keep short words whole and split long ones roughly every six characters.
+CHARS_PER_EXTRA_TOKEN = 6
+
+
+@lru_cache(maxsize=1)
+def _get_tokenizer(name: Optional[str]):
+    """Load the Hugging Face tokenizer once; None falls back to the estimate."""
+    if not name:
+        return None
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name)
+    except Exception as exc:
+        logger.warning("Tokenizer %s unavailable, estimating token counts instead: %s", name, exc)
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 + (len(piece) - 1) // CHARS_PER_EXTRA_TOKEN for piece in TOKEN_PIECES.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer(settings.prompt_tokenizer)
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False))
@@ -0,0 +1,61 @@
+"""Stream uploads to a temp file on disk, hashing and size-checking as we go."""
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+READ_CHUNK_BYTES = 1024 * 1024
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the configured max size."""
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    sha256: str
+    size: int
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def spool_upload(file: UploadFile, directory: Optional[str] = None, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """Copy an upload to disk in fixed-size reads, computing its SHA-256 on the fly."""
+    max_bytes = settings.max_upload_bytes if max_bytes is None else max_bytes
+    directory = directory or settings.upload_dir
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    suffix = os.path.splitext(file.filename or "")[1]
+
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(prefix="upload-", suffix=suffix, dir=directory, delete=False)
+    try:
+        with handle:
+            while True:
+                block = await file.read(READ_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit.")
+                digest.update(block)
+                handle.write(block)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+
+    logger.debug("Spooled upload %s to %s (%s bytes)", file.filename, handle.name, size)
+    return SpooledUpload(path=handle.name, sha256=digest.hexdigest(), size=size)
@@ -1,49 +1,299 @@
 """Qdrant client setup plus helpers to ensure collections and store vectors."""
 import logging
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
 
+import numpy as np
 from qdrant_client import QdrantClient, models
 from qdrant_client.http import exceptions as qdrant_exceptions
 
+from app.core.config import settings
+from app.core.metrics import track
+
 logger = logging.getLogger(__name__)
 
-try:
-    qdrant: Optional[QdrantClient] = QdrantClient(url="http://localhost:6333", timeout=40)
-except Exception as exc:
-    qdrant = None
-    logger.error("Failed to initialize Qdrant client: %s", exc)
+# Named sparse vector holding lexical term weights next to the unnamed dense vector.
+SPARSE_VECTOR_NAME = "bm25"
+QUANTIZATION_MODES = ("none", "int8")
+# Retrieval filters on document_id, and document updates scroll and delete by it.
+PAYLOAD_INDEXES = {"document_id": models.PayloadSchemaType.KEYWORD}
+_sparse_support: Dict[str, bool] = {}
+# Existing collections already checked against the profile by this process.
+_checked: Set[str] = set()
+# Serializes collection creation, the first profile check (and migration) and offline rebuilds.
+_collection_lock = threading.Lock()
+
+def _create_client() -> QdrantClient:
+    if settings.qdrant_url == ":memory:":
+        return QdrantClient(location=":memory:")
+    return QdrantClient(url=settings.qdrant_url, timeout=settings.qdrant_timeout)
+
 
+# Created on first use (normally the startup warm-up) so importing this module never touches the network.
+qdrant: Optional[QdrantClient] = None
+_client_lock = threading.Lock()
 
-def _require_client() -> QdrantClient:
-    """Return the shared Qdrant client or raise if unavailable."""
-    if qdrant is None:
-        raise RuntimeError("Qdrant is unavailable. Ensure the service is running at http://localhost:6333.")
+
+def get_client() -> QdrantClient:
+    """Return the shared Qdrant client, creating it on first call; raise if it cannot be created."""
+    global qdrant
+    if qdrant is not None:
+        return qdrant
+    with _client_lock:
+        if qdrant is None:
+            try:
+                qdrant = _create_client()
+            except Exception as exc:
+                logger.error("Failed to initialize Qdrant client: %s", exc)
+                raise RuntimeError(f"Qdrant is unavailable. Ensure the service is running at {settings.qdrant_url}.") from exc
     return qdrant
 
 
-def ensure_collection(name: str = "palm_docs", vector_size: int = 384):
-    """Create the collection if it does not exist."""
-    client = _require_client()
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Index and storage settings for a collection, plus the search-time parameters that go with them."""
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: int = 128
+    quantization: str = "none"
+    rescore: bool = True
+    oversampling: float = 2.0
+    on_disk_vectors: bool = False
+
+    def quantization_config(self) -> Optional[models.ScalarQuantization]:
+        if self.quantization == "none":
+            return None
+        if self.quantization != "int8":
+            raise ValueError(f"Unknown quantization '{self.quantization}'. Expected one of {QUANTIZATION_MODES}.")
+        # Quantized vectors stay in RAM; with on_disk_vectors the float32 originals are only read to rescore.
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+
+    def search_params(self) -> models.SearchParams:
+        quantization = None
+        if self.quantization != "none":
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+
+def collection_profile() -> CollectionProfile:
+    return CollectionProfile(
+        hnsw_m=settings.qdrant_hnsw_m,
+        hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
+        search_ef=settings.qdrant_search_ef,
+        quantization=settings.qdrant_quantization,
+        rescore=settings.qdrant_quantization_rescore,
+        oversampling=settings.qdrant_quantization_oversampling,
+        on_disk_vectors=settings.qdrant_on_disk_vectors,
+    )
+
+
+def _resolve_alias(client: QdrantClient, name: str) -> str:
+    """The collection behind name; migrations that rebuild a collection leave name as an alias."""
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return name
+
+
+def _create_collection(client: QdrantClient, name: str, vector_size: int, profile: CollectionProfile) -> None:
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=profile.on_disk_vectors,
+        ),
+        sparse_vectors_config={
+            SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+        },
+        hnsw_config=models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct),
+        quantization_config=profile.quantization_config(),
+    )
+    _ensure_payload_indexes(client, name, {})
+
+
+def _ensure_payload_indexes(client: QdrantClient, name: str, existing: Dict[str, Any]) -> None:
+    """Index the payload fields searches filter on; without one a filtered search scans every point."""
+    for field, schema in PAYLOAD_INDEXES.items():
+        if field not in existing:
+            client.create_payload_index(collection_name=name, field_name=field, field_schema=schema)
+            logger.info("Created %s payload index on %s.%s", schema.value, name, field)
+
+
+def _profile_drift(info: models.CollectionInfo, profile: CollectionProfile) -> List[str]:
+    """Settings of an existing collection that differ from profile, as readable strings."""
+    drift = []
+    hnsw = info.config.hnsw_config
+    if (hnsw.m, hnsw.ef_construct) != (profile.hnsw_m, profile.hnsw_ef_construct):
+        drift.append(f"hnsw m/ef_construct {hnsw.m}/{hnsw.ef_construct} -> {profile.hnsw_m}/{profile.hnsw_ef_construct}")
+    current = info.config.quantization_config
+    current_mode = "int8" if isinstance(current, models.ScalarQuantization) else "none" if current is None else type(current).__name__
+    if current_mode != profile.quantization:
+        drift.append(f"quantization {current_mode} -> {profile.quantization}")
+    vectors = info.config.params.vectors
+    on_disk = bool(getattr(vectors, "on_disk", None))
+    if on_disk != profile.on_disk_vectors:
+        drift.append(f"on_disk vectors {on_disk} -> {profile.on_disk_vectors}")
+    if SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+        drift.append("missing sparse vectors (rebuild)")
+    return drift
+
+
+def ensure_collection(name: str = "palm_docs", vector_size: int = 384, profile: Optional[CollectionProfile] = None):
+    """Create the collection with the configured profile, or check an existing one against it once per process.
+
+    Blocking: call it from a worker thread. The first check of an existing collection holds
+    _collection_lock and, with QDRANT_MIGRATE, applies in-place profile changes, so concurrent
+    callers (startup warm-up, ingestion) wait for it instead of writing mid-migration.
+    """
+    client = get_client()
+    profile = profile or collection_profile()
     try:
-        if not client.collection_exists(name):
-            client.create_collection(
-                collection_name=name,
-                vectors_config=models.VectorParams(
-                    size=vector_size,
-                    distance=models.Distance.COSINE
-                ),
-            )
-            logger.info("Created Qdrant collection %s", name)
-        return True
+        if name in _checked and client.collection_exists(name):
+            return True
+        with _collection_lock:
+            if not client.collection_exists(name) and _resolve_alias(client, name) == name:
+                _create_collection(client, name, vector_size, profile)
+                _sparse_support[name] = True
+                _checked.add(name)
+                logger.info("Created Qdrant collection %s with %s", name, profile)
+                return True
+            if name in _checked:
+                return True
+            current = _resolve_alias(client, name)
+            info = client.get_collection(current)
+            _ensure_payload_indexes(client, current, info.payload_schema or {})
+            drift = _profile_drift(info, profile)
+            if drift and settings.qdrant_migrate:
+                migrate_collection(name, profile)
+            elif drift:
+                logger.warning("Collection %s differs from the configured profile (%s); set QDRANT_MIGRATE=true to migrate", name, "; ".join(drift))
+            _checked.add(name)
+            return True
     except qdrant_exceptions.UnexpectedResponse as exc:
         raise RuntimeError(f"Qdrant rejected the collection request: {exc}") from exc
     except Exception as exc:
         raise RuntimeError(f"Failed to ensure Qdrant collection '{name}': {exc}") from exc
 
 
+def migrate_collection(name: str = "palm_docs", profile: Optional[CollectionProfile] = None) -> bool:
+    """Apply HNSW, quantization and on-disk changes in place; Qdrant re-indexes in the background.
+
+    Returns False when the collection lacks sparse vectors: that needs rebuild_collection, an
+    offline step, because sparse vectors cannot be added to an existing collection.
+    """
+    client = get_client()
+    profile = profile or collection_profile()
+    current = _resolve_alias(client, name)
+    info = client.get_collection(current)
+    client.update_collection(
+        collection_name=current,
+        vectors_config={"": models.VectorParamsDiff(on_disk=profile.on_disk_vectors)},
+        hnsw_config=models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct),
+        quantization_config=profile.quantization_config() or models.Disabled.DISABLED,
+    )
+    _ensure_payload_indexes(client, current, info.payload_schema or {})
+    logger.info("Updated collection %s in place to %s", current, profile)
+    if SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+        logger.warning(
+            "Collection %s has no sparse vectors; stop ingestion and run python -m app.services.rebuild_collection", name
+        )
+        return False
+    return True
+
+
+def rebuild_collection(name: str = "palm_docs", profile: Optional[CollectionProfile] = None, page_size: int = 256) -> str:
+    """Copy the collection into a new one with profile and sparse vectors, and point name at it as an alias.
+
+    Offline only: points written to the old collection during the copy would be lost. The old
+    collection is deleted only once the copy is complete and, if name is already an alias, after
+    the alias has moved. A plain collection has to be deleted before its name can become an alias;
+    if creating the alias then fails, the error names the collection that holds the data.
+    """
+    from app.services.lexical import encode_documents
+
+    client = get_client()
+    profile = profile or collection_profile()
+    with _collection_lock:
+        current = _resolve_alias(client, name)
+        info = client.get_collection(current)
+        target = f"{name}_{int(time.time())}"
+        if client.collection_exists(target):
+            raise RuntimeError(f"Rebuild target '{target}' already exists; retry in a second.")
+        _create_collection(client, target, info.config.params.vectors.size, profile)
+        copied, offset = 0, None
+        while True:
+            page, offset = client.scroll(
+                collection_name=current, limit=page_size, offset=offset, with_payload=True, with_vectors=True
+            )
+            if page:
+                dense = [point.vector.get("") if isinstance(point.vector, dict) else point.vector for point in page]
+                sparse = encode_documents([(point.payload or {}).get("text", "") for point in page])
+                client.upsert(
+                    collection_name=target,
+                    points=models.Batch(
+                        ids=[point.id for point in page],
+                        vectors={"": dense, SPARSE_VECTOR_NAME: sparse},
+                        payloads=[point.payload for point in page],
+                    ),
+                    wait=offset is None,
+                )
+                copied += len(page)
+            if offset is None:
+                break
+
+        source_count = client.count(current, exact=True).count
+        if source_count != copied or client.count(target, exact=True).count != copied:
+            raise RuntimeError(
+                f"Collection '{current}' changed during the rebuild ({source_count} points, {copied} copied); "
+                f"stop ingestion, delete '{target}' and retry."
+            )
+
+        create_alias = models.CreateAliasOperation(create_alias=models.CreateAlias(collection_name=target, alias_name=name))
+        if current != name:
+            client.update_collection_aliases(change_aliases_operations=[
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=name)),
+                create_alias,
+            ])
+            client.delete_collection(current)
+        else:
+            # An alias cannot shadow a collection, so the old one has to go first.
+            client.delete_collection(current)
+            try:
+                client.update_collection_aliases(change_aliases_operations=[create_alias])
+            except Exception as exc:
+                raise RuntimeError(
+                    f"Deleted '{current}' but could not alias it to '{target}', which holds all {copied} points; "
+                    f"create the alias {name} -> {target} by hand: {exc}"
+                ) from exc
+        _sparse_support.pop(name, None)
+        _checked.discard(name)
+    logger.info("Rebuilt collection %s into %s (%s points) with %s", name, target, copied, profile)
+    return target
+
+
+def supports_sparse(name: str = "palm_docs") -> bool:
+    """Whether the collection has the lexical sparse vector; collections created before hybrid search do not."""
+    if name not in _sparse_support:
+        try:
+            client = get_client()
+            info = client.get_collection(_resolve_alias(client, name))
+        except Exception as exc:
+            raise RuntimeError(f"Failed to read Qdrant collection '{name}': {exc}") from exc
+        sparse = info.config.params.sparse_vectors or {}
+        _sparse_support[name] = SPARSE_VECTOR_NAME in sparse
+        if not _sparse_support[name]:
+            logger.warning("Collection %s has no sparse vectors; hybrid retrieval falls back to dense only", name)
+    return _sparse_support[name]
+
+
 def store_vector(id, vector, payload, name: str = "palm_docs"):
     """Upsert a single vector with payload into Qdrant."""
-    client = _require_client()
+    client = get_client()
     try:
         client.upsert(
             collection_name=name,
@@ -60,3 +310,130 @@ def store_vector(id, vector, payload, name: str = "palm_docs"):
         raise RuntimeError(f"Qdrant upsert rejected: {exc}") from exc
     except Exception as exc:
         raise RuntimeError(f"Failed to store vector in Qdrant: {exc}") from exc
+
+
+def _upsert_batch(client: QdrantClient, name: str, batch: models.Batch, wait: bool, max_retries: int, backoff: float) -> None:
+    """Upsert one batch, retrying with exponential backoff on failure."""
+    for attempt in range(max_retries + 1):
+        try:
+            client.upsert(collection_name=name, points=batch, wait=wait)
+            return
+        except Exception as exc:
+            if attempt >= max_retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            logger.warning("Qdrant batch upsert failed (attempt %s/%s), retrying in %.2fs: %s", attempt + 1, max_retries + 1, delay, exc)
+            time.sleep(delay)
+
+
+@track("qdrant_upsert")
+def store_vectors(
+    ids: Sequence[Any],
+    vectors: np.ndarray,
+    payloads: List[Dict[str, Any]],
+    name: str = "palm_docs",
+    batch_size: Optional[int] = None,
+    max_retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    sparse_vectors: Optional[List[models.SparseVector]] = None,
+) -> int:
+    """Upsert a whole embedding matrix in batches; the last batch waits as a consistency barrier."""
+    client = get_client()
+    batch_size = batch_size or settings.qdrant_upsert_batch_size
+    max_retries = settings.qdrant_upsert_max_retries if max_retries is None else max_retries
+    backoff = settings.qdrant_upsert_backoff if backoff is None else backoff
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if not (len(ids) == len(payloads) == matrix.shape[0]):
+        raise ValueError("ids, vectors and payloads must have the same length")
+    if sparse_vectors is not None:
+        if len(sparse_vectors) != len(ids):
+            raise ValueError("sparse_vectors must match ids in length")
+        if not supports_sparse(name):
+            sparse_vectors = None
+
+    total = matrix.shape[0]
+    try:
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            # One C-level tolist per batch instead of a Python conversion per row.
+            dense = matrix[start:end].tolist()
+            batch = models.Batch(
+                ids=list(ids[start:end]),
+                vectors=dense if sparse_vectors is None else {"": dense, SPARSE_VECTOR_NAME: sparse_vectors[start:end]},
+                payloads=payloads[start:end],
+            )
+            # Fire-and-forget until the final batch; Qdrant applies updates in order,
+            # so waiting on the last one guarantees every earlier batch is visible too.
+            _upsert_batch(client, name, batch, wait=end == total, max_retries=max_retries, backoff=backoff)
+            if on_progress:
+                on_progress(end)
+        logger.debug("Stored %s vectors in collection %s", total, name)
+        return total
+    except qdrant_exceptions.UnexpectedResponse as exc:
+        raise RuntimeError(f"Qdrant upsert rejected: {exc}") from exc
+    except Exception as exc:
+        raise RuntimeError(f"Failed to store vectors in Qdrant: {exc}") from exc
+
+
+def _document_filter(document_id: str, point_ids: Optional[Sequence[Any]] = None) -> models.Filter:
+    must: List[Any] = [models.FieldCondition(key="document_id", match=models.MatchValue(value=document_id))]
+    if point_ids is not None:
+        must.append(models.HasIdCondition(has_id=list(point_ids)))
+    return models.Filter(must=must)
+
+
+def fetch_document_points(document_id: str, name: str = "palm_docs", page_size: int = 1000) -> List[models.Record]:
+    """Scroll every point of a document (payload only, no vectors)."""
+    client = get_client()
+    points: List[models.Record] = []
+    offset = None
+    try:
+        while True:
+            page, offset = client.scroll(
+                collection_name=name,
+                scroll_filter=_document_filter(document_id),
+                limit=page_size,
+                offset=offset,
+                with_payload=["text", "chunk_id"],
+                with_vectors=False,
+            )
+            points.extend(page)
+            if offset is None:
+                return points
+    except Exception as exc:
+        raise RuntimeError(f"Failed to read points for document {document_id}: {exc}") from exc
+
+
+def delete_document_points(document_id: str, point_ids: Optional[Sequence[Any]] = None, name: str = "palm_docs") -> None:
+    """Delete a document's points by filter, optionally narrowed to specific point ids."""
+    client = get_client()
+    if point_ids is not None and not point_ids:
+        return
+    try:
+        client.delete(
+            collection_name=name,
+            points_selector=models.FilterSelector(filter=_document_filter(document_id, point_ids)),
+        )
+    except Exception as exc:
+        raise RuntimeError(f"Failed to delete points for document {document_id}: {exc}") from exc
+
+
+def renumber_chunks(chunk_ids: Dict[Any, int], name: str = "palm_docs") -> None:
+    """Set new chunk_id payloads for existing points in a single batched request."""
+    client = get_client()
+    if not chunk_ids:
+        return
+    try:
+        client.batch_update_points(
+            collection_name=name,
+            update_operations=[
+                models.SetPayloadOperation(set_payload=models.SetPayload(payload={"chunk_id": chunk_id}, points=[point_id]))
+                for point_id, chunk_id in chunk_ids.items()
+            ],
+        )
+    except Exception as exc:
+        raise RuntimeError(f"Failed to renumber chunks: {exc}") from exc
@@ -0,0 +1,90 @@
+"""Startup warm-up: initialize heavy resources in parallel, time each one, and report readiness."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import STARTUP_SECONDS
+from app.services import embedings, ingestion_jobs
+from app.services.llm import ping_llm
+from app.services.vector_store import ensure_collection
+
+# /ready waits for these; the LLM ping only spares the first generation Ollama's model load.
+REQUIRED_COMPONENTS = ("database", "embedding_model", "qdrant")
+logger = logging.getLogger(__name__)
+
+_components: Dict[str, Dict[str, Any]] = {}
+_finished = False
+_task: Optional[asyncio.Task] = None
+
+
+async def run_step(name: str, step: Callable[[], Awaitable[Any]]) -> bool:
+    """Run one startup step, recording its status and duration; failures are logged, not raised."""
+    _components[name] = {"status": "pending"}
+    start = time.perf_counter()
+    try:
+        await step()
+    except Exception as exc:
+        outcome: Dict[str, Any] = {"status": "failed", "error": str(exc)}
+        logger.warning("Startup step %s failed: %s", name, exc)
+    else:
+        outcome = {"status": "ok"}
+    elapsed = time.perf_counter() - start
+    STARTUP_SECONDS.labels(name).set(elapsed)
+    _components[name] = {**outcome, "ms": round(elapsed * 1000, 1)}
+    logger.info("Startup step %s: %s in %.0f ms", name, outcome["status"], elapsed * 1000)
+    return outcome["status"] == "ok"
+
+
+async def _prepare_qdrant() -> None:
+    """Check (and with QDRANT_MIGRATE, migrate) the collection, then start ingestion workers.
+
+    Workers start afterwards so requeued jobs never write to a collection that is being migrated.
+    """
+    await run_step("qdrant", lambda: run_in_threadpool(ensure_collection))
+    # Workers read and requeue jobs from the database; with it down they would only crash warm-up.
+    if _components.get("database", {}).get("status") != "ok":
+        logger.warning("Database is unavailable; ingestion workers not started")
+        return
+    try:
+        await ingestion_jobs.start_workers()
+    except Exception as exc:
+        logger.error("Failed to start ingestion workers: %s", exc)
+
+
+async def warm_up() -> None:
+    """Load the embedding model, prepare the Qdrant collection and ping the LLM concurrently."""
+    global _finished
+    steps: Dict[str, Callable[[], Awaitable[Any]]] = {"embedding_model": embedings.warm_up}
+    if settings.warmup_llm:
+        steps["llm"] = ping_llm
+    for name in (*steps, "qdrant"):
+        _components[name] = {"status": "pending"}
+    start = time.perf_counter()
+    await asyncio.gather(_prepare_qdrant(), *(run_step(name, step) for name, step in steps.items()))
+    _finished = True
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - start) * 1000)
+
+
+def start_warm_up() -> None:
+    """Run warm-up in the background so the server accepts requests (and answers /ready) meanwhile."""
+    global _task, _finished
+    _finished = False
+    _task = asyncio.get_running_loop().create_task(warm_up())
+
+
+async def stop_warm_up() -> None:
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+
+
+def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """Ready once warm-up finished and every required component came up."""
+    ready = _finished and all(_components.get(name, {}).get("status") == "ok" for name in REQUIRED_COMPONENTS)
+    return ready, {"ready": ready, "warming_up": not _finished, "components": dict(_components)}
@@ -0,0 +1,128 @@
+"""Queries/sec of batch retrieval (retrieve_batch) against the per-query retrieve_chunks loop.
+
+The loop is what evaluation jobs did through /chat/message: one encode and one Qdrant call per
+question. The batch path encodes a slice of RETRIEVAL_BATCH_SIZE questions at once and sends
+their searches in one query_batch_points call. Both paths must return the same chunks; the
+script checks that before printing numbers. The query cache is cleared before every run.
+
+Without --url Qdrant runs in memory, so the batch path saves no network round trips; with
+--real-model MiniLM replaces the hashing encoder and the batched encode dominates the gain.
+
+Run from the backend directory:
+    python -m benchmarks.bench_batch_retrieval --queries 1000
+    python -m benchmarks.bench_batch_retrieval --queries 1000 --url http://localhost:6333 --real-model
+"""
+import argparse
+import asyncio
+import random
+import time
+from uuid import uuid4
+
+from qdrant_client import QdrantClient
+
+from app.core.config import settings
+from app.services import embedings, retriever, vector_store
+from app.services.embedding_cache import query_cache
+from app.services.lexical import encode_documents
+from benchmarks.stand_ins import HashingEncoder
+
+TOPICS = ["refunds", "onboarding", "expenses", "support", "passwords", "security", "travel", "payroll"]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(
+        f"{rng.choice(TOPICS)} item{rng.randint(0, 500)}" for _ in range(words // 2)
+    )
+
+
+def _load(chunks: int, documents: int, rng: random.Random) -> None:
+    client = vector_store.get_client()
+    if client.collection_exists(retriever.COLLECTION):
+        client.delete_collection(retriever.COLLECTION)
+    vector_store.ensure_collection(retriever.COLLECTION)
+    for start in range(0, chunks, 1000):
+        texts = [_text(rng, 120) for _ in range(start, min(start + 1000, chunks))]
+        vector_store.store_vectors(
+            ids=[str(uuid4()) for _ in texts],
+            vectors=embedings.model.encode(texts),
+            payloads=[
+                {"text": text, "document_id": f"doc-{(start + i) % documents}", "chunk_id": start + i, "filename": "bench.txt"}
+                for i, text in enumerate(texts)
+            ],
+            sparse_vectors=encode_documents(texts),
+        )
+
+
+async def _loop(queries) -> tuple:
+    query_cache.clear()
+    start = time.perf_counter()
+    results = [await retriever.retrieve_chunks(query, document_id, top_k) for query, document_id, top_k in queries]
+    return time.perf_counter() - start, results
+
+
+async def _batched(queries) -> tuple:
+    query_cache.clear()
+    size = settings.retrieval_batch_size
+    start = time.perf_counter()
+    results = []
+    for offset in range(0, len(queries), size):
+        results += await retriever.retrieve_batch(queries[offset:offset + size])
+    return time.perf_counter() - start, results
+
+
+def _same(left, right) -> bool:
+    def key(results):
+        return [[(chunk["document_id"], chunk["chunk_id"]) for chunk in chunks] for chunks in results]
+    return key(left) == key(right)
+
+
+async def _run(queries) -> None:
+    loop_seconds, loop_results = await _loop(queries)
+    batch_seconds, batch_results = await _batched(queries)
+    if not _same(loop_results, batch_results):
+        raise SystemExit("batch retrieval returned different chunks than the per-query loop")
+    print(f"{len(queries)} queries, mode={settings.retrieval_mode}, batch size={settings.retrieval_batch_size}")
+    print(f"per-query loop  {len(queries) / loop_seconds:9.1f} queries/s  ({loop_seconds:.2f}s)")
+    print(f"batch           {len(queries) / batch_seconds:9.1f} queries/s  ({batch_seconds:.2f}s)"
+          f"  x{loop_seconds / batch_seconds:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--filtered-share", type=float, default=0.5, help="fraction of queries with a document_id")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=settings.retrieval_batch_size)
+    parser.add_argument("--mode", choices=retriever.RETRIEVAL_MODES, default="dense")
+    parser.add_argument("--url", help="Qdrant URL; defaults to an in-memory client")
+    parser.add_argument("--real-model", action="store_true", help="embed with MiniLM instead of the hashing encoder")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vector_store.qdrant = QdrantClient(url=args.url, timeout=120) if args.url else QdrantClient(":memory:")
+    if args.real_model:
+        embedings.load_model()
+    else:
+        embedings.model = HashingEncoder()
+    settings.retrieval_mode = args.mode
+    settings.retrieval_batch_size = args.batch_size
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    _load(args.chunks, args.documents, rng)
+    print(f"loaded {args.chunks} chunks in {time.perf_counter() - start:.1f}s")
+    queries = [
+        (
+            _text(rng, 8),
+            f"doc-{rng.randrange(args.documents)}" if rng.random() < args.filtered_share else None,
+            args.top_k,
+        )
+        for _ in range(args.queries)
+    ]
+    asyncio.run(_run(queries))
+
+
+if __name__ == "__main__":
+    main()
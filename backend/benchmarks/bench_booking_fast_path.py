@@ -0,0 +1,113 @@
+"""Booking fast path: intent-detector throughput, and the share of booking turns served without the LLM.
+
+The intent section compares the previous per-call detector (up to 24 regex searches plus phrase
+checks) with the single precompiled pattern, and checks both agree on every sample. The extraction
+section replays sample conversations through handle_booking against the fake Ollama server.
+
+Run from the backend directory: python -m benchmarks.bench_booking_fast_path
+"""
+import argparse
+import asyncio
+import re
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.booking import Booking  # noqa: F401  (registers the table)
+from app.services import booking_extractor, llm
+from app.services.booking_intent import ACTION_KEYWORDS, OBJECT_KEYWORDS, is_booking_request
+from app.services.booking_pipeline import handle_booking
+from app.services.session_state import SessionState
+from benchmarks.fake_ollama import FakeOllama
+
+MESSAGES = [
+    "Can you book an interview for me next Friday?",
+    "I'd like to schedule a call with the hiring team",
+    "please set up a meeting on monday",
+    "What does the document say about refunds?",
+    "Summarize section 3 of the onboarding guide in a few bullet points, focusing on the security policies.",
+    "How do I reset my password?",
+    "arrange an appointment for thursday 3pm",
+    "Who wrote the quarterly report and when was it published?",
+    "I want to reserve a slot for an interview",
+    "The meeting notes mention a booking system; what does it do?",
+] * 10
+
+CONVERSATIONS = [
+    ["I'm Sita, sita@x.com, next Friday 3pm"],
+    ["Book an interview next Monday at 10am", "I'm Ram, ram@example.com"],
+    ["Please schedule a meeting", "My name is Anna Lee", "anna@lee.org", "Thursday 2pm"],
+    ["Hi, this is Omar Said. Book me for Wednesday 11am, omar@said.dev"],
+    ["schedule an interview", "next tuesday", "4pm", "I am Priya, priya@mail.com"],
+]
+
+
+def _legacy_is_booking_request(text: str) -> bool:
+    """The detector before the merged pattern, kept here for comparison."""
+    if not text:
+        return False
+    lowered = text.lower()
+    for action in ACTION_KEYWORDS:
+        for obj in OBJECT_KEYWORDS:
+            if re.search(rf"\b{re.escape(action)}\b.*\b{obj}\b", lowered):
+                return True
+    return any(phrase in lowered for phrase in [
+        "book me an interview", "book an interview", "book a meeting", "schedule an interview",
+        "schedule a meeting", "schedule a call", "set up a call", "set up a meeting",
+    ])
+
+
+def bench_intent(rounds: int) -> None:
+    mismatches = [m for m in MESSAGES if _legacy_is_booking_request(m) != is_booking_request(m)]
+    if mismatches:
+        raise SystemExit(f"Intent detectors disagree on: {mismatches}")
+    for label, detector in (("per-call regexes", _legacy_is_booking_request), ("precompiled", is_booking_request)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in MESSAGES:
+                detector(message)
+        rate = rounds * len(MESSAGES) / (time.perf_counter() - start)
+        print(f"intent {label:18}: {rate:12,.0f} calls/sec")
+
+
+async def bench_extraction(token_latency: float) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    # The fake LLM finds nothing, so every field it is asked for comes from the regex pass or stays missing.
+    answer = '{"name": null, "email": null, "date": null, "time": null}'
+    async with FakeOllama(answer=answer, token_latency=token_latency) as server:
+        settings.ollama_url = server.url
+        await llm.close_llm_client()
+        booked, turn_times = 0, []
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            for index, turns in enumerate(CONVERSATIONS):
+                state = SessionState(session_id=f"bench-{index}")
+                for text in turns:
+                    start = time.perf_counter()
+                    result = await handle_booking(state.session_id, text, db, state)
+                    turn_times.append(time.perf_counter() - start)
+                booked += result.get("error") is False
+        await llm.close_llm_client()
+    await engine.dispose()
+
+    stats = booking_extractor.extraction_stats()
+    print(f"booking turns={stats['turns']} without LLM={stats['without_llm']} ({stats['without_llm_share']:.0%})")
+    print(f"conversations booked={booked}/{len(CONVERSATIONS)} mean turn latency={sum(turn_times) / len(turn_times) * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    bench_intent(args.rounds)
+    asyncio.run(bench_extraction(args.token_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Redis memory and per-turn history fetch latency: unbounded RPUSH + full LRANGE vs capped history + tail fetch.
+
+Uses fakeredis unless --url points at a real Redis. fakeredis has no MEMORY USAGE, so there the
+memory column is the stored payload bytes; against a real server it is MEMORY USAGE summed over keys.
+
+Run from the backend directory: python -m benchmarks.bench_chat_history --sessions 1000 --messages 100
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import fakeredis
+import numpy as np
+import redis
+import redis.asyncio
+
+from app.core.config import settings
+from app.services import chat_memory
+
+MESSAGE = "Could you tell me more about the refund policy for annual plans bought through a reseller? " * 2
+
+
+async def _memory(client, keys: list[str]) -> int:
+    try:
+        return sum([await client.memory_usage(key) or 0 for key in keys])
+    except redis.ResponseError:
+        total = 0
+        for key in keys:
+            total += sum(len(item) for item in await client.lrange(key, 0, -1))
+        return total
+
+
+async def _legacy_append(client, session_id: str, role: str, content: str) -> None:
+    await client.rpush(f"chat:{session_id}", json.dumps({"role": role, "content": content}))
+
+
+async def _legacy_history(client, session_id: str) -> list[dict]:
+    return [json.loads(message) for message in await client.lrange(f"chat:{session_id}", 0, -1)]
+
+
+async def _fill(append, sessions: int, messages: int) -> None:
+    for turn in range(messages):
+        role = "user" if turn % 2 == 0 else "assistant"
+        for session in range(sessions):
+            await append(f"s{session}", role, MESSAGE)
+
+
+async def _fetch_latency(fetch, sessions: int, samples: int) -> tuple[float, float]:
+    rng = np.random.default_rng(0)
+    timings = []
+    for session in rng.integers(0, sessions, size=samples):
+        start = time.perf_counter()
+        await fetch(f"s{session}")
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+
+async def run(args: argparse.Namespace) -> None:
+    client = redis.asyncio.Redis.from_url(args.url, decode_responses=True) if args.url else fakeredis.FakeAsyncRedis(decode_responses=True)
+    chat_memory.async_redis_client = client
+    settings.chat_summary_enabled = False
+    keys = [f"chat:s{i}" for i in range(args.sessions)]
+    scale = 10_000 / args.sessions
+    tail = settings.prompt_history_turns
+
+    await client.delete(*keys)
+    await _fill(lambda s, r, c: _legacy_append(client, s, r, c), args.sessions, args.messages)
+    before_memory = await _memory(client, keys) * scale
+    before_p50, before_p99 = await _fetch_latency(lambda s: _legacy_history(client, s), args.sessions, args.samples)
+
+    await client.delete(*keys)
+    await _fill(lambda s, r, c: chat_memory.append_messages(s, [(r, c)]), args.sessions, args.messages)
+    after_memory = await _memory(client, keys) * scale
+    after_p50, after_p99 = await _fetch_latency(lambda s: chat_memory.get_history(s, limit=tail), args.sessions, args.samples)
+    await client.delete(*keys)
+
+    print(f"sessions={args.sessions} messages/session={args.messages} window={settings.chat_history_window} tail={tail}")
+    print(f"{'':26} {'MB per 10k sessions':>20} {'fetch p50 ms':>13} {'fetch p99 ms':>13}")
+    print(f"{'unbounded + LRANGE 0 -1':26} {before_memory / 1e6:20.1f} {before_p50:13.3f} {before_p99:13.3f}")
+    print(f"{'capped + tail fetch':26} {after_memory / 1e6:20.1f} {after_p50:13.3f} {after_p99:13.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=100, help="messages stored per session")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--url", default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
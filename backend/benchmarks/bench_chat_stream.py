@@ -0,0 +1,51 @@
+"""Compare time-to-first-token of stream_llm with the full-reply latency of call_llm.
+
+Run from the backend directory: python -m benchmarks.bench_chat_stream --token-latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services import llm
+from benchmarks.fake_ollama import FakeOllama
+
+MESSAGES = [{"role": "user", "content": "How do I reset my password?"}]
+
+
+async def run(token_latency: float) -> None:
+    async with FakeOllama(token_latency=token_latency) as server:
+        settings.ollama_url = server.url
+        await llm.close_llm_client()
+
+        start = time.perf_counter()
+        await llm.call_llm(MESSAGES)
+        blocking = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        async for token in llm.stream_llm(MESSAGES):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            parts.append(token)
+        streamed = time.perf_counter() - start
+
+        await llm.close_llm_client()
+
+    assert "".join(parts) == server.answer
+    assert first_token < streamed
+    print(f"call_llm full reply        : {blocking:6.3f}s")
+    print(f"stream_llm first token     : {first_token:6.3f}s")
+    print(f"stream_llm full reply      : {streamed:6.3f}s ({len(parts)} tokens)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(run(args.token_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Sentence-chunking time and chunk count on a large text: per-call spacy.load vs the cached packer.
+
+Run from the backend directory: python -m benchmarks.bench_chunker --words 200000 [--fast]
+"""
+import argparse
+import random
+import time
+
+from app.services import chunker
+
+VOCAB = (
+    "the policy applies to all employees and contractors who access customer data "
+    "requests must be approved by a manager before the end of the quarter "
+    "support hours are nine to five on weekdays except public holidays"
+).split()
+
+
+def _corpus(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    sentences, paragraph = [], []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 30))
+        sentence = " ".join(rng.choice(VOCAB) for _ in range(length))
+        paragraph.append(sentence.capitalize() + ".")
+        remaining -= length
+        if len(paragraph) >= 6:
+            sentences.append(" ".join(paragraph))
+            paragraph = []
+    if paragraph:
+        sentences.append(" ".join(paragraph))
+    return "\n\n".join(sentences)
+
+
+def old_chunk_sentence(text: str, fast: bool) -> list[str]:
+    # The previous behaviour: load the full pipeline on every call, one chunk per sentence.
+    import spacy
+    if fast:
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+    else:
+        nlp = spacy.load("en_core_web_sm")
+    nlp.max_length = max(nlp.max_length, len(text) + 1)
+    return [sent.text.strip() for sent in nlp(text).sents]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--overlap", type=int, default=0)
+    parser.add_argument("--fast", action="store_true", help="sentencizer-only pipeline")
+    args = parser.parse_args()
+
+    text = _corpus(args.words)
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        old_chunks = old_chunk_sentence(text, args.fast)
+    old = (time.perf_counter() - start) / args.calls
+
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        new_chunks = chunker.chunk_sentence(text, chunk_size=args.chunk_size, overlap=args.overlap, fast=args.fast)
+    new = (time.perf_counter() - start) / args.calls
+
+    print(f"words={args.words} chars={len(text)} calls={args.calls} fast={args.fast}")
+    print(f"old  (load per call, 1 sentence/chunk): {old:7.3f}s/call  {len(old_chunks):>7} chunks")
+    print(f"new  (cached, packed to {args.chunk_size} words)   : {new:7.3f}s/call  {len(new_chunks):>7} chunks")
+
+
+if __name__ == "__main__":
+    main()
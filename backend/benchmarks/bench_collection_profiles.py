@@ -0,0 +1,208 @@
+"""Recall@k, latency and memory of Qdrant collection profiles (HNSW m/ef, int8 quantization, on-disk vectors).
+
+Points are clustered 384-dim vectors whose document_id is their cluster, so the filtered search
+(document_id match, the filter retrieval uses) has a realistic selectivity. Ground truth is an
+exact top-k computed in numpy, streaming over the data so 1M points fit in memory. Each profile
+gets its own collection, built through vector_store.ensure_collection and searched through
+retriever.dense_search, and is deleted again after it is measured.
+
+Only a Qdrant server builds HNSW graphs and quantizes vectors; local mode does exact search and
+ignores every profile setting, so without --url the numbers only check the harness. Memory is an
+estimate from the profile (vectors and graph links kept in RAM); with --url the server's
+resident memory from its /metrics endpoint is reported too.
+
+Run from the backend directory:
+    python -m benchmarks.bench_collection_profiles --url http://localhost:6333 --out profiles.json
+"""
+import argparse
+import json
+import time
+import urllib.request
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from app.services import retriever, vector_store
+from app.services.vector_store import CollectionProfile
+
+PROFILES = {
+    "baseline": CollectionProfile(),
+    "ef64": CollectionProfile(search_ef=64),
+    "m32": CollectionProfile(hnsw_m=32, hnsw_ef_construct=200),
+    "int8": CollectionProfile(quantization="int8"),
+    "int8_on_disk": CollectionProfile(quantization="int8", on_disk_vectors=True),
+    "int8_no_rescore": CollectionProfile(quantization="int8", rescore=False),
+}
+CHUNK = 50_000
+
+
+def _chunk(index: int, size: int, dim: int, centers: np.ndarray, seed: int):
+    """Chunk index of the dataset; regenerated on demand so the full set never sits in memory."""
+    rng = np.random.default_rng(seed + 1 + index)
+    clusters = rng.integers(0, len(centers), size=size)
+    vectors = centers[clusters] + rng.normal(scale=0.6, size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), clusters
+
+
+def _chunks(points: int, dim: int, centers: np.ndarray, seed: int):
+    for index, start in enumerate(range(0, points, CHUNK)):
+        vectors, clusters = _chunk(index, min(CHUNK, points - start), dim, centers, seed)
+        yield start, vectors, clusters
+
+
+def _ground_truth(points: int, dim: int, centers, seed: int, queries: np.ndarray, filters: np.ndarray, k: int):
+    """Exact top-k ids for each query, unfiltered and restricted to the query's document."""
+    best = [np.empty((len(queries), 0)), np.empty((len(queries), 0))]
+    best_ids = [np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.int64)]
+    for start, vectors, clusters in _chunks(points, dim, centers, seed):
+        scores = queries @ vectors.T
+        ids = np.arange(start, start + len(vectors))
+        masked = np.where(clusters[None, :] == filters[:, None], scores, -np.inf)
+        for slot, block in enumerate((scores, masked)):
+            merged = np.concatenate([best[slot], block], axis=1)
+            merged_ids = np.concatenate([best_ids[slot], np.broadcast_to(ids, block.shape)], axis=1)
+            top = np.argsort(-merged, axis=1)[:, :k]
+            best[slot] = np.take_along_axis(merged, top, axis=1)
+            best_ids[slot] = np.take_along_axis(merged_ids, top, axis=1)
+    # A document smaller than k has fewer than k filtered matches; -1 marks the empty slots.
+    return [np.where(np.isfinite(scores), ids, -1) for scores, ids in zip(best, best_ids)]
+
+
+def _wait_indexed(client: QdrantClient, name: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        info = client.get_collection(name)
+        if info.status == models.CollectionStatus.GREEN and (info.indexed_vectors_count or 0) >= (info.points_count or 0) * 0.99:
+            return
+        time.sleep(1.0)
+    print(f"  warning: {name} still optimizing after {timeout:.0f}s; latencies include unindexed segments")
+
+
+def _estimated_ram_mb(profile: CollectionProfile, points: int, dim: int) -> float:
+    """Vectors plus level-0 HNSW links (2m u32 ids per point) that stay in RAM under profile."""
+    originals = 0 if profile.on_disk_vectors else points * dim * 4
+    quantized = points * dim if profile.quantization == "int8" else 0
+    links = points * profile.hnsw_m * 2 * 4
+    return (originals + quantized + links) / 2**20
+
+
+def _server_rss_mb(url: Optional[str]) -> Optional[float]:
+    if not url:
+        return None
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/metrics", timeout=5) as response:
+            for line in response.read().decode().splitlines():
+                if line.startswith("memory_resident_bytes"):
+                    return float(line.split()[-1]) / 2**20
+    except Exception:
+        return None
+    return None
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+
+def _search(name: str, profile: CollectionProfile, queries, filters, truth, k: int) -> Dict[str, float]:
+    result: Dict[str, float] = {}
+    for label, use_filter, expected in (("unfiltered", False, truth[0]), ("filtered", True, truth[1])):
+        latencies, hits = [], 0
+        total = max(1, int((expected >= 0).sum()))
+        for query, document, ids in zip(queries, filters, expected):
+            q_filter = retriever._document_filter(f"doc-{document}") if use_filter else None
+            start = time.perf_counter()
+            points = retriever.dense_search(query.tolist(), q_filter, k, name=name, profile=profile)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len({point.id for point in points} & set(ids[ids >= 0].tolist()))
+        result[f"{label}_recall"] = hits / total
+        result[f"{label}_p50_ms"] = _percentile(latencies, 50)
+        result[f"{label}_p99_ms"] = _percentile(latencies, 99)
+    return result
+
+
+def run_profile(label: str, profile: CollectionProfile, args, centers, queries, filters, truth) -> Dict[str, float]:
+    name = f"bench_profile_{label}"
+    client = vector_store.get_client()
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    start = time.perf_counter()
+    vector_store.ensure_collection(name, args.dim, profile=profile)
+    for first, vectors, clusters in _chunks(args.points, args.dim, centers, args.seed):
+        for offset in range(0, len(vectors), args.batch):
+            batch = slice(offset, offset + args.batch)
+            client.upsert(
+                collection_name=name,
+                points=models.Batch(
+                    ids=list(range(first + offset, first + offset + len(vectors[batch]))),
+                    vectors=vectors[batch].tolist(),
+                    payloads=[{"document_id": f"doc-{cluster}"} for cluster in clusters[batch]],
+                ),
+                wait=False,
+            )
+    if args.url:
+        _wait_indexed(client, name, args.index_timeout)
+    build_seconds = time.perf_counter() - start
+
+    row = {"profile": label, **profile.__dict__, "build_s": round(build_seconds, 1)}
+    row.update(_search(name, profile, queries, filters, truth, args.k))
+    row["est_ram_mb"] = round(_estimated_ram_mb(profile, args.points, args.dim), 1)
+    row["server_rss_mb"] = _server_rss_mb(args.url)
+    if not args.keep:
+        client.delete_collection(name)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Qdrant server URL; without it an in-memory client is used")
+    parser.add_argument("--points", type=int, help="default 1,000,000 with --url, 20,000 without")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000, help="one document_id per cluster")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--index-timeout", type=float, default=1800.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark collections")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+    args.points = args.points or (1_000_000 if args.url else 20_000)
+
+    if args.url:
+        vector_store.qdrant = QdrantClient(url=args.url, timeout=120)
+    else:
+        print("No --url: local mode searches exactly and ignores HNSW/quantization; numbers only check the harness.")
+        warnings.filterwarnings("ignore", message=".*[Ll]ocal")
+        vector_store.qdrant = QdrantClient(":memory:")
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.normal(size=(args.clusters, args.dim)).astype(np.float32)
+    filters = rng.integers(0, args.clusters, size=args.queries)
+    queries = centers[filters] + rng.normal(scale=0.6, size=(args.queries, args.dim)).astype(np.float32)
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+    start = time.perf_counter()
+    truth = _ground_truth(args.points, args.dim, centers, args.seed, queries, filters, args.k)
+    print(f"exact top-{args.k} for {args.queries} queries over {args.points:,} points in {time.perf_counter() - start:.1f}s")
+
+    rows = []
+    print(f"{'profile':16} {'build s':>8} {'recall':>7} {'p99 ms':>8} {'f.recall':>9} {'f.p99 ms':>9} {'est MB':>8} {'rss MB':>8}")
+    for label in args.profiles.split(","):
+        row = run_profile(label, PROFILES[label], args, centers, queries, filters, truth)
+        rows.append(row)
+        rss = f"{row['server_rss_mb']:8.0f}" if row["server_rss_mb"] is not None else f"{'-':>8}"
+        print(
+            f"{label:16} {row['build_s']:8.1f} {row['unfiltered_recall']:7.3f} {row['unfiltered_p99_ms']:8.2f} "
+            f"{row['filtered_recall']:9.3f} {row['filtered_p99_ms']:9.2f} {row['est_ram_mb']:8.0f} {rss}"
+        )
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump({"args": vars(args), "results": rows}, handle, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
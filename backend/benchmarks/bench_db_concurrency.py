@@ -0,0 +1,131 @@
+"""Concurrent booking writes: blocking sync session on the event loop vs the async engine with WAL.
+
+Each mode runs the same number of concurrent coroutines, each inserting one Booking against a fresh
+SQLite file, while a ticker measures how long the event loop is stalled. The sync mode is what the
+booking path did before (default rollback journal, commit inline on the loop); the async mode uses
+the app's aiosqlite engine options and pragmas. The last section sends complete booking messages
+through handle_booking concurrently, so no LLM call is involved.
+
+Run from the backend directory: python -m benchmarks.bench_db_concurrency
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import _configure_sqlite, _engine_options
+from app.models.booking import Booking
+from app.services.booking_pipeline import handle_booking
+from app.services.session_state import SessionState
+
+TICK = 0.001
+
+
+def _booking(index: int) -> Booking:
+    return Booking(
+        session_id=f"bench-{index}",
+        name=f"User {index}",
+        email=f"user{index}@example.com",
+        meeting_datetime=datetime.now(timezone.utc) + timedelta(days=1, minutes=index),
+        notes="benchmark",
+    )
+
+
+async def _watch_loop(stop: asyncio.Event, stalls: list) -> None:
+    """Record how late each TICK sleep wakes up; large values mean something blocked the loop."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stalls.append(time.perf_counter() - start - TICK)
+
+
+async def _run(label: str, write, writes: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await write(index)
+            latencies.append(time.perf_counter() - start)
+
+    stop, stalls = asyncio.Event(), []
+    watcher = asyncio.create_task(_watch_loop(stop, stalls))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(writes)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:22} writes/sec={writes / elapsed:8.1f} "
+        f"p50={statistics.median(latencies) * 1000:7.1f} ms p95={p95 * 1000:7.1f} ms "
+        f"max loop stall={max(stalls, default=0) * 1000:6.1f} ms"
+    )
+
+
+async def bench_sync(path: str, writes: int, concurrency: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+
+    async def write(index: int) -> None:
+        with Session(engine) as db:
+            db.add(_booking(index))
+            db.commit()
+
+    await _run("sync session", write, writes, concurrency)
+    engine.dispose()
+
+
+async def bench_async(path: str, writes: int, concurrency: int) -> None:
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url, **_engine_options(url))
+    _configure_sqlite(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async def write(index: int) -> None:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            db.add(_booking(index))
+            await db.commit()
+
+    await _run("async engine + WAL", write, writes, concurrency)
+
+    async def book(index: int) -> None:
+        state = SessionState(session_id=f"flow-{index}")
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            result = await handle_booking(
+                state.session_id, f"I'm Sita, sita{index}@x.com, next Friday 3pm", db, state
+            )
+        if result.get("error"):
+            raise SystemExit(f"Booking {index} failed: {result['message']}")
+
+    await _run("handle_booking (async)", book, writes, concurrency)
+    async with AsyncSession(engine) as db:
+        stored = (await db.exec(select(func.count()).select_from(Booking))).one()
+    print(f"rows stored={stored} (expected {writes * 2})")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(bench_sync(os.path.join(tmp, "sync.db"), args.writes, args.concurrency))
+        asyncio.run(bench_async(os.path.join(tmp, "async.db"), args.writes, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Chunks/sec, memory and cosine agreement of the embedding backends (torch, torch_int8, onnx).
+
+Every backend encodes the same corpus in its own interpreter, so load time and peak RSS are not
+polluted by the other backends. The float32 torch vectors are the reference: for each other
+backend the script reports the mean and minimum cosine similarity against them and exits with
+status 1 if any minimum falls below --min-cosine, so it doubles as the equivalence check before
+switching EMBEDDING_BACKEND. The onnx backend needs optimum[onnxruntime] installed.
+
+The corpus is --corpus (a text file chunked like ingestion does) or synthetic prose.
+
+Run from the backend directory:
+    python -m benchmarks.bench_embedding_backends --threads 4 --out backends.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+TOPICS = ["refunds", "onboarding", "expenses", "support", "passwords", "security", "travel", "payroll"]
+
+
+def _synthetic_corpus(chunks: int, words: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(chunks):
+        sentences = []
+        while sum(len(s.split()) for s in sentences) < words:
+            topic = rng.choice(TOPICS)
+            sentences.append(
+                f"The {topic} team reviews item {rng.randint(1, 9999)} within {rng.randint(1, 30)} days "
+                f"and escalates {rng.choice(TOPICS)} questions to the owner."
+            )
+        corpus.append(" ".join(sentences))
+    return corpus
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as handle:
+        return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def worker(args: argparse.Namespace) -> None:
+    """Load one backend, encode the corpus and print timings; vectors go to --vectors."""
+    from app.core.config import settings
+    from app.services import embedings
+
+    if args.model:
+        embedings.MODEL_NAME = args.model
+    settings.embedding_onnx_file = args.onnx_file or settings.embedding_onnx_file
+    with open(args.corpus_json) as handle:
+        corpus = json.load(handle)
+
+    start = time.perf_counter()
+    encoder = embedings.load_backend(args.worker, args.threads)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+    encoder.encode(corpus[: args.batch_size])
+
+    start = time.perf_counter()
+    vectors = encoder.encode(corpus, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    np.save(args.vectors, np.asarray(vectors, dtype=np.float32))
+    print(json.dumps({
+        "backend": args.worker,
+        "load_s": round(load_seconds, 2),
+        "chunks_per_s": round(len(corpus) / elapsed, 1),
+        "rss_loaded_mb": round(rss_loaded, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def _cosines(candidate: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    return np.sum(candidate * reference, axis=1)
+
+
+def _run_backend(backend: str, args: argparse.Namespace, corpus_json: str, workdir: str) -> Dict:
+    vectors = os.path.join(workdir, f"{backend}.npy")
+    command = [
+        sys.executable, "-m", "benchmarks.bench_embedding_backends", "--worker", backend,
+        "--corpus-json", corpus_json, "--vectors", vectors,
+        "--threads", str(args.threads), "--batch-size", str(args.batch_size),
+    ]
+    if args.model:
+        command += ["--model", args.model]
+    if args.onnx_file:
+        command += ["--onnx-file", args.onnx_file]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"backend": backend, "error": error}
+    row = json.loads(completed.stdout.strip().splitlines()[-1])
+    row["vectors"] = np.load(vectors)
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,torch_int8,onnx")
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads; 0 keeps the library default")
+    parser.add_argument("--chunks", type=int, default=512, help="synthetic corpus size")
+    parser.add_argument("--chunk-words", type=int, default=200)
+    parser.add_argument("--corpus", help="text file to chunk instead of the synthetic corpus")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--model", help="model name or local path (default: the app's MODEL_NAME)")
+    parser.add_argument("--onnx-file", help="ONNX file inside the model repo (default: EMBEDDING_ONNX_FILE)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-json", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    if args.corpus:
+        from app.services.chunker import chunk_sliding
+
+        with open(args.corpus, encoding="utf-8") as handle:
+            corpus = chunk_sliding(handle.read())
+    else:
+        corpus = _synthetic_corpus(args.chunks, args.chunk_words, args.seed)
+
+    backends = args.backends.split(",")
+    if "torch" in backends:
+        backends.remove("torch")
+    backends.insert(0, "torch")
+
+    rows, failed = [], False
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_json = os.path.join(workdir, "corpus.json")
+        with open(corpus_json, "w") as handle:
+            json.dump(corpus, handle)
+        print(f"{len(corpus)} chunks, threads={args.threads or 'default'}")
+        print(f"{'backend':12} {'load s':>7} {'chunks/s':>9} {'rss MB':>8} {'peak MB':>8} {'cos mean':>9} {'cos min':>8}")
+        reference = None
+        for backend in backends:
+            row = _run_backend(backend, args, corpus_json, workdir)
+            if "error" in row:
+                print(f"{backend:12} failed: {row['error']}")
+                rows.append(row)
+                failed = failed or backend == "torch"
+                continue
+            vectors = row.pop("vectors")
+            if reference is None:
+                reference = vectors
+            cosines = _cosines(vectors, reference)
+            row.update(cos_mean=round(float(cosines.mean()), 5), cos_min=round(float(cosines.min()), 5))
+            row["equivalent"] = row["cos_min"] >= args.min_cosine
+            failed = failed or not row["equivalent"]
+            rows.append(row)
+            print(
+                f"{backend:12} {row['load_s']:7.2f} {row['chunks_per_s']:9.1f} {row['rss_loaded_mb']:8.0f} "
+                f"{row['peak_rss_mb']:8.0f} {row['cos_mean']:9.5f} {row['cos_min']:8.5f}"
+                + ("" if row["equivalent"] else f"  below --min-cosine {args.min_cosine}")
+            )
+
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump({"args": vars(args), "chunks": len(corpus), "results": rows}, handle, indent=2)
+        print(f"\nwrote {args.out}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-stage latency of dense vs hybrid (dense + lexical, RRF) retrieval, plus identifier recall.
+
+Each synthetic chunk embeds one identifier such as "SKU-004217"; queries ask for an identifier,
+so recall@k shows what the lexical leg adds. The in-memory client scores sparse vectors in
+pure Python, so its lexical latency is not representative; use --url against a real Qdrant
+(inverted sparse index) for the 1M-chunk numbers:
+
+    python -m benchmarks.bench_hybrid_retrieval --points 20000
+    python -m benchmarks.bench_hybrid_retrieval --points 1000000 --url http://localhost:6333
+"""
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.core.config import settings
+from app.services import retriever, vector_store
+from app.services.lexical import encode_documents
+
+COLLECTION = "bench_hybrid"
+WORDS = "pump valve motor sensor filter pressure flow battery cable housing seal bearing".split()
+
+
+def _text(i: int, rng: np.random.Generator) -> str:
+    filler = " ".join(rng.choice(WORDS, size=40))
+    return f"{filler} part SKU-{i:06d} replaces the {rng.choice(WORDS)} assembly. {filler}"
+
+
+def _load(points: int, dim: int, documents: int, batch: int) -> np.ndarray:
+    if vector_store.qdrant.collection_exists(COLLECTION):
+        vector_store.qdrant.delete_collection(COLLECTION)
+    vector_store.ensure_collection(COLLECTION, vector_size=dim)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((points, dim), dtype=np.float32)
+    for start in range(0, points, batch):
+        end = min(start + batch, points)
+        texts = [_text(i, rng) for i in range(start, end)]
+        vector_store.store_vectors(
+            ids=[str(uuid4()) for _ in texts],
+            vectors=vectors[start:end],
+            payloads=[
+                {"text": text, "document_id": f"doc-{i % documents}", "chunk_id": i, "filename": "bench.txt"}
+                for i, text in zip(range(start, end), texts)
+            ],
+            name=COLLECTION,
+            sparse_vectors=encode_documents(texts),
+        )
+    return vectors
+
+
+def _pct(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--query-noise", type=float, default=8.0, help="noise scale relative to the chunk vector norm")
+    parser.add_argument("--url", default=None, help="Qdrant URL; defaults to an in-memory client")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url, timeout=120) if args.url else QdrantClient(":memory:")
+    vector_store.qdrant = client
+
+    start = time.perf_counter()
+    vectors = _load(args.points, args.dim, args.documents, batch=5000)
+    print(f"loaded {args.points} chunks in {time.perf_counter() - start:.1f}s")
+
+    rng = np.random.default_rng(1)
+    limit = max(args.top_k, settings.hybrid_candidates)
+    stages = {"dense_ms": [], "lexical_ms": [], "fusion_ms": []}
+    hits = {"dense": 0, "hybrid": 0, "hybrid_filtered": 0}
+    for target in rng.integers(0, args.points, size=args.queries):
+        target = int(target)
+        query = f"which part is SKU-{target:06d}?"
+        # A noisy copy of the chunk vector stands in for a paraphrased query embedding.
+        vector = (vectors[target] + rng.standard_normal(args.dim, dtype=np.float32) * args.query_noise).tolist()
+
+        t0 = time.perf_counter()
+        dense = retriever.dense_search(vector, None, limit, name=COLLECTION)
+        t1 = time.perf_counter()
+        lexical = retriever.lexical_search(query, None, limit, name=COLLECTION)
+        t2 = time.perf_counter()
+        fused = retriever.reciprocal_rank_fusion([dense, lexical], settings.rrf_k, args.top_k)
+        t3 = time.perf_counter()
+        stages["dense_ms"].append((t1 - t0) * 1000)
+        stages["lexical_ms"].append((t2 - t1) * 1000)
+        stages["fusion_ms"].append((t3 - t2) * 1000)
+
+        hits["dense"] += any(p.payload["chunk_id"] == target for p in dense[:args.top_k])
+        hits["hybrid"] += any(p.payload["chunk_id"] == target for p in fused)
+
+        q_filter = retriever._document_filter(f"doc-{target % args.documents}")
+        filtered = retriever.reciprocal_rank_fusion(
+            [retriever.dense_search(vector, q_filter, limit, name=COLLECTION),
+             retriever.lexical_search(query, q_filter, limit, name=COLLECTION)],
+            settings.rrf_k, args.top_k,
+        )
+        assert all(p.payload["document_id"] == f"doc-{target % args.documents}" for p in filtered)
+        hits["hybrid_filtered"] += any(p.payload["chunk_id"] == target for p in filtered)
+
+    print(f"points={args.points} queries={args.queries} top_k={args.top_k} candidates={limit}")
+    for stage, samples in stages.items():
+        print(f"{stage:11s} p50 {_pct(samples, 50):8.2f}  p95 {_pct(samples, 95):8.2f}  p99 {_pct(samples, 99):8.2f}")
+    for mode, count in hits.items():
+        print(f"recall@{args.top_k} {mode:16s} {count / args.queries:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Show that concurrent call_llm requests overlap instead of queueing on the event loop.
+
+Run from the backend directory: python -m benchmarks.bench_llm_concurrency --chats 8
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services import llm
+from benchmarks.fake_ollama import FakeOllama
+
+MESSAGES = [{"role": "user", "content": "What are your opening hours?"}]
+
+
+async def run(chats: int, token_latency: float) -> None:
+    async with FakeOllama(token_latency=token_latency) as server:
+        settings.ollama_url = server.url
+        settings.llm_max_concurrency = max(settings.llm_max_concurrency, chats)
+        await llm.close_llm_client()
+
+        start = time.perf_counter()
+        await llm.call_llm(MESSAGES)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(llm.call_llm(MESSAGES) for _ in range(chats)))
+        concurrent = time.perf_counter() - start
+
+        await llm.close_llm_client()
+
+    print(f"one generation        : {single:6.3f}s")
+    print(f"{chats:>3} concurrent chats : {concurrent:6.3f}s ({concurrent / single:4.2f}x one generation)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chats", type=int, default=8)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(run(args.chats, args.token_latency))
+
+
+if __name__ == "__main__":
+    main()
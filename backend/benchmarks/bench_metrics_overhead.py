@@ -0,0 +1,73 @@
+"""Cost of the stage metrics: one track() block, and the Server-Timing middleware per request.
+
+The middleware case drives a bare FastAPI app in-process through httpx's ASGI transport, with and
+without the middleware, so the difference is the per-request instrumentation cost.
+
+Run from the backend directory: python -m benchmarks.bench_metrics_overhead
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import ServerTimingMiddleware, track
+
+
+def bench_track(calls: int) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        pass
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        with track("bench"):
+            pass
+    cost = (time.perf_counter() - start - baseline) / calls
+    print(f"track() block: {cost * 1e6:.2f} us per call")
+
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping/{item}")
+    async def ping(item: int) -> dict:
+        with track("bench_stage"):
+            return {"item": item}
+
+    if instrumented:
+        app.add_middleware(ServerTimingMiddleware)
+    return app
+
+
+async def _requests_per_sec(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(50):
+            await client.get(f"/ping/{i}")
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/ping/{i}")
+        return requests / (time.perf_counter() - start)
+
+
+async def bench_middleware(requests: int) -> None:
+    plain = await _requests_per_sec(_app(False), requests)
+    timed = await _requests_per_sec(_app(True), requests)
+    per_request = (1 / timed - 1 / plain) * 1e6
+    print(f"requests/sec without middleware={plain:,.0f} with={timed:,.0f} (~{per_request:.0f} us per request)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    bench_track(args.calls)
+    asyncio.run(bench_middleware(args.requests))
+
+
+if __name__ == "__main__":
+    main()
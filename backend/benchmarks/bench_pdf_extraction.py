@@ -0,0 +1,96 @@
+"""Wall time and peak RSS of PDF extraction: in-memory sequential vs on-disk parallel page ranges.
+
+Run from the backend directory: python -m benchmarks.bench_pdf_extraction --pages 400
+Each mode runs in its own subprocess so peak RSS is measured cleanly.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+LINE = "Section {page}.{line}: employees must submit expense reports within thirty days of purchase."
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 45) -> None:
+    """Write a plain text-only PDF without extra dependencies."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        body = ["BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line in range(lines_per_page):
+            body.append(f"({LINE.format(page=page + 1, line=line + 1)}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids).encode(), pages)
+
+    with open(path, "wb") as handle:
+        handle.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, obj in enumerate(objects, start=1):
+            offsets.append(handle.tell())
+            handle.write(b"%d 0 obj\n%s\nendobj\n" % (number, obj))
+        xref = handle.tell()
+        handle.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            handle.write(b"%010d 00000 n \n" % offset)
+        handle.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def _run_mode(mode: str, path: str) -> None:
+    from app.services import text_extractor
+
+    start = time.perf_counter()
+    if mode == "old":
+        with open(path, "rb") as handle:
+            contents = handle.read()
+        text = text_extractor.extract_text(contents, content_type="application/pdf")
+    else:
+        text = text_extractor.extract_text(path, content_type="application/pdf")
+        text_extractor.shutdown_pdf_pool()
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024, "worker_peak_rss_mb": children_kb / 1024, "chars": len(text)}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--mode", choices=["old", "new"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run_mode(args.mode, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        write_pdf(path, args.pages)
+        print(f"pages={args.pages} size={os.path.getsize(path) / 1e6:.1f} MB")
+        for mode in ("old", "new"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf_extraction", "--mode", mode, "--path", path],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(out)
+            print(
+                f"{mode:>4}: {result['seconds']:7.2f}s  peak RSS {result['peak_rss_mb']:7.1f} MB"
+                f"  (largest worker {result['worker_peak_rss_mb']:6.1f} MB)  chars={result['chars']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
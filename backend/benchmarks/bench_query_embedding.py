@@ -0,0 +1,54 @@
+"""Query-embedding throughput for 1/8/64 concurrent callers: on-loop encode vs the micro-batcher.
+
+Run from the backend directory: python -m benchmarks.bench_query_embedding --rounds 20
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services import embedings
+
+QUERIES = [
+    "what are your opening hours",
+    "how do I reset my password",
+    "where is the refund policy",
+    "who do I contact for billing questions",
+]
+
+
+async def _on_loop(query: str):
+    # The previous behaviour: a blocking encode of a single query on the event loop.
+    return embedings.model.encode(query)
+
+
+async def _drive(embed, callers: int, rounds: int) -> float:
+    start = time.perf_counter()
+    for r in range(rounds):
+        await asyncio.gather(*(embed(QUERIES[(r + i) % len(QUERIES)]) for i in range(callers)))
+    return callers * rounds / (time.perf_counter() - start)
+
+
+async def run(rounds: int) -> None:
+    if embedings.model is None:
+        raise SystemExit("Embedding model is not available.")
+    embedings.model.encode(QUERIES)  # warm-up
+    embedings.query_cache.max_size = 0  # measure encoding, not cache hits
+
+    print(f"window={settings.embed_batch_window_ms}ms max_batch={settings.embed_max_batch_size}")
+    print(f"{'callers':>8} {'on-loop q/s':>12} {'batched q/s':>12}")
+    for callers in (1, 8, 64):
+        baseline = await _drive(_on_loop, callers, rounds)
+        batched = await _drive(embedings.embed_query, callers, rounds)
+        print(f"{callers:>8} {baseline:>12.0f} {batched:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
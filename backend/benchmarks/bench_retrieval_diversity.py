@@ -0,0 +1,118 @@
+"""Prompt size and retrieval latency with and without MMR diversification + span merging.
+
+Documents are chunked with the sliding strategy (500 words, 200 overlap), so plain top-k often
+returns overlapping neighbours. Unless --real-model is given, chunks and queries are embedded
+with a bag-of-words hashing encoder so the benchmark runs without downloading MiniLM; it keeps
+the property that matters here, overlapping text -> similar vectors.
+
+Run from the backend directory: python -m benchmarks.bench_retrieval_diversity --documents 20
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.services import embedings, retriever, vector_store
+from app.services.chunker import chunk_sliding
+from app.services.lexical import encode_documents
+from app.services.prompt_builder import build_prompt
+from benchmarks.stand_ins import HashingEncoder
+
+
+def _corpus(documents: int, words_per_doc: int, rng: np.random.Generator) -> list[list[str]]:
+    vocabulary = [f"term{i}" for i in range(5000)]
+    # Each document drifts through topics so neighbouring windows share vocabulary.
+    docs = []
+    for _ in range(documents):
+        words = []
+        while len(words) < words_per_doc:
+            topic = rng.choice(vocabulary, size=60, replace=False)
+            words.extend(rng.choice(topic, size=150))
+        docs.append(words[:words_per_doc])
+    return docs
+
+
+def _load(docs: list[list[str]]) -> None:
+    if vector_store.qdrant.collection_exists(retriever.COLLECTION):
+        vector_store.qdrant.delete_collection(retriever.COLLECTION)
+    vector_store.ensure_collection(retriever.COLLECTION)
+    for index, words in enumerate(docs):
+        chunks = chunk_sliding(" ".join(words))
+        vector_store.store_vectors(
+            ids=[str(uuid4()) for _ in chunks],
+            vectors=embedings.model.encode(chunks),
+            payloads=[
+                {"text": chunk, "document_id": f"doc-{index}", "chunk_id": i, "filename": "bench.txt"}
+                for i, chunk in enumerate(chunks)
+            ],
+            sparse_vectors=encode_documents(chunks),
+        )
+
+
+def _covered_words(chunks: list[dict]) -> int:
+    """Distinct document word positions in the context; sliding chunk i covers [300i, 300i + 500)."""
+    covered = set()
+    for chunk in chunks:
+        for chunk_id in chunk.get("chunk_ids") or [chunk["chunk_id"]]:
+            covered.update((chunk["document_id"], position) for position in range(300 * chunk_id, 300 * chunk_id + 500))
+    return len(covered)
+
+
+async def _run(queries: list[str], top_k: int, diversify: bool) -> dict:
+    latencies, context_words, duplicated, sources = [], [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        chunks = await retriever.retrieve_chunks(query, top_k=top_k, diversify=diversify)
+        latencies.append((time.perf_counter() - start) * 1000)
+        messages = build_prompt([], chunks, query)
+        words = sum(len(chunk["text"].split()) for chunk in chunks)
+        context_words.append(len(messages[1]["content"].split()))
+        duplicated.append(words - min(words, _covered_words(chunks)))
+        sources.append(len(chunks))
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "context_words": float(np.mean(context_words)),
+        "duplicated_words": float(np.mean(duplicated)),
+        "sources": float(np.mean(sources)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--words-per-doc", type=int, default=6000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--real-model", action="store_true")
+    args = parser.parse_args()
+
+    vector_store.qdrant = QdrantClient(":memory:")
+    if not args.real_model:
+        embedings.model = HashingEncoder()
+    if embedings.model is None:
+        raise SystemExit("Embedding model is not available.")
+    embedings.query_cache.max_size = 0
+
+    rng = np.random.default_rng(0)
+    docs = _corpus(args.documents, args.words_per_doc, rng)
+    _load(docs)
+    queries = []
+    for _ in range(args.queries):
+        words = docs[rng.integers(len(docs))]
+        start = int(rng.integers(0, len(words) - 40))
+        queries.append(" ".join(words[start:start + 40]))
+
+    asyncio.run(_run(queries[:5], args.top_k, False))  # warm-up
+    print(f"documents={args.documents} queries={args.queries} top_k={args.top_k}")
+    print(f"{'mode':>10} {'p50 ms':>8} {'p95 ms':>8} {'context words':>14} {'duplicated':>11} {'sources':>8}")
+    for label, diversify in (("plain", False), ("mmr+merge", True)):
+        result = asyncio.run(_run(queries, args.top_k, diversify))
+        print(f"{label:>10} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['context_words']:14.0f} {result['duplicated_words']:11.0f} {result['sources']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Count Redis round trips per /chat/message turn and assert the budget of two (one read, one write).
+
+Runs the real endpoint against fakeredis, the fake Ollama server and a throwaway SQLite file;
+retrieval is stubbed since Qdrant is not under test. A direct command or a pipeline execute
+each count as one round trip.
+
+Run from the backend directory: python -m benchmarks.bench_session_round_trips
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/round_trips.db")
+
+import redis.asyncio.client as redis_async_client
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services import rag_pipeline
+from benchmarks.stand_ins import start_fake_ollama, use_fake_redis
+
+MAX_ROUND_TRIPS = 2
+commands: list[str] = []
+
+
+def _count_round_trips() -> None:
+    execute_command = redis_async_client.Redis.execute_command
+    execute_pipeline = redis_async_client.Pipeline.execute
+
+    async def counted_command(self, *args, **kwargs):
+        commands.append(str(args[0]))
+        return await execute_command(self, *args, **kwargs)
+
+    async def counted_pipeline(self, *args, **kwargs):
+        commands.append(f"PIPELINE[{len(self.command_stack)}]")
+        return await execute_pipeline(self, *args, **kwargs)
+
+    redis_async_client.Redis.execute_command = counted_command
+    redis_async_client.Pipeline.execute = counted_pipeline
+
+
+async def _stub_retrieve(query, document_id=None, **kwargs):
+    return [{"text": "Refunds are issued within 14 days.", "document_id": "doc", "chunk_id": 0, "score": 0.9}]
+
+
+def main() -> None:
+    server = start_fake_ollama('{"name": null, "email": null, "date": "next Friday", "time": null}', token_latency=0.0)
+    settings.ollama_url = server.url
+    use_fake_redis()
+    rag_pipeline.retrieve_chunks = _stub_retrieve
+    _count_round_trips()
+
+    turns = [
+        ("rag", "What is the refund policy?"),
+        ("rag, follow-up", "And for annual plans?"),
+        ("booking, missing fields", "Please book an interview next Friday"),
+        ("booking, draft follow-up", "at 3pm"),
+    ]
+    failed = False
+    with TestClient(app) as http:
+        for label, query in turns:
+            commands.clear()
+            response = http.post("/chat/message", json={"session_id": "rt", "query": query})
+            response.raise_for_status()
+            ok = len(commands) <= MAX_ROUND_TRIPS
+            failed |= not ok
+            print(f"{label:26} round trips={len(commands)} {'ok' if ok else 'OVER BUDGET'}  {commands}")
+
+    if failed:
+        raise SystemExit(f"More than {MAX_ROUND_TRIPS} Redis round trips in a turn")
+
+
+if __name__ == "__main__":
+    main()
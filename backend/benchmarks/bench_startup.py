@@ -0,0 +1,78 @@
+"""Cold-start cost: import time of app.main, then time until /ready reports the app warm.
+
+Import time is measured in fresh interpreters (median of --runs), together with which heavy
+libraries the import pulled in; none of them should be loaded until warm-up. The readiness part
+boots the app once and polls /ready, printing each warm-up component's duration. With --stand-ins
+Qdrant runs in memory and Ollama is the fake server; the embedding model is always the real one.
+
+Run from the backend directory: python -m benchmarks.bench_startup --stand-ins
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "spacy", "pdfplumber", "qdrant_client")
+IMPORT_PROBE = (
+    "import json, sys, time; start = time.perf_counter(); import app.main; "
+    "print(json.dumps({'seconds': time.perf_counter() - start, "
+    f"'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+)
+
+
+def bench_import(runs: int) -> None:
+    samples, loaded = [], []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True, env=os.environ.copy()
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded = result["loaded"]
+    print(f"import app.main: median {statistics.median(samples):.2f}s over {runs} runs (min {min(samples):.2f}s)")
+    print(f"heavy modules loaded by the import: {', '.join(loaded) or 'none'}")
+
+
+def bench_ready(timeout: float) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        first = client.get("/ready").status_code
+        while True:
+            report = client.get("/ready").json()
+            if not report["warming_up"] or time.perf_counter() - start > timeout:
+                break
+            time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    print(f"/ready right after startup: {first}; warm-up finished after {elapsed:.2f}s, ready={report['ready']}")
+    for name, component in report["components"].items():
+        error = f" ({component['error'][:80]})" if component.get("error") else ""
+        print(f"  {name:16} {component['status']:8} {component.get('ms', 0):8.1f} ms{error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--stand-ins", action="store_true", help="in-memory Qdrant and the fake Ollama server")
+    args = parser.parse_args()
+
+    bench_import(args.runs)
+    if args.stand_ins:
+        os.environ["QDRANT_URL"] = ":memory:"
+        from app.core.config import settings
+        from benchmarks.stand_ins import start_fake_ollama
+
+        settings.qdrant_url = ":memory:"
+        settings.ollama_url = start_fake_ollama(token_latency=0.0).url
+    bench_ready(args.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare per-chunk store_vector against batched store_vectors on an in-memory Qdrant.
+
+Run from the backend directory: python -m benchmarks.bench_vector_store --points 2000
+"""
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.services import vector_store
+
+
+def _payloads(n: int) -> list[dict]:
+    return [
+        {"text": f"chunk {i}", "document_id": "bench", "chunk_id": i, "filename": "bench.txt"}
+        for i in range(n)
+    ]
+
+
+def _fresh_collection(name: str, dim: int) -> None:
+    if vector_store.qdrant.collection_exists(name):
+        vector_store.qdrant.delete_collection(name)
+    vector_store.ensure_collection(name, vector_size=dim)
+
+
+def bench_single(vectors: np.ndarray, payloads: list[dict], name: str) -> float:
+    start = time.perf_counter()
+    for i in range(len(vectors)):
+        vector_store.store_vector(id=str(uuid4()), vector=vectors[i].tolist(), payload=payloads[i], name=name)
+    return time.perf_counter() - start
+
+
+def bench_bulk(vectors: np.ndarray, payloads: list[dict], name: str, batch_size: int) -> float:
+    start = time.perf_counter()
+    vector_store.store_vectors(
+        ids=[str(uuid4()) for _ in range(len(vectors))],
+        vectors=vectors,
+        payloads=payloads,
+        name=name,
+        batch_size=batch_size,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    vector_store.qdrant = QdrantClient(":memory:")
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    payloads = _payloads(args.points)
+
+    _fresh_collection("bench_single", args.dim)
+    single = bench_single(vectors, payloads, "bench_single")
+    _fresh_collection("bench_bulk", args.dim)
+    bulk = bench_bulk(vectors, payloads, "bench_bulk", args.batch_size)
+
+    print(f"points={args.points} dim={args.dim} batch_size={args.batch_size}")
+    print(f"store_vector  (per chunk): {single:8.3f}s  {args.points / single:10.0f} points/sec")
+    print(f"store_vectors (batched)  : {bulk:8.3f}s  {args.points / bulk:10.0f} points/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Minimal stand-in for the Ollama HTTP API with a configurable per-token latency.
+
+Serves POST /api/chat (streamed NDJSON or a single JSON reply) and GET /api/tags
+over plain asyncio so benchmarks need no running model.
+
+Run standalone: python -m benchmarks.fake_ollama --port 11434 --token-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+from typing import Optional
+
+DEFAULT_ANSWER = (
+    "Based on the provided context, the document describes the onboarding process, "
+    "the support hours, and how to reset a password from the account settings page."
+)
+
+
+class FakeOllama:
+    """An asyncio HTTP/1.1 server that mimics Ollama's chat endpoint."""
+
+    def __init__(self, answer: str = DEFAULT_ANSWER, token_latency: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        self.answer = answer
+        self.token_latency = token_latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def tokens(self) -> list[str]:
+        words = self.answer.split(" ")
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    async def start(self) -> "FakeOllama":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeOllama":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+
+                if method == "POST" and path == "/api/chat":
+                    payload = json.loads(body or b"{}")
+                    if payload.get("stream", True):
+                        await self._stream_chat(writer, payload)
+                    else:
+                        await self._chat(writer, payload)
+                elif method == "GET" and path == "/api/tags":
+                    await self._send_json(writer, {"models": [{"name": "deepseek-r1:1.5b"}]})
+                else:
+                    await self._send_json(writer, {"error": "not found"}, status="404 Not Found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, data: dict, status: str = "200 OK") -> None:
+        body = json.dumps(data).encode()
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _chat(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        await asyncio.sleep(self.token_latency * len(self.tokens))
+        await self._send_json(writer, {
+            "model": payload.get("model"),
+            "message": {"role": "assistant", "content": self.answer},
+            "done": True,
+            "prompt_eval_count": sum(len(m.get("content", "").split()) for m in payload.get("messages", [])),
+            "eval_count": len(self.tokens),
+        })
+
+    async def _stream_chat(self, writer: asyncio.StreamWriter, payload: dict) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n"
+        )
+        for token in self.tokens:
+            await asyncio.sleep(self.token_latency)
+            self._write_chunk(writer, {"model": payload.get("model"), "message": {"role": "assistant", "content": token}, "done": False})
+            await writer.drain()
+        self._write_chunk(writer, {
+            "model": payload.get("model"),
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            "eval_count": len(self.tokens),
+        })
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: dict) -> None:
+        line = json.dumps(data).encode() + b"\n"
+        writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = await FakeOllama(token_latency=args.token_latency, host=args.host, port=args.port).start()
+    print(f"fake ollama listening on {server.url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    asyncio.run(_serve(parser.parse_args()))
@@ -0,0 +1,262 @@
+"""Load test: drive the real FastAPI app in-process and report throughput and latency percentiles.
+
+By default every external service is replaced by an in-process stand-in (benchmarks.stand_ins):
+in-memory Qdrant, fakeredis, FakeOllama with --token-latency per token, a hashing encoder in
+place of MiniLM (--real-model keeps MiniLM) and a throwaway SQLite file. --external uses the
+services from the environment instead (QDRANT_URL, REDIS_URL, OLLAMA_URL, DATABASE_URL).
+
+For each concurrency level the harness sends a mix of RAG and booking turns to /chat/message,
+then a run of uploads to /document/ingestion/, and records per-endpoint throughput, error count
+and p50/p95/p99 latency. Results are written as JSON; --compare prints the change against an
+earlier results file.
+
+The client, the app and (unless --external) the stand-ins share one process, so absolute numbers
+include their CPU; compare runs made on the same machine.
+
+Run from the backend directory:
+    python -m benchmarks.load_test --concurrency 1,8,32 --requests 200 --out load.json
+    python -m benchmarks.load_test --compare load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+RAG_QUERIES = [
+    "What is the refund policy?",
+    "How long does onboarding take?",
+    "Who approves expense reports?",
+    "What are the support hours?",
+    "How do I reset my password?",
+    "Summarize the security section.",
+]
+BOOKING_MESSAGES = [
+    # Complete: settled by the regex pass, no LLM call.
+    "Book an interview for me, I'm Sita, sita@example.com, next Friday 3pm",
+    "Please schedule a meeting: my name is Anna Lee, anna@lee.org, Thursday 2pm",
+    # Partial: the extractor asks the LLM for what is missing.
+    "Can you book an interview next Monday?",
+    "I'd like to schedule a call with the hiring team",
+]
+TOPICS = ["refunds", "onboarding", "expenses", "support", "passwords", "security", "travel", "payroll"]
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _document(index: int, words: int, rng: random.Random) -> bytes:
+    """A unique text document so ingestion is never short-circuited by deduplication."""
+    topic = TOPICS[index % len(TOPICS)]
+    sentences = []
+    while sum(len(s.split()) for s in sentences) < words:
+        sentences.append(
+            f"The {topic} policy item {rng.randint(0, 10**6)} says requests are handled within "
+            f"{rng.randint(1, 30)} days by the {rng.choice(TOPICS)} team."
+        )
+    return f"Document {index} about {topic}. ".encode() + " ".join(sentences).encode()
+
+
+def _summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float, concurrency: int) -> List[dict]:
+    rows = []
+    for endpoint in sorted(set(latencies) | set(errors)):
+        ordered = sorted(latencies.get(endpoint, []))
+        total = len(ordered) + errors.get(endpoint, 0)
+        rows.append({
+            "endpoint": endpoint,
+            "concurrency": concurrency,
+            "requests": total,
+            "errors": errors.get(endpoint, 0),
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else None,
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        })
+    return rows
+
+
+async def _run_phase(client, requests: List[Tuple[str, str, dict]], concurrency: int) -> List[dict]:
+    """Send (endpoint label, path, httpx kwargs) requests with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    async def one(label: str, path: str, kwargs: dict) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, **kwargs)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies[label].append(time.perf_counter() - start)
+            else:
+                errors[label] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    return _summarize(latencies, errors, time.perf_counter() - start, concurrency)
+
+
+def _chat_requests(count: int, booking_share: float, rng: random.Random, level: int) -> List[Tuple[str, str, dict]]:
+    requests = []
+    for i in range(count):
+        if rng.random() < booking_share:
+            body = {"session_id": f"book-{level}-{i}", "query": rng.choice(BOOKING_MESSAGES)}
+            requests.append(("chat:booking", "/chat/message", {"json": body}))
+        else:
+            # A handful of sessions per level so history grows like real conversations.
+            body = {"session_id": f"rag-{level}-{i % 20}", "query": rng.choice(RAG_QUERIES)}
+            requests.append(("chat:rag", "/chat/message", {"json": body}))
+    return requests
+
+
+def _ingest_requests(count: int, words: int, rng: random.Random, offset: int) -> List[Tuple[str, str, dict]]:
+    return [
+        ("ingestion", "/document/ingestion/", {
+            "files": {"file": (f"doc-{offset + i}.txt", _document(offset + i, words, rng), "text/plain")}
+        })
+        for i in range(count)
+    ]
+
+
+def _configure_environment(args: argparse.Namespace, workdir: str) -> None:
+    """Settings are read at import time, so stand-in locations must be in the environment first."""
+    if args.external:
+        return
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'load_test.db')}"
+    os.environ["QDRANT_URL"] = ":memory:"
+    os.environ["INGESTION_JOB_DIR"] = os.path.join(workdir, "jobs")
+    if not args.real_model:
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+
+async def _drive(args: argparse.Namespace) -> List[dict]:
+    import httpx
+
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results: List[dict] = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            # Seed the corpus so RAG turns retrieve real chunks.
+            seed = await _run_phase(client, _ingest_requests(args.seed_documents, args.document_words, rng, 0), 4)
+            if any(row["errors"] for row in seed):
+                raise SystemExit(f"Seeding the corpus failed: {seed}")
+
+            # All chat levels run before any ingestion level so every chat level sees the same corpus.
+            for level in levels:
+                results += await _run_phase(client, _chat_requests(args.requests, args.booking_share, rng, level), level)
+            offset = args.seed_documents
+            for level in levels:
+                results += await _run_phase(client, _ingest_requests(args.ingest_requests, args.document_words, rng, offset), level)
+                offset += args.ingest_requests
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _print_table(results: List[dict]) -> None:
+    print(f"{'endpoint':14} {'conc':>5} {'reqs':>6} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for row in results:
+        print(
+            f"{row['endpoint']:14} {row['concurrency']:5} {row['requests']:6} {row['errors']:6} "
+            f"{row['throughput_rps']:9.1f} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f}"
+        )
+
+
+def _print_comparison(results: List[dict], baseline_path: str) -> None:
+    with open(baseline_path) as handle:
+        baseline = {(row["endpoint"], row["concurrency"]): row for row in json.load(handle)["results"]}
+    print(f"\nchange vs {baseline_path} (negative latency / positive throughput is better)")
+    print(f"{'endpoint':14} {'conc':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+
+    def delta(new: float, old: float) -> str:
+        return f"{(new - old) / old:+8.1%}" if old else "     n/a"
+
+    for row in results:
+        old = baseline.get((row["endpoint"], row["concurrency"]))
+        if old is None:
+            continue
+        print(
+            f"{row['endpoint']:14} {row['concurrency']:5} {delta(row['throughput_rps'], old['throughput_rps']):>9} "
+            f"{delta(row['p50_ms'], old['p50_ms']):>9} {delta(row['p95_ms'], old['p95_ms']):>9} {delta(row['p99_ms'], old['p99_ms']):>9}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="chat requests per level")
+    parser.add_argument("--booking-share", type=float, default=0.3, help="fraction of chat requests that are booking turns")
+    parser.add_argument("--ingest-requests", type=int, default=20, help="uploads per level")
+    parser.add_argument("--document-words", type=int, default=2000)
+    parser.add_argument("--seed-documents", type=int, default=8)
+    parser.add_argument("--token-latency", type=float, default=0.005, help="fake Ollama seconds per token")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--external", action="store_true", help="use the configured services instead of stand-ins")
+    parser.add_argument("--real-model", action="store_true", help="embed with MiniLM instead of the hashing encoder")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="results JSON of an earlier run to diff against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure_environment(args, workdir)
+        from app.core.config import settings
+        from app.services import embedings
+        from benchmarks.stand_ins import HashingEncoder, start_fake_ollama, use_fake_redis
+
+        if not args.external:
+            use_fake_redis()
+            settings.ollama_url = start_fake_ollama(token_latency=args.token_latency).url
+        if not args.real_model:
+            embedings.model = HashingEncoder()
+        results = asyncio.run(_drive(args))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "stand_ins": not args.external,
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    _print_table(results)
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nwrote {args.out}")
+    if args.compare:
+        _print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""In-process stand-ins for the services the app talks to, shared by the benchmarks.
+
+Qdrant runs in memory via QDRANT_URL=":memory:", Redis is fakeredis, Ollama is FakeOllama on a
+background event loop, and MiniLM can be replaced by a hashing encoder with the same encode() shape.
+"""
+import asyncio
+import threading
+import zlib
+
+import numpy as np
+
+from app.services.lexical import tokenize
+from benchmarks.fake_ollama import DEFAULT_ANSWER, FakeOllama
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words embedding with the SentenceTransformer encode() shape."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(text):
+            vector[zlib.crc32(token.encode()) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._one(texts)
+        return np.stack([self._one(text) for text in texts])
+
+
+def use_fake_redis():
+    """Point every async Redis user at one shared fakeredis instance and return it."""
+    import fakeredis
+
+    from app.services import chat_memory, session_state
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    chat_memory.async_redis_client = session_state.async_redis_client = client
+    return client
+
+
+def start_fake_ollama(answer: str = DEFAULT_ANSWER, token_latency: float = 0.02) -> FakeOllama:
+    """Serve FakeOllama from its own thread and loop so it keeps answering whatever the caller's loop does."""
+    loop = asyncio.new_event_loop()
+    server = FakeOllama(answer=answer, token_latency=token_latency)
+    threading.Thread(target=loop.run_forever, daemon=True, name="fake-ollama").start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    return server
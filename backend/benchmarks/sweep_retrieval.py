@@ -0,0 +1,279 @@
+"""Retrieval quality vs cost sweep over chunking, top_k and Qdrant search parameters.
+
+For every chunking configuration (strategy x chunk size x overlap) the corpus is chunked with
+app.services.chunker, embedded with embedings.embed_chunks and stored in a fresh in-memory
+collection (or --url). Every labeled question is then answered with retriever.retrieve_chunks
+for each retrieval mode, search ef and top_k. Each configuration reports:
+- recall@k: the share of questions with a relevant chunk in the top k
+- MRR: the mean reciprocal rank of the first relevant chunk
+- index size: chunks and approximate bytes
+- ingestion time
+- p50/p99 retrieval latency
+
+The output is a table and, with --out, JSON. Rows that no other row beats on recall, MRR, p99
+latency and index size together are marked Pareto-optimal.
+
+Labels name evidence text, not chunk ids, because chunk boundaries change with the
+configuration. A retrieved chunk is relevant if it comes from the question's document and
+contains the evidence: all of it, or at least --evidence-overlap of its word trigrams when a
+boundary cuts through it. --dataset takes JSON in this shape:
+    {"documents": [{"id": "handbook", "text": "..."} or {"id": "spec", "path": "spec.pdf"}],
+     "questions": [{"question": "...", "document_id": "handbook", "evidence": "..."}]}
+Without --dataset, a synthetic corpus of fact sentences in filler text is generated.
+
+Local mode does exact search, so search ef only has an effect with --url. Sentence overlap
+counts sentences, as in chunk_sentence; fixed chunks have no overlap. Sentence chunking needs the
+spaCy model, or SENTENCE_CHUNK_FAST=true for the rule-based splitter; without either it is skipped.
+
+Run from the backend directory:
+    python -m benchmarks.sweep_retrieval --dataset qa.json --out sweep.json
+    python -m benchmarks.sweep_retrieval --hashing-encoder --strategies fixed,sliding --chunk-sizes 100,300
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+import warnings
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.core.config import settings
+from app.services import embedings, retriever, vector_store
+from app.services.chunker import chunk_fixed, chunk_sentence, chunk_sliding
+from app.services.embedding_cache import query_cache
+from app.services.lexical import encode_documents
+from app.services.text_extractor import extract_text
+
+ENTITIES = ["Atlas", "Borealis", "Cobalt", "Delta", "Ember", "Fjord", "Granite", "Helix", "Iris", "Juniper"]
+ATTRIBUTES = ["launch date", "budget owner", "support tier", "data region", "retention period", "on-call team"]
+FILLER = (
+    "The quarterly review covered staffing, travel and the usual process updates. "
+    "Teams were reminded to file expenses on time and to keep documentation current. "
+    "Several open questions were deferred to the next planning cycle. "
+)
+
+
+def synthetic_dataset(documents: int, facts_per_document: int, seed: int) -> Dict[str, Any]:
+    """Documents of filler paragraphs with one fact sentence per (entity, attribute) pair asked about."""
+    rng = random.Random(seed)
+    docs, questions = [], []
+    for index in range(documents):
+        doc_id = f"doc-{index}"
+        paragraphs = []
+        for _ in range(facts_per_document):
+            entity, attribute = rng.choice(ENTITIES), rng.choice(ATTRIBUTES)
+            value = f"{rng.choice(['Q', 'R', 'S'])}{rng.randint(100, 999)}"
+            fact = f"For project {entity} in {doc_id}, the {attribute} is {value}."
+            paragraphs.append(FILLER * rng.randint(2, 6) + fact + " " + FILLER * rng.randint(2, 6))
+            questions.append({
+                "question": f"What is the {attribute} of project {entity} in {doc_id}?",
+                "document_id": doc_id,
+                "evidence": fact,
+            })
+        docs.append({"id": doc_id, "text": "\n\n".join(paragraphs)})
+    return {"documents": docs, "questions": questions}
+
+
+def load_dataset(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        dataset = json.load(handle)
+    base = os.path.dirname(os.path.abspath(path))
+    for document in dataset["documents"]:
+        if "text" not in document:
+            source = os.path.join(base, document["path"])
+            document["text"] = extract_text(source, filename=source)
+    return dataset
+
+
+def _trigrams(words: List[str]) -> set:
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+def is_relevant(chunk: Dict[str, Any], question: Dict[str, Any], min_overlap: float) -> bool:
+    if chunk.get("document_id") != question["document_id"]:
+        return False
+    text = " ".join(chunk["text"].split())
+    evidence = " ".join(question["evidence"].split())
+    if evidence in text:
+        return True
+    evidence_grams = _trigrams(evidence.split())
+    return len(evidence_grams & _trigrams(text.split())) / len(evidence_grams) >= min_overlap
+
+
+def _chunk(text: str, strategy: str, size: int, overlap: int) -> List[str]:
+    if strategy == "fixed":
+        return chunk_fixed(text, chunk_size=size)
+    if strategy == "sentence":
+        return chunk_sentence(text, chunk_size=size, overlap=overlap)
+    return chunk_sliding(text, chunk_size=size, overlap=overlap)
+
+
+def chunk_configs(args: argparse.Namespace) -> List[Tuple[str, int, int]]:
+    configs = []
+    for strategy, size in itertools.product(args.strategies.split(","), _ints(args.chunk_sizes)):
+        if strategy == "fixed":
+            overlaps = [0]
+        elif strategy == "sentence":
+            overlaps = _ints(args.sentence_overlaps)
+        else:
+            overlaps = [overlap for overlap in _ints(args.overlaps) if overlap < size]
+        configs += [(strategy, size, overlap) for overlap in overlaps]
+    return configs
+
+
+async def ingest(dataset: Dict[str, Any], strategy: str, size: int, overlap: int) -> Dict[str, Any]:
+    """Rebuild the retriever's collection with this chunking; returns size and timing."""
+    client = vector_store.get_client()
+    if client.collection_exists(retriever.COLLECTION):
+        client.delete_collection(retriever.COLLECTION)
+    start = time.perf_counter()
+    vector_store.ensure_collection(retriever.COLLECTION)
+    chunks_total, text_bytes = 0, 0
+    for document in dataset["documents"]:
+        chunks = _chunk(document["text"], strategy, size, overlap)
+        if not chunks:
+            continue
+        vectors = np.asarray(await embedings.embed_chunks(chunks), dtype=np.float32)
+        vector_store.store_vectors(
+            ids=[str(uuid4()) for _ in chunks],
+            vectors=vectors,
+            payloads=[
+                {"text": chunk, "document_id": document["id"], "chunk_id": i, "filename": document["id"]}
+                for i, chunk in enumerate(chunks)
+            ],
+            sparse_vectors=encode_documents(chunks),
+        )
+        chunks_total += len(chunks)
+        text_bytes += sum(len(chunk.encode("utf-8")) for chunk in chunks)
+    seconds = time.perf_counter() - start
+    dim = vectors.shape[1] if chunks_total else 0
+    return {
+        "chunks": chunks_total,
+        # Dense float32 vectors plus stored chunk text; sparse vectors and index overhead come on top.
+        "index_mb": round((chunks_total * dim * 4 + text_bytes) / 2**20, 2),
+        "ingest_s": round(seconds, 2),
+        "ingest_chunks_per_s": round(chunks_total / seconds, 1) if seconds else 0.0,
+    }
+
+
+async def evaluate(questions: List[Dict[str, Any]], top_k: int, mode: str, min_overlap: float) -> Dict[str, float]:
+    query_cache.clear()
+    latencies, hits, reciprocal_ranks = [], 0, []
+    for question in questions:
+        start = time.perf_counter()
+        chunks = await retriever.retrieve_chunks(question["question"], top_k=top_k, mode=mode, diversify=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rank = next((i for i, chunk in enumerate(chunks, start=1) if is_relevant(chunk, question, min_overlap)), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+    return {
+        "recall_at_k": round(hits / len(questions), 4),
+        "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def mark_pareto(rows: List[Dict[str, Any]]) -> None:
+    """Flag rows not dominated on (recall, MRR) up and (p99, index size) down."""
+    def key(row):
+        return (row["recall_at_k"], row["mrr"], -row["p99_ms"], -row["index_mb"])
+
+    for row in rows:
+        mine = key(row)
+        row["pareto"] = not any(
+            all(a >= b for a, b in zip(key(other), mine)) and key(other) != mine for other in rows
+        )
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    print(
+        f"{'strategy':9} {'size':>5} {'ovl':>4} {'mode':7} {'ef':>4} {'k':>3} {'recall':>7} {'mrr':>6} "
+        f"{'p50 ms':>7} {'p99 ms':>7} {'chunks':>7} {'idx MB':>7} {'ingest s':>9}  pareto"
+    )
+    for row in rows:
+        print(
+            f"{row['strategy']:9} {row['chunk_size']:5} {row['overlap']:4} {row['mode']:7} {row['search_ef']:4} "
+            f"{row['top_k']:3} {row['recall_at_k']:7.3f} {row['mrr']:6.3f} {row['p50_ms']:7.2f} {row['p99_ms']:7.2f} "
+            f"{row['chunks']:7} {row['index_mb']:7.2f} {row['ingest_s']:9.2f}  {'*' if row['pareto'] else ''}"
+        )
+
+
+def _ints(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+async def sweep(args: argparse.Namespace, dataset: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = []
+    for strategy, size, overlap in chunk_configs(args):
+        try:
+            index = await ingest(dataset, strategy, size, overlap)
+        except RuntimeError as exc:
+            print(f"  {strategy}/{size}/{overlap}: skipped ({exc})", flush=True)
+            continue
+        for mode, ef, top_k in itertools.product(args.modes.split(","), _ints(args.search_efs), _ints(args.top_ks)):
+            settings.qdrant_search_ef = ef
+            quality = await evaluate(dataset["questions"], top_k, mode, args.evidence_overlap)
+            rows.append({
+                "strategy": strategy, "chunk_size": size, "overlap": overlap,
+                "mode": mode, "search_ef": ef, "top_k": top_k, **quality, **index,
+            })
+        print(f"  {strategy}/{size}/{overlap}: {index['chunks']} chunks in {index['ingest_s']:.1f}s", flush=True)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", help="labeled corpus JSON; a synthetic one is generated otherwise")
+    parser.add_argument("--documents", type=int, default=20, help="synthetic corpus size")
+    parser.add_argument("--facts", type=int, default=10, help="labeled facts per synthetic document")
+    parser.add_argument("--strategies", default="fixed,sentence,sliding")
+    parser.add_argument("--chunk-sizes", default="100,200,500")
+    parser.add_argument("--overlaps", default="0,50,200", help="sliding overlap in words")
+    parser.add_argument("--sentence-overlaps", default="0,1", help="sentence overlap in sentences")
+    parser.add_argument("--top-ks", default="3,5,10")
+    parser.add_argument("--modes", default="dense", help="retrieval modes, e.g. dense,hybrid")
+    parser.add_argument("--search-efs", default=str(settings.qdrant_search_ef), help="HNSW ef values (server only)")
+    parser.add_argument("--evidence-overlap", type=float, default=0.5)
+    parser.add_argument("--url", help="Qdrant server URL; defaults to an in-memory client")
+    parser.add_argument("--overwrite", action="store_true", help=f"allow replacing {retriever.COLLECTION} on --url")
+    parser.add_argument("--hashing-encoder", action="store_true", help="bag-of-words stand-in instead of MiniLM")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.url:
+        vector_store.qdrant = QdrantClient(url=args.url, timeout=120)
+        # retrieve_chunks always searches retriever.COLLECTION, so the sweep rebuilds that collection.
+        if vector_store.qdrant.collection_exists(retriever.COLLECTION) and not args.overwrite:
+            raise SystemExit(f"{args.url} already has '{retriever.COLLECTION}'; use a scratch server or pass --overwrite")
+    else:
+        warnings.filterwarnings("ignore", message=".*[Ll]ocal")
+        vector_store.qdrant = QdrantClient(":memory:")
+    if args.hashing_encoder:
+        from benchmarks.stand_ins import HashingEncoder
+
+        embedings.model = HashingEncoder()
+    else:
+        embedings.load_model()
+
+    dataset = load_dataset(args.dataset) if args.dataset else synthetic_dataset(args.documents, args.facts, args.seed)
+    print(f"{len(dataset['documents'])} documents, {len(dataset['questions'])} labeled questions")
+    rows = asyncio.run(sweep(args, dataset))
+    mark_pareto(rows)
+    print()
+    print_table(rows)
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump({"args": vars(args), "results": rows}, handle, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()